@@ -1,13 +1,27 @@
 #!/usr/bin/env python3
 """
 n8n Workflow Auto-Importer
-Imports the Tool Improvement Agent workflow directly into PostgreSQL
+Imports workflows directly into n8n's database (PostgreSQL, or SQLite with
+--sqlite): the Tool Improvement Agent by default, or every workflow in the
+given files, directories and globs in a single transaction. Re-running is
+safe: unchanged workflows are skipped and changed ones are updated in place.
+Every imported version is recorded in the local version store
+(workflow-versions.py), which describes what changed since the last push
 """
 
+import argparse
+import glob
+import hashlib
 import json
-import psycopg2
-from datetime import datetime
+import re
 import sys
+import time
+import uuid
+from datetime import datetime
+from pathlib import Path
+
+from n8n_storage import StorageError, open_storage
+from workflow_versions import DEFAULT_STORE, VersionStore, summarize_diff, workflow_identity
 
 # Database configuration
 DB_CONFIG = {
@@ -19,106 +33,273 @@ DB_CONFIG = {
 
 WORKFLOW_FILE = '/home/avi/projects/astro-site/n8n-workflows/tool-improvement-agent-workflow.json'
 
-def import_workflow():
-    """Import workflow directly into n8n database"""
+# workflow_entity.id is a varchar(36)
+MAX_ID_LENGTH = 36
 
-    print("🚀 n8n Workflow Auto-Importer")
-    print("=" * 60)
-    print()
+# What a workflow does; a change anywhere else (tags, pinned data) is not
+# worth a redeploy
+HASHED_FIELDS = {'nodes': [], 'connections': {}, 'settings': {}}
 
-    # Read workflow JSON
-    print("📖 Reading workflow file...")
-    try:
-        with open(WORKFLOW_FILE, 'r') as f:
-            workflow = json.load(f)
-    except Exception as e:
-        print(f"❌ Error reading workflow file: {e}")
-        return False
+def find_workflow_files(patterns):
+    """Expand files, directories (their *.json) and globs, each file once, in order"""
+    files = []
+    seen = set()
+    for pattern in patterns:
+        path = Path(pattern)
+        if path.is_dir():
+            matches = sorted(path.glob('*.json'))
+        elif glob.has_magic(pattern):
+            matches = [Path(match) for match in sorted(glob.glob(pattern, recursive=True))]
+        else:
+            matches = [path]
+        for match in matches:
+            key = match.resolve()
+            if key not in seen:
+                seen.add(key)
+                files.append(match)
+    return files
 
-    print(f"✅ Workflow loaded: {workflow['name']}")
-    print()
+def validate_workflow(workflow):
+    """Return a list of problems that would make n8n reject or break the workflow"""
+    if not isinstance(workflow, dict):
+        return ['Workflow must be a JSON object']
 
-    # Connect to database
-    print("🔌 Connecting to n8n database...")
-    try:
-        conn = psycopg2.connect(**DB_CONFIG)
-        cur = conn.cursor()
-    except Exception as e:
-        print(f"❌ Database connection failed: {e}")
-        return False
+    errors = []
+    name = workflow.get('name')
+    if not isinstance(name, str) or not name.strip():
+        errors.append("Missing 'name'")
 
-    print("✅ Connected to database")
-    print()
+    nodes = workflow.get('nodes')
+    node_names = set()
+    if not isinstance(nodes, list):
+        errors.append("'nodes' must be a list")
+        nodes = []
+    for i, node in enumerate(nodes):
+        if not isinstance(node, dict) or not isinstance(node.get('name'), str):
+            errors.append(f"Node {i}: missing 'name'")
+            continue
+        if not isinstance(node.get('type'), str):
+            errors.append(f"Node '{node['name']}': missing 'type'")
+        if node['name'] in node_names:
+            errors.append(f"Duplicate node name: {node['name']}")
+        node_names.add(node['name'])
 
-    # Insert workflow
-    print("📥 Importing workflow...")
+    connections = workflow.get('connections')
+    if not isinstance(connections, dict):
+        errors.append("'connections' must be an object")
+        connections = {}
+    for source, outputs in connections.items():
+        if source not in node_names:
+            errors.append(f"Connection from unknown node: {source}")
+        errors.extend(validate_outputs(source, outputs, node_names))
 
-    try:
-        # Generate unique ID
-        workflow_id = f"tool-improvement-agent-{int(datetime.now().timestamp())}"
+    for field in ('settings', 'staticData', 'pinData'):
+        if workflow.get(field) is not None and not isinstance(workflow[field], dict):
+            errors.append(f"'{field}' must be an object")
+    if workflow.get('tags') is not None and not isinstance(workflow['tags'], list):
+        errors.append("'tags' must be a list")
+    return errors
+
+def validate_outputs(source, outputs, node_names):
+    """Problems in one node's connections: {type: [[{'node': ...}, ...], ...]}
+
+    Each level is type-checked so a malformed export is reported rather
+    than crashing the import. Null outputs and branches are allowed, as n8n
+    writes them for unconnected outputs.
+    """
+    if outputs is None:
+        return []
+    if not isinstance(outputs, dict):
+        return [f"Connections from '{source}' must be an object"]
+    errors = []
+    for output_type, branches in outputs.items():
+        label = f"Connections from '{source}' ({output_type})"
+        if branches is None:
+            continue
+        if not isinstance(branches, list):
+            errors.append(f"{label} must be a list")
+            continue
+        for branch in branches:
+            if branch is None:
+                continue
+            if not isinstance(branch, list):
+                errors.append(f"{label}: each output must be a list")
+                continue
+            for target in branch:
+                if not isinstance(target, dict):
+                    errors.append(f"{label}: connection target must be an object, got {target!r}")
+                elif target.get('node') not in node_names:
+                    errors.append(f"Connection from '{source}' to unknown node: {target.get('node')}")
+    return errors
 
-        # Prepare data
+def load_workflows(files):
+    """Read and validate every file before anything touches the database
+
+    Returns one entry per file: {'path', 'workflow', 'errors'}.
+    """
+    entries = []
+    for path in files:
+        entry = {'path': path, 'workflow': None, 'errors': []}
+        try:
+            with open(path, 'r') as f:
+                entry['workflow'] = json.load(f)
+        except (OSError, ValueError) as e:
+            entry['errors'].append(f"Error reading workflow file: {e}")
+        else:
+            entry['errors'] = validate_workflow(entry['workflow'])
+        entries.append(entry)
+    return entries
+
+def workflow_hash(workflow):
+    """Canonical sha256 of a workflow's nodes, connections and settings
+
+    Keys are sorted and whitespace dropped, so re-exported or reformatted
+    JSON hashes the same.
+    """
+    content = {field: workflow.get(field) or default for field, default in HASHED_FIELDS.items()}
+    canonical = json.dumps(content, sort_keys=True, separators=(',', ':'), ensure_ascii=False)
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+def make_workflow_id(name):
+    """Stable id for a workflow without an exported one: <name-slug>-<name hash>"""
+    slug = re.sub(r'[^a-z0-9]+', '-', name.lower()).strip('-') or 'workflow'
+    suffix = '-' + hashlib.sha1(name.encode('utf-8')).hexdigest()[:8]
+    return slug[:MAX_ID_LENGTH - len(suffix)] + suffix
+
+def check_identities(entries):
+    """A batch may hold each workflow once: by exported id, otherwise by name"""
+    taken = {}
+    for entry in entries:
+        if entry['errors']:
+            continue
+        workflow = entry['workflow']
+        key = ('id', workflow['id']) if workflow.get('id') else ('name', workflow['name'])
+        if key in taken:
+            entry['errors'].append(f"Same {key[0]} {key[1]!r} as {taken[key]}")
+            continue
+        taken[key] = entry['path']
+
+def plan_upserts(entries, existing_rows):
+    """Match entries to existing rows and decide what to write
+
+    existing_rows come from WorkflowStorage lookup(). Sets entry['id'] and
+    entry['status'] ('created', 'updated' or 'unchanged'). Rows are matched
+    by exported id, then by name (the most recently updated row wins when
+    older imports left duplicates), so an export from another instance
+    updates the workflow of the same name rather than adding a copy.
+
+    Raises ValueError when two entries resolve to the same row: a single
+    upsert cannot write a row twice.
+    """
+    by_id = {}
+    by_name = {}
+    for row_id, name, nodes, connections, settings in existing_rows:
+        row = {'id': row_id, 'nodes': nodes, 'connections': connections, 'settings': settings}
+        by_id[row_id] = row
+        by_name[name] = row
+
+    claimed = {}
+    for entry in entries:
+        workflow = entry['workflow']
+        row = by_id.get(workflow['id']) if workflow.get('id') else None
+        if row is None:
+            row = by_name.get(workflow['name']) or by_id.get(make_workflow_id(workflow['name']))
+        if row is None:
+            entry['id'] = workflow.get('id') or make_workflow_id(workflow['name'])
+            entry['status'] = 'created'
+        elif workflow_hash(row) == entry['hash']:
+            entry['id'] = row['id']
+            entry['status'] = 'unchanged'
+        else:
+            entry['id'] = row['id']
+            entry['status'] = 'updated'
+        if entry['id'] in claimed:
+            raise ValueError(f"{entry['path']} and {claimed[entry['id']]} both resolve to "
+                             f"workflow {entry['id']}")
+        claimed[entry['id']] = entry['path']
+
+def workflow_record(workflow, workflow_id, now):
+    """workflow_entity values for the storage backend's upsert"""
+    return {
+        'id': workflow_id,
+        'name': workflow['name'],
+        'active': False,  # New workflows start inactive; updates keep their state
+        'nodes': json.dumps(workflow['nodes']),
+        'connections': json.dumps(workflow['connections']),
+        'settings': json.dumps(workflow.get('settings') or {}),
+        'staticData': json.dumps(workflow.get('staticData') or {}),
+        'tags': json.dumps(workflow.get('tags') or []),
+        'pinData': json.dumps(workflow.get('pinData') or {}),
+        # A fresh versionId tells open editors the workflow changed
+        'versionId': str(uuid.uuid4()),
+        'createdAt': now,
+        'updatedAt': now,
+    }
+
+def bulk_import(entries, storage):
+    """Upsert every changed entry in one storage transaction
+
+    One lookup finds the rows the batch already has and one upsert writes
+    the changed ones, so either all changes land or none do. Unchanged
+    workflows are not written at all. Returns [(id, name)] as written.
+    """
+    for entry in entries:
+        entry['hash'] = workflow_hash(entry['workflow'])
+    ids = [entry['workflow'].get('id') or make_workflow_id(entry['workflow']['name'])
+           for entry in entries]
+    names = [entry['workflow']['name'] for entry in entries]
+
+    with storage.transaction() as tx:
+        plan_upserts(entries, tx.lookup(ids, names))
         now = datetime.now()
+        return tx.upsert([workflow_record(entry['workflow'], entry['id'], now)
+                          for entry in entries if entry['status'] != 'unchanged'])
 
-        # Insert query
-        insert_query = """
-        INSERT INTO workflow_entity (
-            id,
-            name,
-            active,
-            nodes,
-            connections,
-            settings,
-            "staticData",
-            tags,
-            "pinData",
-            "versionId",
-            "createdAt",
-            "updatedAt"
-        ) VALUES (
-            %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s
-        )
-        RETURNING id, name;
-        """
-
-        # Execute insert
-        cur.execute(insert_query, (
-            workflow_id,
-            workflow['name'],
-            False,  # Start inactive
-            json.dumps(workflow['nodes']),
-            json.dumps(workflow['connections']),
-            json.dumps(workflow.get('settings', {})),
-            json.dumps(workflow.get('staticData', {})),
-            json.dumps(workflow.get('tags', [])),
-            json.dumps(workflow.get('pinData', {})),
-            workflow.get('versionId', '1'),
-            now,
-            now
-        ))
-
-        result = cur.fetchone()
-        conn.commit()
-
-        print(f"✅ Workflow imported successfully!")
-        print(f"   ID: {result[0]}")
-        print(f"   Name: {result[1]}")
-        print()
+def record_versions(entries, store):
+    """Commit every entry to the version store; returns the number of new blobs"""
+    written = 0
+    for entry in entries:
+        entry['identity'] = workflow_identity(entry['workflow'])
+        entry['version'], blobs = store.commit(entry['workflow'])
+        written += blobs
+    store.save_refs()
+    return written
 
-    except Exception as e:
-        print(f"❌ Import failed: {e}")
-        conn.rollback()
-        return False
+def describe_changes(entries, store, target):
+    """Summarise what moved in each updated entry since its last push to target
 
-    finally:
-        cur.close()
-        conn.close()
+    Report only: whether a workflow changed is always decided against the
+    database row, so edits made in n8n or by other imports are caught.
+    """
+    for entry in entries:
+        if entry.get('status') != 'updated':
+            continue
+        previous = store.pushed(entry['identity'], target)
+        if previous == entry['version']:
+            entry['change'] = 'changed in n8n since the last push; restored'
+        elif previous is not None:
+            entry['change'] = summarize_diff(store.diff(previous, entry['version']))
 
-    # Success message
-    print("=" * 60)
-    print("🎉 Import Complete!")
-    print("=" * 60)
+def print_report(entries):
+    """One line per workflow file"""
+    print("📋 Workflows:")
+    for entry in entries:
+        workflow = entry['workflow'] if isinstance(entry['workflow'], dict) else {}
+        name = workflow.get('name') or '?'
+        if entry['errors']:
+            print(f"  ❌ {entry['path']}: {name}")
+            for error in entry['errors']:
+                print(f"     - {error}")
+        else:
+            status = entry.get('status', 'valid')
+            nodes = len(workflow['nodes'])
+            workflow_id = entry.get('id') or workflow.get('id') or make_workflow_id(name)
+            print(f"  ✅ {entry['path']}: {name} ({nodes} nodes) -> {workflow_id} [{status}]")
+            if entry.get('change') and status == 'updated':
+                print(f"     {entry['change']}")
     print()
+
+def print_next_steps():
     print("📋 Next Steps:")
     print()
     print("1. Open n8n:")
@@ -137,11 +318,116 @@ def import_workflow():
     print()
     print("=" * 60)
 
+def import_workflow(paths=None, dry_run=False, skip_invalid=False, sqlite_path=None,
+                    store_dir=DEFAULT_STORE):
+    """Import workflows directly into n8n database"""
+
+    print("🚀 n8n Workflow Auto-Importer")
+    print("=" * 60)
+    print()
+
+    # Read and validate every workflow up front
+    print("📖 Reading workflow files...")
+    files = find_workflow_files(paths or [WORKFLOW_FILE])
+    if not files:
+        print("❌ No workflow files matched")
+        return False
+
+    entries = load_workflows(files)
+    check_identities(entries)
+    valid = [entry for entry in entries if not entry['errors']]
+    invalid = len(entries) - len(valid)
+    print(f"✅ {len(valid)} of {len(entries)} workflows valid")
+    print()
+
+    if invalid and not skip_invalid:
+        print_report(entries)
+        print("❌ Nothing imported: fix the workflows above or pass --skip-invalid")
+        return False
+
+    if dry_run or not valid:
+        print_report(entries)
+        print("ℹ️  Dry run: nothing imported" if dry_run else "❌ No valid workflows to import")
+        return dry_run
+
+    # Connect to database
+    print("🔌 Connecting to n8n database...")
+    try:
+        storage = open_storage(sqlite_path, DB_CONFIG)
+    except StorageError as e:
+        print(f"❌ {e}")
+        return False
+    except Exception as e:
+        print(f"❌ Database connection failed: {e}")
+        return False
+    print(f"✅ Connected to {storage.name} database")
+    print()
+
+    started = time.perf_counter()
+    store = VersionStore(store_dir) if store_dir else None
+    if store is not None:
+        written = record_versions(valid, store)
+        print(f"🗃️  Versions recorded ({written} new blobs)")
+        print()
+
+    # One transaction, one upsert for every workflow that differs from its row
+    print(f"📥 Importing {len(valid)} workflows...")
+    try:
+        bulk_import(valid, storage)
+    except Exception as e:
+        print(f"❌ Import failed, nothing was written: {e}")
+        return False
+    finally:
+        storage.close()
+    elapsed = time.perf_counter() - started
+
+    if store is not None:
+        describe_changes(valid, store, storage.target)
+        for entry in valid:
+            store.mark_pushed(entry['identity'], storage.target, entry['version'])
+        store.save_refs()
+
+    counts = {status: sum(entry['status'] == status for entry in valid)
+              for status in ('created', 'updated', 'unchanged')}
+    print(f"✅ {counts['created']} created, {counts['updated']} updated, "
+          f"{counts['unchanged']} unchanged in one transaction ({elapsed * 1000:.0f} ms)")
+    print()
+    print_report(entries)
+
+    # Success message
+    print("=" * 60)
+    print("🎉 Import Complete!")
+    print("=" * 60)
+    print()
+    if not paths:
+        print_next_steps()
+
     return True
 
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Import n8n workflows into n8n's database")
+    parser.add_argument('paths', nargs='*',
+                        help='Workflow files, directories or globs '
+                             f'(default: {Path(WORKFLOW_FILE).name})')
+    parser.add_argument('--dry-run', action='store_true',
+                        help='Validate and report without touching the database')
+    parser.add_argument('--skip-invalid', action='store_true',
+                        help='Import the valid workflows even if some fail validation')
+    parser.add_argument('--sqlite', metavar='PATH',
+                        help="Write to an n8n SQLite database (created if missing) "
+                             "instead of PostgreSQL")
+    parser.add_argument('--store', metavar='DIR', type=Path, default=DEFAULT_STORE,
+                        help=f'Version store directory (default: {DEFAULT_STORE.name})')
+    parser.add_argument('--no-store', action='store_true',
+                        help='Do not record versions or describe changes')
+    return parser.parse_args(argv)
+
 if __name__ == '__main__':
+    args = parse_args()
     try:
-        success = import_workflow()
+        success = import_workflow(args.paths, dry_run=args.dry_run, skip_invalid=args.skip_invalid,
+                                  sqlite_path=args.sqlite,
+                                  store_dir=None if args.no_store else args.store)
         sys.exit(0 if success else 1)
     except KeyboardInterrupt:
         print("\n\n❌ Import cancelled by user")
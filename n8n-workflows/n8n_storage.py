@@ -0,0 +1,248 @@
+"""
+n8n workflow storage backends
+The importer talks to workflow_entity through these, so the same bulk
+code path runs against n8n's PostgreSQL or SQLite database
+"""
+
+import json
+import sqlite3
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+
+try:
+    import psycopg2
+    from psycopg2.extras import execute_values
+    from psycopg2.pool import ThreadedConnectionPool
+except ImportError:  # only needed for the PostgreSQL backend
+    psycopg2 = None
+
+# Columns every backend writes; the row dicts passed to upsert() use these keys
+WORKFLOW_COLUMNS = [
+    'id',
+    'name',
+    'active',
+    'nodes',
+    'connections',
+    'settings',
+    'staticData',
+    'pinData',
+    'versionId',
+    'createdAt',
+    'updatedAt',
+]
+
+# Refreshed when a row is updated; id, active and createdAt are never overwritten
+UPDATED_COLUMNS = [
+    'name',
+    'nodes',
+    'connections',
+    'settings',
+    'staticData',
+    'pinData',
+    'versionId',
+    'updatedAt',
+]
+
+# workflow_entity as n8n's SQLite migrations create it
+SQLITE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS "workflow_entity" (
+    "id" varchar(36) PRIMARY KEY NOT NULL,
+    "name" varchar(128) NOT NULL,
+    "active" boolean NOT NULL,
+    "nodes" text,
+    "connections" text NOT NULL,
+    "settings" text,
+    "staticData" text,
+    "pinData" text,
+    "versionId" char(36),
+    "triggerCount" integer NOT NULL DEFAULT 0,
+    "meta" text,
+    "parentFolderId" varchar(36) DEFAULT NULL,
+    "createdAt" datetime(3) NOT NULL DEFAULT (STRFTIME('%Y-%m-%d %H:%M:%f', 'NOW')),
+    "updatedAt" datetime(3) NOT NULL DEFAULT (STRFTIME('%Y-%m-%d %H:%M:%f', 'NOW')),
+    "isArchived" boolean NOT NULL DEFAULT (0)
+);
+CREATE INDEX IF NOT EXISTS "IDX_workflow_entity_name" ON "workflow_entity" ("name");
+"""
+
+
+class StorageError(Exception):
+    """The backend cannot be opened (missing driver, bad path)"""
+
+
+def _quoted(columns):
+    return ', '.join(f'"{column}"' for column in columns)
+
+
+def _update_clause(columns):
+    return ', '.join(f'"{column}" = EXCLUDED."{column}"' for column in columns)
+
+
+class WorkflowStorage:
+    """workflow_entity access used by the importer
+
+    Use as:
+
+        with storage.transaction() as tx:
+            rows = tx.lookup(ids, names)
+            tx.upsert(records)
+
+    lookup returns (id, name, nodes, connections, settings) tuples ordered
+    by updatedAt, with JSON columns decoded. upsert takes dicts keyed by
+    WORKFLOW_COLUMNS (JSON columns already serialised) and writes them in
+    as few statements as the backend allows. Everything inside one
+    transaction() commits or rolls back together.
+    """
+
+    name = None
+    # Identifies the database a version was pushed to, e.g. sqlite:/path
+    target = None
+
+    def transaction(self):
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+
+def _decode(value):
+    # PostgreSQL json columns come back decoded, text columns do not
+    return json.loads(value) if isinstance(value, str) else value
+
+
+def _decoded_rows(rows):
+    return [(row_id, name, _decode(nodes), _decode(connections), _decode(settings))
+            for row_id, name, nodes, connections, settings in rows]
+
+
+class PostgresStorage(WorkflowStorage):
+    """n8n's PostgreSQL database through a psycopg2 connection pool"""
+
+    name = 'postgres'
+
+    # The baseline importer has always written tags alongside the workflow
+    columns = WORKFLOW_COLUMNS[:7] + ['tags'] + WORKFLOW_COLUMNS[7:]
+
+    def __init__(self, config, max_connections=4):
+        if psycopg2 is None:
+            raise StorageError('psycopg2 is not installed (pip install psycopg2-binary)')
+        self.pool = ThreadedConnectionPool(1, max_connections, **config)
+        self.target = f"postgres:{config.get('host')}:{config.get('port', 5432)}/{config.get('database')}"
+        self._upsert_query = (
+            f"INSERT INTO workflow_entity ({_quoted(self.columns)}) VALUES %s "
+            f"ON CONFLICT (id) DO UPDATE SET {_update_clause(UPDATED_COLUMNS + ['tags'])} "
+            "RETURNING id, name"
+        )
+
+    @contextmanager
+    def transaction(self):
+        conn = self.pool.getconn()
+        try:
+            with conn:
+                with conn.cursor() as cur:
+                    yield _PostgresTransaction(cur, self)
+        finally:
+            self.pool.putconn(conn)
+
+    def close(self):
+        self.pool.closeall()
+
+
+class _PostgresTransaction:
+
+    def __init__(self, cur, storage):
+        self.cur = cur
+        self.storage = storage
+
+    def lookup(self, ids, names):
+        self.cur.execute(
+            'SELECT id, name, nodes, connections, settings FROM workflow_entity '
+            'WHERE id = ANY(%s) OR name = ANY(%s) ORDER BY "updatedAt"',
+            (list(ids), list(names)),
+        )
+        return _decoded_rows(self.cur.fetchall())
+
+    def upsert(self, records):
+        if not records:
+            return []
+        rows = [tuple(record.get(column, '[]' if column == 'tags' else None)
+                      for column in self.storage.columns) for record in records]
+        # A page size covering every row sends a single statement
+        return execute_values(self.cur, self.storage._upsert_query, rows,
+                              page_size=len(rows), fetch=True)
+
+
+class SqliteStorage(WorkflowStorage):
+    """An n8n SQLite database (database.sqlite), or a stand-in for local runs
+
+    The workflow_entity table is created with n8n's own schema when it does
+    not exist yet, so an empty file is enough for tests and benchmarks.
+    """
+
+    name = 'sqlite'
+
+    def __init__(self, path):
+        try:
+            self.conn = sqlite3.connect(path, isolation_level=None)
+        except sqlite3.Error as e:
+            raise StorageError(f"Cannot open {path}: {e}") from e
+        self.target = f"sqlite:{Path(path).resolve()}"
+        self.conn.executescript(SQLITE_SCHEMA)
+        self._upsert_query = (
+            f"INSERT INTO workflow_entity ({_quoted(WORKFLOW_COLUMNS)}) "
+            f"VALUES ({', '.join('?' * len(WORKFLOW_COLUMNS))}) "
+            f"ON CONFLICT (id) DO UPDATE SET {_update_clause(UPDATED_COLUMNS)}"
+        )
+
+    @contextmanager
+    def transaction(self):
+        self.conn.execute('BEGIN IMMEDIATE')
+        try:
+            yield _SqliteTransaction(self.conn, self)
+        except BaseException:
+            self.conn.execute('ROLLBACK')
+            raise
+        self.conn.execute('COMMIT')
+
+    def close(self):
+        self.conn.close()
+
+
+class _SqliteTransaction:
+
+    def __init__(self, conn, storage):
+        self.conn = conn
+        self.storage = storage
+
+    def lookup(self, ids, names):
+        # json_each keeps this one statement however many ids there are
+        rows = self.conn.execute(
+            'SELECT id, name, nodes, connections, settings FROM workflow_entity '
+            'WHERE id IN (SELECT value FROM json_each(?)) '
+            'OR name IN (SELECT value FROM json_each(?)) ORDER BY "updatedAt"',
+            (json.dumps(list(ids)), json.dumps(list(names))),
+        ).fetchall()
+        return _decoded_rows(rows)
+
+    def upsert(self, records):
+        rows = [tuple(_sqlite_value(record.get(column)) for column in WORKFLOW_COLUMNS)
+                for record in records]
+        self.conn.executemany(self.storage._upsert_query, rows)
+        return [(record['id'], record['name']) for record in records]
+
+
+def _sqlite_value(value):
+    if isinstance(value, bool):
+        return int(value)
+    if isinstance(value, datetime):
+        # n8n stores datetime(3) as text with milliseconds
+        return value.strftime('%Y-%m-%d %H:%M:%S.%f')[:-3]
+    return value
+
+
+def open_storage(sqlite_path=None, pg_config=None):
+    """SqliteStorage when a path is given, otherwise PostgresStorage(pg_config)"""
+    if sqlite_path:
+        return SqliteStorage(sqlite_path)
+    return PostgresStorage(pg_config)
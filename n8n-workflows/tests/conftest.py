@@ -0,0 +1,47 @@
+"""
+Shared test setup: makes the importer modules importable, including the
+hyphenated auto-import.py script
+"""
+
+import importlib.util
+import sys
+from pathlib import Path
+
+import pytest
+
+WORKFLOWS_DIR = Path(__file__).resolve().parent.parent
+
+if str(WORKFLOWS_DIR) not in sys.path:
+    sys.path.insert(0, str(WORKFLOWS_DIR))
+
+
+def load_script(name):
+    """Import a script whose file name is not a valid module name"""
+    spec = importlib.util.spec_from_file_location(
+        name.replace('-', '_'), WORKFLOWS_DIR / f"{name}.py")
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+@pytest.fixture(scope='session')
+def auto_import():
+    return load_script('auto-import')
+
+
+def make_workflow(name, nodes=('Start', 'Work'), workflow_id=None, **fields):
+    """A minimal valid workflow: nodes wired in a chain"""
+    workflow = {
+        'name': name,
+        'nodes': [{'name': node, 'type': 'n8n-nodes-base.noOp', 'parameters': {}}
+                  for node in nodes],
+        'connections': {
+            source: {'main': [[{'node': target, 'type': 'main', 'index': 0}]]}
+            for source, target in zip(nodes, nodes[1:])
+        },
+        'settings': {},
+    }
+    if workflow_id:
+        workflow['id'] = workflow_id
+    workflow.update(fields)
+    return workflow
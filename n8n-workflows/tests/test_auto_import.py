@@ -0,0 +1,159 @@
+"""
+plan_upserts and bulk_import against the SQLite backend
+"""
+
+import json
+
+import pytest
+
+from n8n_storage import SqliteStorage
+
+from conftest import make_workflow
+
+
+@pytest.fixture
+def storage(tmp_path):
+    storage = SqliteStorage(tmp_path / 'database.sqlite')
+    yield storage
+    storage.close()
+
+
+def entries_for(*workflows):
+    return [{'path': f"workflow-{n}.json", 'workflow': workflow, 'errors': []}
+            for n, workflow in enumerate(workflows)]
+
+
+def rows(storage):
+    return storage.conn.execute(
+        'SELECT id, name, nodes FROM workflow_entity ORDER BY id').fetchall()
+
+
+def test_create_then_unchanged_then_updated(auto_import, storage):
+    workflow = make_workflow('SEO audit')
+    entries = entries_for(workflow)
+    auto_import.bulk_import(entries, storage)
+    assert entries[0]['status'] == 'created'
+    assert entries[0]['id'] == auto_import.make_workflow_id('SEO audit')
+
+    # Reformatting and tag changes do not count as a change
+    entries = entries_for(dict(json.loads(json.dumps(workflow, indent=2)), tags=['seo']))
+    assert auto_import.bulk_import(entries, storage) == []
+    assert entries[0]['status'] == 'unchanged'
+
+    entries = entries_for(make_workflow('SEO audit', nodes=('Start', 'Work', 'Report')))
+    auto_import.bulk_import(entries, storage)
+    assert entries[0]['status'] == 'updated'
+    [(row_id, name, nodes)] = rows(storage)
+    assert row_id == auto_import.make_workflow_id('SEO audit')
+    assert [node['name'] for node in json.loads(nodes)] == ['Start', 'Work', 'Report']
+
+
+def test_exported_id_is_kept_and_matched(auto_import, storage):
+    auto_import.bulk_import(entries_for(make_workflow('Reports', workflow_id='abc123')), storage)
+    entries = entries_for(make_workflow('Reports renamed', nodes=('Start',), workflow_id='abc123'))
+    auto_import.bulk_import(entries, storage)
+    assert entries[0]['status'] == 'updated'
+    assert [(row_id, name) for row_id, name, _ in rows(storage)] == [('abc123', 'Reports renamed')]
+
+
+def test_unknown_exported_id_falls_back_to_name(auto_import, storage):
+    auto_import.bulk_import(entries_for(make_workflow('Reports')), storage)
+
+    # Exported from another instance: same workflow, an id this database never saw
+    entries = entries_for(make_workflow('Reports', nodes=('Start',), workflow_id='elsewhere'))
+    auto_import.bulk_import(entries, storage)
+    assert entries[0]['status'] == 'updated'
+    assert entries[0]['id'] == auto_import.make_workflow_id('Reports')
+    assert len(rows(storage)) == 1
+
+
+def test_two_entries_for_one_row_are_rejected(auto_import, storage):
+    auto_import.bulk_import(entries_for(make_workflow('Reports', workflow_id='abc123')), storage)
+    before = rows(storage)
+
+    # One matches by id, the other by name: both would write row abc123
+    entries = entries_for(make_workflow('Reports', nodes=('Start',), workflow_id='abc123'),
+                          make_workflow('Reports', nodes=('Start', 'Work', 'Mail')))
+    auto_import.check_identities(entries)
+    assert not any(entry['errors'] for entry in entries)
+    with pytest.raises(ValueError, match='both resolve to workflow abc123'):
+        auto_import.bulk_import(entries, storage)
+    assert rows(storage) == before
+
+
+def test_plan_prefers_most_recently_updated_duplicate(auto_import):
+    existing = [
+        ('old', 'Reports', [], {}, {}),
+        ('new', 'Reports', [], {}, {}),
+    ]
+    entries = entries_for(make_workflow('Reports'))
+    entries[0]['hash'] = auto_import.workflow_hash(entries[0]['workflow'])
+    auto_import.plan_upserts(entries, existing)
+    assert (entries[0]['id'], entries[0]['status']) == ('new', 'updated')
+
+
+def test_import_workflow_end_to_end(auto_import, tmp_path, capsys):
+    for name in ('Alpha', 'Beta'):
+        (tmp_path / f"{name}.json").write_text(json.dumps(make_workflow(name)))
+    database = tmp_path / 'database.sqlite'
+    store = tmp_path / 'store'
+
+    assert auto_import.import_workflow([str(tmp_path)], sqlite_path=database, store_dir=store)
+    assert '2 created, 0 updated, 0 unchanged' in capsys.readouterr().out
+
+    assert auto_import.import_workflow([str(tmp_path)], sqlite_path=database, store_dir=store)
+    assert '0 created, 0 updated, 2 unchanged' in capsys.readouterr().out
+
+
+def test_database_drift_is_caught_despite_the_version_store(auto_import, tmp_path, capsys):
+    (tmp_path / 'Alpha.json').write_text(json.dumps(make_workflow('Alpha')))
+    database = tmp_path / 'database.sqlite'
+    store = tmp_path / 'store'
+    assert auto_import.import_workflow([str(tmp_path / 'Alpha.json')], sqlite_path=database,
+                                       store_dir=store)
+
+    # Changed out of band: another import that bypasses the store
+    staging = tmp_path / 'staging.json'
+    staging.write_text(json.dumps(make_workflow('Alpha', nodes=('Start',))))
+    assert auto_import.import_workflow([str(staging)], sqlite_path=database, store_dir=None)
+    capsys.readouterr()
+
+    assert auto_import.import_workflow([str(tmp_path / 'Alpha.json')], sqlite_path=database,
+                                       store_dir=store)
+    out = capsys.readouterr().out
+    assert '0 created, 1 updated, 0 unchanged' in out
+    assert 'changed in n8n since the last push; restored' in out
+
+
+def test_changes_since_the_last_push_are_summarised(auto_import, tmp_path, capsys):
+    path = tmp_path / 'Alpha.json'
+    database = tmp_path / 'database.sqlite'
+    store = tmp_path / 'store'
+    path.write_text(json.dumps(make_workflow('Alpha')))
+    auto_import.import_workflow([str(path)], sqlite_path=database, store_dir=store)
+    path.write_text(json.dumps(make_workflow('Alpha', nodes=('Start', 'Work', 'Mail'))))
+    capsys.readouterr()
+
+    auto_import.import_workflow([str(path)], sqlite_path=database, store_dir=store)
+    assert '1 node added, 1 connection rewired' in capsys.readouterr().out
+
+
+@pytest.mark.parametrize('outputs, error', [
+    ([1, 2], "Connections from 'Start' must be an object"),
+    ('main', "Connections from 'Start' must be an object"),
+    ({'main': {'node': 'Work'}}, "Connections from 'Start' (main) must be a list"),
+    ({'main': ['Work']}, "Connections from 'Start' (main): each output must be a list"),
+    ({'main': [[None]]}, "Connections from 'Start' (main): connection target must be an object, got None"),
+    ({'main': [['Work']]}, "Connections from 'Start' (main): connection target must be an object, got 'Work'"),
+    ({'main': [[{'node': 'Nope'}]]}, "Connection from 'Start' to unknown node: Nope"),
+])
+def test_malformed_connections_are_validation_errors(auto_import, outputs, error):
+    workflow = make_workflow('Broken')
+    workflow['connections']['Start'] = outputs
+    assert auto_import.validate_workflow(workflow) == [error]
+
+
+def test_unconnected_outputs_are_valid(auto_import):
+    workflow = make_workflow('Sparse')
+    workflow['connections']['Start'] = {'main': [None, [], [{'node': 'Work'}]], 'ai': None}
+    assert auto_import.validate_workflow(workflow) == []
@@ -0,0 +1,81 @@
+"""
+Content-addressed workflow version store: dedup, checkout and diff
+"""
+
+import copy
+
+import pytest
+
+from workflow_versions import VersionStore, summarize_diff, workflow_identity
+
+from conftest import make_workflow
+
+
+@pytest.fixture
+def store(tmp_path):
+    return VersionStore(tmp_path / 'store')
+
+
+def test_commit_round_trips_and_dedups(store):
+    workflow = make_workflow('Reports', workflow_id='abc123', tags=['seo'])
+    version, written = store.commit(workflow)
+    # Both nodes have the same body, so one node blob, plus the connections,
+    # settings and rest (the tags) blobs
+    assert written == 4
+    assert store.commit(copy.deepcopy(workflow)) == (version, 0)
+
+    assert store.checkout(version) == workflow
+    assert store.checkout(store.commit(make_workflow('Draft'))[0]) == make_workflow('Draft')
+    assert store.resolve(version[:10]) == version
+
+    # A second version only stores the blobs that changed
+    workflow['nodes'][1]['parameters'] = {'url': 'https://example.com'}
+    new_version, written = store.commit(workflow)
+    assert new_version != version and written == 1
+    store.save_refs()
+    assert VersionStore(store.root).refs[workflow_identity(workflow)]['versions'] == [
+        version, new_version]
+
+
+def test_pushed_refs_persist(store):
+    workflow = make_workflow('Reports')
+    version, _ = store.commit(workflow)
+    identity = workflow_identity(workflow)
+    assert identity == 'name:Reports'
+    assert store.pushed(identity, 'sqlite:/tmp/db') is None
+    store.mark_pushed(identity, 'sqlite:/tmp/db', version)
+    store.save_refs()
+    assert VersionStore(store.root).pushed(identity, 'sqlite:/tmp/db') == version
+
+
+def test_diff_reports_structural_changes(store):
+    old = make_workflow('Reports', nodes=('Start', 'Fetch', 'Mail'))
+    new = copy.deepcopy(old)
+    new['name'] = 'Weekly reports'
+    # Rename Fetch -> Download (same body), change Mail, add Log wired after Mail
+    new['nodes'][1]['name'] = 'Download'
+    new['connections'] = {
+        'Start': {'main': [[{'node': 'Download', 'type': 'main', 'index': 0}]]},
+        'Download': {'main': [[{'node': 'Mail', 'type': 'main', 'index': 0}]]},
+        'Mail': {'main': [[{'node': 'Log', 'type': 'main', 'index': 0}]]},
+    }
+    new['nodes'][2]['parameters'] = {'to': 'team@example.com'}
+    new['nodes'].append({'name': 'Log', 'type': 'n8n-nodes-base.noOp', 'parameters': {}})
+    new['settings'] = {'timezone': 'Australia/Sydney'}
+
+    diff = store.diff(store.commit(old)[0], store.commit(new)[0])
+    assert diff['name'] == ['Reports', 'Weekly reports']
+    assert diff['added'] == ['Log']
+    assert diff['removed'] == []
+    assert diff['renamed'] == [['Fetch', 'Download']]
+    assert diff['changed'] == ['Mail']
+    assert diff['connections_added'] and diff['connections_removed']
+    assert diff['settings'] and not diff['rest']
+    assert summarize_diff(diff) == (
+        "1 node added, 1 node renamed, 1 node changed, 5 connections rewired, "
+        "settings changed, renamed from 'Reports'")
+
+
+def test_identical_versions_have_no_structural_change(store):
+    version, _ = store.commit(make_workflow('Reports'))
+    assert summarize_diff(store.diff(version, version)) == 'no structural change'
@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+n8n Workflow Version Store
+Records workflow files as content-addressed versions and shows the
+structural difference between any two of them
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+from workflow_versions import DEFAULT_STORE, SHORT_HASH, VersionStore, summarize_diff, workflow_identity
+
+def short(version):
+    return version[:SHORT_HASH]
+
+def load_workflow(path):
+    with open(path, 'r') as f:
+        return json.load(f)
+
+def resolve_version(store, ref):
+    """A version hash prefix, or a workflow file (recorded first if new)"""
+    if Path(ref).is_file():
+        version, _ = store.commit(load_workflow(ref))
+        store.save_refs()
+        return version
+    version = store.resolve(ref)
+    if version is None:
+        raise ValueError(f"No single version matches {ref!r}")
+    return version
+
+def format_edge(edge):
+    source, output_type, output_index, target, input_type, input_index = edge
+    return f"{source} [{output_type} {output_index}] -> {target} [{input_type} {input_index}]"
+
+def cmd_commit(store, args):
+    print("🗃️  Recording workflow versions...")
+    new_blobs = 0
+    for path in args.files:
+        workflow = load_workflow(path)
+        ref = store.refs.get(workflow_identity(workflow))
+        known = set(ref['versions']) if ref else set()
+        version, written = store.commit(workflow)
+        new_blobs += written
+        state = 'known' if version in known else f"new, {written} blobs written"
+        print(f"  ✅ {path}: {workflow.get('name')} -> {short(version)} ({state})")
+    store.save_refs()
+    print(f"\n✅ {len(args.files)} files recorded, {new_blobs} new blobs")
+    return 0
+
+def cmd_log(store, args):
+    refs = store.refs
+    identities = sorted(refs)
+    if args.workflow:
+        identities = [identity for identity in identities if args.workflow in identity]
+    if not identities:
+        print("⚠️  No recorded workflows")
+        return 1
+    for identity in identities:
+        ref = refs[identity]
+        pushed = {version: target for target, version in ref['pushed'].items()}
+        print(f"📜 {identity}")
+        previous = None
+        for version in ref['versions']:
+            line = f"  {short(version)}"
+            if previous is not None:
+                line += f"  {summarize_diff(store.diff(previous, version))}"
+            if version in pushed:
+                line += f"  (pushed to {pushed[version]})"
+            print(line)
+            previous = version
+        print()
+    return 0
+
+def cmd_diff(store, args):
+    old = resolve_version(store, args.old)
+    new = resolve_version(store, args.new)
+    diff = store.diff(old, new)
+    print(f"📊 {short(old)} -> {short(new)}: {summarize_diff(diff)}\n")
+    if diff['name']:
+        print(f"  Name: {diff['name'][0]} -> {diff['name'][1]}")
+    for name in diff['added']:
+        print(f"  ➕ {name}")
+    for name in diff['removed']:
+        print(f"  ➖ {name}")
+    for old_name, new_name in diff['renamed']:
+        print(f"  🏷️  {old_name} -> {new_name}")
+    if diff['changed']:
+        a, b = dict(store.manifest(old)['nodes']), dict(store.manifest(new)['nodes'])
+        for name in diff['changed']:
+            print(f"  ✏️  {name} ({', '.join(store.changed_fields(a[name], b[name]))})")
+    for edge in diff['connections_added']:
+        print(f"  🔌 + {format_edge(edge)}")
+    for edge in diff['connections_removed']:
+        print(f"  🔌 - {format_edge(edge)}")
+    if diff['settings']:
+        print("  ⚙️  Settings changed")
+    if diff['rest']:
+        print("  📝 Other fields changed (tags, pinned or static data)")
+    return 0
+
+def cmd_show(store, args):
+    version = resolve_version(store, args.version)
+    json.dump(store.checkout(version), sys.stdout, indent=2, ensure_ascii=False)
+    print()
+    return 0
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Content-addressed n8n workflow versions')
+    parser.add_argument('--store', metavar='DIR', type=Path, default=DEFAULT_STORE,
+                        help=f'Version store directory (default: {DEFAULT_STORE.name})')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    commit = commands.add_parser('commit', help='Record workflow files as versions')
+    commit.add_argument('files', nargs='+')
+    commit.set_defaults(handler=cmd_commit)
+
+    log = commands.add_parser('log', help='List recorded versions per workflow')
+    log.add_argument('workflow', nargs='?', help='Only workflows whose id or name contains this')
+    log.set_defaults(handler=cmd_log)
+
+    diff = commands.add_parser('diff', help='Structural diff between two versions')
+    diff.add_argument('old', help='Version hash prefix or workflow file')
+    diff.add_argument('new', help='Version hash prefix or workflow file')
+    diff.set_defaults(handler=cmd_diff)
+
+    show = commands.add_parser('show', help='Print a version as workflow JSON')
+    show.add_argument('version', help='Version hash prefix or workflow file')
+    show.set_defaults(handler=cmd_show)
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    store = VersionStore(args.store)
+    try:
+        return args.handler(store, args)
+    except (OSError, ValueError) as e:
+        print(f"❌ {e}")
+        return 1
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,249 @@
+"""
+Content-addressed n8n workflow version store
+Workflows are split into one blob per node and per node's outgoing
+connections, so versions that share nodes share storage, and two versions
+are diffed by comparing hashes rather than whole documents
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+from pathlib import Path
+
+DEFAULT_STORE = Path(__file__).resolve().parent / '.workflow-store'
+
+# Stored as separate blobs and diffed structurally; every other top-level
+# field goes into one 'rest' blob
+STRUCTURAL_FIELDS = ['nodes', 'connections', 'settings']
+
+# Version and blob ids are sha256 hex; this many characters are shown
+SHORT_HASH = 10
+
+
+def canonical_json(value):
+    """Sorted keys, no whitespace: equal content always serialises the same"""
+    return json.dumps(value, sort_keys=True, separators=(',', ':'), ensure_ascii=False)
+
+
+def content_hash(value):
+    return hashlib.sha256(canonical_json(value).encode('utf-8')).hexdigest()
+
+
+def workflow_identity(workflow):
+    """Exported id, or the name for workflows that have never been exported"""
+    return f"id:{workflow['id']}" if workflow.get('id') else f"name:{workflow['name']}"
+
+
+def split_workflow(workflow):
+    """Return (manifest, {blob hash: value}) for a workflow
+
+    Nodes are kept as ordered [name, blob] pairs. A node's name lives in
+    the manifest rather than in its blob, so a renamed but otherwise
+    identical node keeps its blob. The exported id is kept in the manifest
+    too, so a checkout re-imports as an update of the same workflow.
+    """
+    blobs = {}
+
+    def put(value):
+        blob = content_hash(value)
+        blobs[blob] = value
+        return blob
+
+    nodes = []
+    for node in workflow.get('nodes') or []:
+        body = {key: value for key, value in node.items() if key != 'name'}
+        nodes.append([node['name'], put(body)])
+    connections = {source: put(outputs)
+                   for source, outputs in (workflow.get('connections') or {}).items()}
+    rest = {key: value for key, value in workflow.items()
+            if key not in STRUCTURAL_FIELDS and key not in ('id', 'name')}
+    manifest = {}
+    if workflow.get('id'):
+        # Only when present, so versions of never-exported workflows keep their hashes
+        manifest['id'] = workflow['id']
+    manifest.update({
+        'name': workflow.get('name'),
+        'nodes': nodes,
+        'connections': connections,
+        'settings': put(workflow.get('settings') or {}),
+        'rest': put(rest),
+    })
+    return manifest, blobs
+
+
+def version_hash(manifest):
+    return content_hash(manifest)
+
+
+def _edges(source, outputs):
+    """Flatten one node's connections to (source, output, index, target, input, index) tuples"""
+    edges = set()
+    for output_type, branches in (outputs or {}).items():
+        for output_index, branch in enumerate(branches or []):
+            for target in branch or []:
+                edges.add((source, output_type, output_index,
+                           target.get('node'), target.get('type'), target.get('index', 0)))
+    return edges
+
+
+class VersionStore:
+    """Blobs, manifests and refs under one directory
+
+        objects/ab/<hash>     node, connection, settings and rest blobs
+        versions/<hash>.json  manifests (one per distinct workflow version)
+        refs.json             {identity: {'versions': [...], 'pushed': {target: version}}}
+
+    Every file is written once and never modified except refs.json, so
+    committing a workflow costs one blob write per node that changed.
+    """
+
+    def __init__(self, root=DEFAULT_STORE):
+        self.root = Path(root)
+        self._refs = None
+
+    def _write(self, path, text):
+        """Atomically create a file; content-addressed files are never rewritten"""
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=path.parent, prefix='.tmp')
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            f.write(text)
+        os.replace(temp_path, path)
+
+    def _blob_path(self, blob):
+        return self.root / 'objects' / blob[:2] / blob
+
+    def _version_path(self, version):
+        return self.root / 'versions' / f"{version}.json"
+
+    @property
+    def refs(self):
+        if self._refs is None:
+            try:
+                self._refs = json.loads((self.root / 'refs.json').read_text(encoding='utf-8'))
+            except FileNotFoundError:
+                self._refs = {}
+        return self._refs
+
+    def save_refs(self):
+        self._write(self.root / 'refs.json', canonical_json(self.refs))
+
+    def commit(self, workflow):
+        """Store a workflow version; returns (version hash, blobs written)
+
+        Call save_refs() after a batch of commits.
+        """
+        manifest, blobs = split_workflow(workflow)
+        version = version_hash(manifest)
+        written = 0
+        if not self._version_path(version).exists():
+            for blob, value in blobs.items():
+                path = self._blob_path(blob)
+                if not path.exists():
+                    self._write(path, canonical_json(value))
+                    written += 1
+            self._write(self._version_path(version), canonical_json(manifest))
+
+        ref = self.refs.setdefault(workflow_identity(workflow), {'versions': [], 'pushed': {}})
+        if not ref['versions'] or ref['versions'][-1] != version:
+            ref['versions'].append(version)
+        return version, written
+
+    def manifest(self, version):
+        return json.loads(self._version_path(version).read_text(encoding='utf-8'))
+
+    def blob(self, blob):
+        return json.loads(self._blob_path(blob).read_text(encoding='utf-8'))
+
+    def resolve(self, prefix):
+        """Full version hash for a unique prefix, or None"""
+        matches = [path.stem for path in (self.root / 'versions').glob(f"{prefix}*.json")]
+        return matches[0] if len(matches) == 1 else None
+
+    def checkout(self, version):
+        """Rebuild the workflow document for a version"""
+        manifest = self.manifest(version)
+        workflow = {'id': manifest['id']} if 'id' in manifest else {}
+        workflow['name'] = manifest['name']
+        workflow.update(self.blob(manifest['rest']))
+        workflow['nodes'] = [dict(self.blob(blob), name=name) for name, blob in manifest['nodes']]
+        workflow['connections'] = {source: self.blob(blob)
+                                   for source, blob in manifest['connections'].items()}
+        workflow['settings'] = self.blob(manifest['settings'])
+        return workflow
+
+    def pushed(self, identity, target):
+        return self.refs.get(identity, {}).get('pushed', {}).get(target)
+
+    def mark_pushed(self, identity, target, version):
+        ref = self.refs.setdefault(identity, {'versions': [version], 'pushed': {}})
+        ref['pushed'][target] = version
+
+    def diff(self, old, new):
+        """Structural diff between two versions, read from manifests and hashes
+
+        Only the connection blobs of nodes whose wiring changed are loaded,
+        so the cost follows the size of the change. Returns a dict of
+        sorted lists: added, removed, changed and renamed ([old, new])
+        nodes, added and removed connection edges, and whether settings or
+        the remaining fields differ.
+        """
+        a, b = self.manifest(old), self.manifest(new)
+        a_nodes, b_nodes = dict(a['nodes']), dict(b['nodes'])
+        added = b_nodes.keys() - a_nodes.keys()
+        removed = a_nodes.keys() - b_nodes.keys()
+        changed = sorted(name for name in a_nodes.keys() & b_nodes.keys()
+                         if a_nodes[name] != b_nodes[name])
+
+        # A removed and an added node with the same blob is a rename
+        removed_by_blob = {a_nodes[name]: name for name in removed}
+        renamed = []
+        for name in sorted(added):
+            old_name = removed_by_blob.pop(b_nodes[name], None)
+            if old_name is not None:
+                renamed.append([old_name, name])
+        renamed_old = {old_name for old_name, _ in renamed}
+        renamed_new = {new_name for _, new_name in renamed}
+
+        a_conn, b_conn = a['connections'], b['connections']
+        rewired = {source for source in a_conn.keys() | b_conn.keys()
+                   if a_conn.get(source) != b_conn.get(source)}
+        old_edges, new_edges = set(), set()
+        for source in rewired:
+            if source in a_conn:
+                old_edges |= _edges(source, self.blob(a_conn[source]))
+            if source in b_conn:
+                new_edges |= _edges(source, self.blob(b_conn[source]))
+
+        return {
+            'name': [a['name'], b['name']] if a['name'] != b['name'] else None,
+            'added': sorted(added - renamed_new),
+            'removed': sorted(removed - renamed_old),
+            'renamed': renamed,
+            'changed': changed,
+            'connections_added': sorted(new_edges - old_edges),
+            'connections_removed': sorted(old_edges - new_edges),
+            'settings': a['settings'] != b['settings'],
+            'rest': a['rest'] != b['rest'],
+        }
+
+    def changed_fields(self, old_blob, new_blob):
+        """Top-level keys that differ between two node blobs"""
+        a, b = self.blob(old_blob), self.blob(new_blob)
+        return sorted(key for key in a.keys() | b.keys() if a.get(key) != b.get(key))
+
+
+def summarize_diff(diff):
+    """One-line description of a diff() result"""
+    parts = []
+    for key in ('added', 'removed', 'renamed', 'changed'):
+        if diff[key]:
+            parts.append(f"{len(diff[key])} node{'s' if len(diff[key]) != 1 else ''} {key}")
+    rewired = len(diff['connections_added']) + len(diff['connections_removed'])
+    if rewired:
+        parts.append(f"{rewired} connection{'s' if rewired != 1 else ''} rewired")
+    if diff['settings']:
+        parts.append('settings changed')
+    if diff['name']:
+        parts.append(f"renamed from {diff['name'][0]!r}")
+    return ', '.join(parts) or 'no structural change'
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+
+"""
+Benchmark the Python validators against a synthetic large-site corpus
+Reports per-phase timings, throughput and peak RSS, and fails on regressions
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+from tpp_audit.bench import (
+    CORPUS_SIZES,
+    DEFAULT_TIMEOUT,
+    SITEMAP_URLS,
+    VALIDATORS,
+    BenchmarkError,
+    compare_to_baseline,
+    ensure_corpus,
+    run_benchmark,
+)
+
+SCRIPTS_DIR = Path(__file__).parent
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark the site validators')
+    parser.add_argument('--size', choices=CORPUS_SIZES, default='1k',
+                        help='Corpus size (default: 1k)')
+    parser.add_argument('--validators', default=','.join(VALIDATORS),
+                        help=f"Comma-separated validators (default: {','.join(VALIDATORS)})")
+    parser.add_argument('--corpus-dir', type=Path, default=SCRIPTS_DIR / '.cache' / 'bench',
+                        help='Where generated corpora are kept')
+    parser.add_argument('--seed', type=int, default=1, help='Corpus RNG seed (default: 1)')
+    parser.add_argument('--body-kb', type=int, default=8,
+                        help='Approximate body size per page in KiB (default: 8)')
+    parser.add_argument('--sitemap-urls', type=int, default=SITEMAP_URLS,
+                        help=f'URLs in the synthetic sitemap (default: {SITEMAP_URLS})')
+    parser.add_argument('--baseline', type=Path, default=SCRIPTS_DIR / 'bench-baseline.json',
+                        help='Baseline results file')
+    parser.add_argument('--save-baseline', action='store_true',
+                        help='Store these results as the new baseline for this corpus')
+    parser.add_argument('--require-baseline', action='store_true',
+                        help='Fail when this corpus or a validator has no baseline (for CI)')
+    parser.add_argument('--tolerance', type=float, default=0.2,
+                        help='Allowed slowdown / RSS growth before failing (default: 0.2)')
+    parser.add_argument('--timeout', type=float, default=DEFAULT_TIMEOUT,
+                        help=f'Seconds each validator may run (default: {DEFAULT_TIMEOUT:g})')
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    names = [name.strip() for name in args.validators.split(',') if name.strip()]
+
+    unknown = [name for name in names if name not in VALIDATORS]
+    if unknown:
+        print(f"❌ Unknown validator(s): {', '.join(unknown)}")
+        return 2
+
+    pages = CORPUS_SIZES[args.size]
+    corpus_dir = args.corpus_dir / f"{args.size}-seed{args.seed}"
+
+    print(f"🏗️  Preparing {args.size} corpus ({pages} pages, {args.sitemap_urls} sitemap URLs)...")
+    ensure_corpus(corpus_dir, pages, seed=args.seed, body_kb=args.body_kb,
+                  sitemap_urls=args.sitemap_urls)
+    print(f"   {corpus_dir}\n")
+
+    results = {}
+    for name in names:
+        try:
+            result = run_benchmark(name, corpus_dir, timeout=args.timeout)
+        except BenchmarkError as e:
+            print(f"❌ {e}\n\n❌ Benchmark FAILED\n")
+            return 1
+        results[name] = result
+
+        print(f"📊 {name} ({result['files']} files, {result['bytes'] / 1024 / 1024:.1f} MiB)")
+        for phase, seconds in result['phases'].items():
+            print(f"   {phase:<12} {seconds:8.3f}s")
+        print(f"   {'total':<12} {result['total']:8.3f}s")
+        print(f"   {result['files_per_sec']:.1f} files/s, {result['mb_per_sec']:.1f} MiB/s, "
+              f"peak RSS {result['peak_rss_kb'] / 1024:.1f} MiB\n")
+
+    corpus_key = f"{args.size}-seed{args.seed}-body{args.body_kb}-urls{args.sitemap_urls}"
+    stored = json.loads(args.baseline.read_text()) if args.baseline.exists() else {}
+
+    if args.save_baseline:
+        stored[corpus_key] = {
+            name: {'files_per_sec': result['files_per_sec'], 'peak_rss_kb': result['peak_rss_kb']}
+            for name, result in results.items()
+        }
+        args.baseline.write_text(json.dumps(stored, indent=2) + '\n')
+        print(f"💾 Baseline saved to {args.baseline}\n")
+        return 0
+
+    baseline = stored.get(corpus_key) or {}
+    missing = [name for name in names if name not in baseline]
+    if missing and args.require_baseline:
+        print(f"❌ No baseline for {', '.join(missing)} on this corpus "
+              f"(run with --save-baseline)\n\n❌ Benchmark FAILED\n")
+        return 1
+    if not baseline:
+        print("⚠️  No baseline for this corpus (run with --save-baseline)\n")
+        return 0
+
+    regressions = compare_to_baseline(results, baseline, args.tolerance)
+    if regressions:
+        print("❌ Performance regressions:")
+        for regression in regressions:
+            print(f"   - {regression}")
+        print("\n❌ Benchmark FAILED\n")
+        return 1
+
+    print("✅ Benchmark within baseline\n")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
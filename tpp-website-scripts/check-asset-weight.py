@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+
+"""
+Check per-page asset weight
+Resolves every page's CSS, JS, images, fonts and og:image against the build
+output and reports missing assets and pages over their transfer budgets
+"""
+
+import argparse
+import statistics
+import sys
+from pathlib import Path
+
+from tpp_audit.assets import (
+    CACHE_NAMESPACE,
+    DEFAULT_BUDGETS,
+    KINDS,
+    extract_assets,
+    format_size,
+    parse_size,
+    weigh_pages,
+)
+from tpp_audit.cache import CachedCheck, add_cache_arguments, finish_cache
+from tpp_audit.discovery import discover_html_files
+from tpp_audit.pool import map_in_pool
+from tpp_audit.profiling import (
+    NULL_TIMER,
+    ProfiledCheck,
+    add_profile_arguments,
+    maybe_cprofile,
+    print_profile,
+)
+from tpp_audit.urls import SITE_URL
+
+def check_assets_file(html_file, data, timer=NULL_TIMER):
+    """Extract the asset references from an already-read HTML file"""
+    assets = extract_assets(data)
+    timer.lap('parse:assets')
+    return assets
+
+def parse_budget(value):
+    name, sep, size = value.partition('=')
+    if not sep or name not in DEFAULT_BUDGETS:
+        raise argparse.ArgumentTypeError(
+            f"expected NAME=SIZE with NAME one of {', '.join(DEFAULT_BUDGETS)}")
+    try:
+        return name, parse_size(size)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e))
+
+def parse_args(argv=None):
+    defaults = ', '.join(f"{name}={format_size(size)}" for name, size in DEFAULT_BUDGETS.items())
+    parser = argparse.ArgumentParser(description='Check per-page asset weight against budgets')
+    parser.add_argument('--root', type=Path, default=Path(__file__).parent.parent,
+                        help='Site root to scan (default: repository root)')
+    parser.add_argument('-r', '--recursive', action='store_true',
+                        help='Scan subdirectories (local/, power/, blog/, ...)')
+    parser.add_argument('--include', action='append', metavar='GLOB',
+                        help='Only check files matching GLOB (repeatable, default: *.html)')
+    parser.add_argument('--exclude', action='append', metavar='GLOB', default=[],
+                        help='Skip files or directories matching GLOB (repeatable)')
+    parser.add_argument('-j', '--jobs', type=int, default=1,
+                        help='Worker processes (0 = all cores, default: 1)')
+    parser.add_argument('--site-url', default=SITE_URL,
+                        help=f'Absolute URLs on this site are checked too (default: {SITE_URL})')
+    parser.add_argument('--budget', action='append', type=parse_budget, default=[],
+                        metavar='NAME=SIZE',
+                        help=f'Override a budget, e.g. js=250KB (repeatable; defaults: {defaults})')
+    parser.add_argument('--top', type=int, default=10,
+                        help='Show the N heaviest pages (default: 10, 0 to hide)')
+    add_cache_arguments(parser)
+    add_profile_arguments(parser)
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    budgets = dict(DEFAULT_BUDGETS, **dict(args.budget))
+
+    print("🔍 Checking asset weight...\n")
+
+    root_dir = args.root
+    html_files = discover_html_files(root_dir, recursive=args.recursive,
+                                     include=args.include, exclude=args.exclude)
+
+    if not html_files:
+        print("⚠️  No HTML files found")
+        return 0
+
+    # Extraction runs in the workers; the asset graph is shared, so it is built here
+    if args.profile:
+        checker = ProfiledCheck(check_assets_file)
+    else:
+        checker = CachedCheck(check_assets_file, CACHE_NAMESPACE, enabled=not args.no_cache)
+
+    with maybe_cprofile(args.profile_out) as profiled:
+        outcomes = map_in_pool(profiled(checker), html_files, jobs=args.jobs)
+
+    labels = [html_file.relative_to(root_dir).as_posix() for html_file in html_files]
+    graph, weights = weigh_pages(root_dir, labels, [outcome[0] for outcome in outcomes],
+                                 args.site_url)
+
+    over_pages = 0
+    for weight in weights:
+        over = weight.over_budget(budgets)
+        if not over and not weight.missing:
+            continue
+        over_pages += bool(over)
+
+        print(f"📄 {weight.path} ({format_size(weight.total)})")
+        for name, size, budget in over:
+            print(f"  ❌ {name}: {format_size(size)} over budget of {format_size(budget)}")
+        if weight.missing:
+            print(f"  ❌ {len(weight.missing)} missing assets:")
+            for kind, href in weight.missing:
+                print(f"    - {kind}: {href}")
+        print()
+
+    css_missing = sum(len(missing) for missing in graph.css_missing.values())
+    if css_missing:
+        print(f"🎨 {css_missing} missing assets referenced from stylesheets:")
+        for asset_id, missing in graph.css_missing.items():
+            for kind, href in missing:
+                print(f"    - {graph.paths[asset_id]}: {kind} {href}")
+        print()
+
+    if args.top > 0:
+        ranked = sorted(weights, key=lambda weight: (-weight.total, weight.path))
+        print(f"🏋️  Heaviest pages:")
+        for weight in ranked[:args.top]:
+            parts = ', '.join(f"{kind} {format_size(weight.by_kind[kind])}"
+                              for kind in KINDS if weight.by_kind[kind])
+            print(f"   {format_size(weight.total):>10}  {weight.path} ({parts})")
+        print()
+
+    missing = sum(len(weight.missing) for weight in weights) + css_missing
+    print(f"📊 Summary:")
+    print(f"   Files checked: {len(html_files)}")
+    print(f"   Assets: {len(graph.paths) - len(html_files)} "
+          f"({graph.stats} files stat'ed, pages included)")
+    print(f"   Median page weight: {format_size(int(statistics.median(w.total for w in weights)))}")
+    print(f"   External assets (not weighed): {sum(weight.external for weight in weights)}")
+    print(f"   Pages over budget: {over_pages}")
+    print(f"   Missing assets: {missing}\n")
+
+    if args.profile:
+        print_profile(labels, [outcome[1] for outcome in outcomes], top=args.profile_top)
+    else:
+        finish_cache(checker, outcomes, show_stats=args.cache_stats)
+
+    if over_pages or missing:
+        print("❌ Asset weight check FAILED\n")
+        return 1
+    else:
+        print("✅ Asset weight check PASSED\n")
+        return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
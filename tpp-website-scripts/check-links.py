@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+
+"""
+Check internal links in HTML files
+Resolves every href/src against the build output (honouring _redirects)
+and reports broken links, orphan pages and inbound link counts
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+from tpp_audit.cache import CachedCheck, add_cache_arguments, finish_cache
+from tpp_audit.discovery import discover_html_files
+from tpp_audit.links import CACHE_NAMESPACE, build_graph, extract_links
+from tpp_audit.pool import map_in_pool
+from tpp_audit.profiling import (
+    NULL_TIMER,
+    ProfiledCheck,
+    add_profile_arguments,
+    maybe_cprofile,
+    print_profile,
+)
+from tpp_audit.urls import SITE_URL
+
+def check_links_file(html_file, data, timer=NULL_TIMER):
+    """Extract the links from an already-read HTML file"""
+    links = extract_links(data)
+    timer.lap('parse:links')
+    return links
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Check internal links against the build output')
+    parser.add_argument('--root', type=Path, default=Path(__file__).parent.parent,
+                        help='Site root to scan (default: repository root)')
+    parser.add_argument('-r', '--recursive', action='store_true',
+                        help='Scan subdirectories (local/, power/, blog/, ...)')
+    parser.add_argument('--include', action='append', metavar='GLOB',
+                        help='Only check files matching GLOB (repeatable, default: *.html)')
+    parser.add_argument('--exclude', action='append', metavar='GLOB', default=[],
+                        help='Skip files or directories matching GLOB (repeatable)')
+    parser.add_argument('-j', '--jobs', type=int, default=1,
+                        help='Worker processes (0 = all cores, default: 1)')
+    parser.add_argument('--site-url', default=SITE_URL,
+                        help=f'Absolute links to this site count as internal (default: {SITE_URL})')
+    parser.add_argument('--top', type=int, default=10,
+                        help='Show the N most linked-to pages (default: 10, 0 to hide)')
+    parser.add_argument('--show-redirects', action='store_true',
+                        help='Also list links that only resolve through _redirects')
+    add_cache_arguments(parser)
+    add_profile_arguments(parser)
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    print("🔍 Checking internal links...\n")
+
+    root_dir = args.root
+    html_files = discover_html_files(root_dir, recursive=args.recursive,
+                                     include=args.include, exclude=args.exclude)
+
+    if not html_files:
+        print("⚠️  No HTML files found")
+        return 0
+
+    # Extraction runs in the workers; resolution needs every page, so it runs here
+    if args.profile:
+        checker = ProfiledCheck(check_links_file)
+    else:
+        checker = CachedCheck(check_links_file, CACHE_NAMESPACE, enabled=not args.no_cache)
+
+    with maybe_cprofile(args.profile_out) as profiled:
+        outcomes = map_in_pool(profiled(checker), html_files, jobs=args.jobs)
+
+    labels = [html_file.relative_to(root_dir).as_posix() for html_file in html_files]
+    graph = build_graph(root_dir, labels, [outcome[0] for outcome in outcomes], args.site_url)
+    counts = graph.inbound_counts()
+    orphans = graph.orphans(counts)
+
+    broken_by_page = {}
+    for page_id, href, path, chain in graph.broken:
+        broken_by_page.setdefault(page_id, []).append((href, path, chain))
+    redirected_by_page = {}
+    for page_id, href, chain in graph.redirected:
+        redirected_by_page.setdefault(page_id, []).append((href, chain))
+
+    for page_id, label in enumerate(labels):
+        broken = broken_by_page.get(page_id, [])
+        redirected = redirected_by_page.get(page_id, []) if args.show_redirects else []
+        if not broken and not redirected:
+            continue
+
+        print(f"📄 {label}")
+        if broken:
+            print(f"  ❌ {len(broken)} broken links:")
+            for href, path, chain in broken:
+                via = f" (redirects: {' -> '.join(chain)})" if chain else ''
+                print(f"    - {href}{via}")
+        if redirected:
+            print(f"  ⚠️  {len(redirected)} links through redirects:")
+            for href, chain in redirected:
+                print(f"    - {href} -> {' -> '.join(chain)}")
+        print()
+
+    if orphans:
+        print(f"🏝️  {len(orphans)} orphan pages (no inbound links):")
+        for page_id in orphans:
+            print(f"    - {labels[page_id]}")
+        print()
+
+    if args.top > 0:
+        ranked = sorted(range(len(labels)), key=lambda page_id: (-counts[page_id], page_id))
+        print(f"🔗 Most linked-to pages:")
+        for page_id in ranked[:args.top]:
+            print(f"   {counts[page_id]:>5}  {labels[page_id]}")
+        print()
+
+    print(f"📊 Summary:")
+    print(f"   Files checked: {len(html_files)}")
+    print(f"   Internal links: {len(graph.sources)}")
+    if graph.redirected:
+        print(f"   Links through redirects: {len(graph.redirected)}")
+    print(f"   Orphan pages: {len(orphans)}")
+    print(f"   Broken links: {len(graph.broken)}\n")
+
+    if args.profile:
+        print_profile(labels, [outcome[1] for outcome in outcomes], top=args.profile_top)
+    else:
+        finish_cache(checker, outcomes, show_stats=args.cache_stats)
+
+    if graph.broken:
+        print("❌ Link check FAILED\n")
+        return 1
+    else:
+        print("✅ Link check PASSED\n")
+        return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
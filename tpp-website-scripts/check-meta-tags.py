@@ -5,89 +5,131 @@ Check meta tags in HTML files
 Validates SEO-critical meta tags
 """
 
+import argparse
+import os
 import sys
 from pathlib import Path
-from bs4 import BeautifulSoup
 
-REQUIRED_META_TAGS = [
-    ('name', 'description'),
-    ('property', 'og:title'),
-    ('property', 'og:description'),
-    ('property', 'og:image'),
-    ('property', 'og:url'),
-    ('name', 'twitter:card'),
-]
-
-REQUIRED_ELEMENTS = [
-    'title',
-]
+from tpp_audit.cache import CachedCheck, add_cache_arguments, finish_cache
+from tpp_audit.discovery import discover_html_files
+from tpp_audit.headparse import extract_head, extract_head_text
+from tpp_audit.meta import check_head, evaluate_head, load_rules
+from tpp_audit.pool import map_in_pool
+from tpp_audit.profiling import (
+    NULL_TIMER,
+    ProfiledCheck,
+    add_profile_arguments,
+    maybe_cprofile,
+    print_profile,
+)
 
 def check_html_file(html_file):
     """Check meta tags in an HTML file"""
-    with open(html_file, 'r', encoding='utf-8') as f:
-        soup = BeautifulSoup(f, 'html.parser')
-
-    errors = []
-
-    # Check title
-    title = soup.find('title')
-    if not title or not title.string or len(title.string.strip()) == 0:
-        errors.append("Missing or empty <title> tag")
-    elif len(title.string) < 30:
-        errors.append(f"Title too short: {len(title.string)} chars (min 30)")
-    elif len(title.string) > 60:
-        errors.append(f"Title too long: {len(title.string)} chars (max 60)")
-
-    # Check required meta tags
-    for attr_name, attr_value in REQUIRED_META_TAGS:
-        meta = soup.find('meta', attrs={attr_name: attr_value})
-        if not meta:
-            errors.append(f"Missing meta tag: {attr_name}=\"{attr_value}\"")
-        elif attr_name == 'name' and attr_value == 'description':
-            content = meta.get('content', '')
-            if len(content) < 120:
-                errors.append(f"Description too short: {len(content)} chars (min 120)")
-            elif len(content) > 160:
-                errors.append(f"Description too long: {len(content)} chars (max 160)")
-
-    # Check canonical URL
-    canonical = soup.find('link', rel='canonical')
-    if not canonical:
-        errors.append("Missing canonical URL")
-
-    return errors
-
-def main():
+    return check_head(extract_head(html_file))
+
+class MetaFileCheck:
+    """Picklable per-file check that applies the rules for the file's directory
+
+    Returns [[severity, message], ...] for an already-read HTML file.
+    """
+
+    def __init__(self, root_dir):
+        self.root_dir = Path(root_dir)
+
+    def relative(self, html_file):
+        return Path(html_file).relative_to(self.root_dir).as_posix()
+
+    def cache_variant(self, html_file):
+        return load_rules().override_key(self.relative(html_file))
+
+    def __call__(self, html_file, data, timer=NULL_TIMER):
+        head = extract_head_text(data.decode('utf-8'))
+        timer.lap('parse')
+        return evaluate_head(head, self.relative(html_file), timer)
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Check SEO meta tags in HTML files')
+    parser.add_argument('--root', type=Path, default=Path(__file__).parent.parent,
+                        help='Site root to scan (default: repository root)')
+    parser.add_argument('-r', '--recursive', action='store_true',
+                        help='Scan subdirectories (local/, power/, blog/, ...)')
+    parser.add_argument('--include', action='append', metavar='GLOB',
+                        help='Only check files matching GLOB (repeatable, default: *.html)')
+    parser.add_argument('--exclude', action='append', metavar='GLOB', default=[],
+                        help='Skip files or directories matching GLOB (repeatable)')
+    parser.add_argument('-j', '--jobs', type=int, default=1,
+                        help='Worker processes (0 = all cores, default: 1)')
+    parser.add_argument('--rules', type=Path,
+                        help='Rules file (default: meta-rules.json, or $TPP_META_RULES)')
+    add_cache_arguments(parser)
+    add_profile_arguments(parser)
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    if args.rules:
+        # Exported so worker processes load the same rules
+        os.environ['TPP_META_RULES'] = str(args.rules.resolve())
+
     print("🔍 Checking meta tags...\n")
 
-    root_dir = Path(__file__).parent.parent
-    html_files = list(root_dir.glob('*.html'))
+    root_dir = args.root
+    html_files = discover_html_files(root_dir, recursive=args.recursive,
+                                     include=args.include, exclude=args.exclude)
 
     if not html_files:
         print("⚠️  No HTML files found")
         return 0
 
     total_errors = 0
+    total_warnings = 0
+
+    # Results come back in discovery order, so output is stable across --jobs
+    file_check = MetaFileCheck(root_dir)
+    if args.profile:
+        checker = ProfiledCheck(file_check)
+    else:
+        checker = CachedCheck(file_check, load_rules().namespace, enabled=not args.no_cache,
+                              variant=file_check.cache_variant)
 
-    for html_file in html_files:
-        print(f"📄 {html_file.name}")
+    with maybe_cprofile(args.profile_out) as profiled:
+        outcomes = map_in_pool(profiled(checker), html_files, jobs=args.jobs)
 
-        errors = check_html_file(html_file)
+    labels = [html_file.relative_to(root_dir).as_posix() for html_file in html_files]
+
+    for label, (findings, *_) in zip(labels, outcomes):
+        print(f"📄 {label}")
+
+        errors = [message for severity, message in findings if severity == 'error']
+        warnings = [message for severity, message in findings if severity != 'error']
 
         if errors:
             print(f"  ❌ {len(errors)} issues found:")
             for error in errors:
                 print(f"    - {error}")
             total_errors += len(errors)
-        else:
+        if warnings:
+            print(f"  ⚠️  {len(warnings)} warnings:")
+            for warning in warnings:
+                print(f"    - {warning}")
+            total_warnings += len(warnings)
+        if not findings:
             print(f"  ✓ All meta tags present")
 
         print()
 
     print(f"📊 Summary:")
     print(f"   Files checked: {len(html_files)}")
+    if total_warnings:
+        print(f"   Total warnings: {total_warnings}")
     print(f"   Total errors: {total_errors}\n")
 
+    if args.profile:
+        print_profile(labels, [outcome[1] for outcome in outcomes], top=args.profile_top)
+    else:
+        finish_cache(checker, outcomes, show_stats=args.cache_stats)
+
     if total_errors > 0:
         print("❌ Meta tag check FAILED\n")
         return 1
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+
+"""
+Find near-duplicate pages
+Compares the main body text of every page by MinHash signatures and
+locality-sensitive hashing, and reports clusters of templated pages
+(local/, power/) whose content is above a similarity threshold
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+from tpp_audit.cache import CachedCheck, add_cache_arguments, finish_cache
+from tpp_audit.discovery import discover_html_files
+from tpp_audit.pool import map_in_pool
+from tpp_audit.profiling import (
+    NULL_TIMER,
+    ProfiledCheck,
+    add_profile_arguments,
+    maybe_cprofile,
+    print_profile,
+)
+from tpp_audit.similarity import (
+    CACHE_NAMESPACE,
+    DEFAULT_THRESHOLD,
+    SimilarityIndex,
+    decode_signature,
+    page_signature,
+    similarity,
+)
+
+def check_similarity_file(html_file, data, timer=NULL_TIMER):
+    """Word count and MinHash signature of an already-read HTML file"""
+    facts = page_signature(data)
+    timer.lap('signature')
+    return facts
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Find pages with near-duplicate body text')
+    parser.add_argument('--root', type=Path, default=Path(__file__).parent.parent,
+                        help='Site root to scan (default: repository root)')
+    parser.add_argument('-r', '--recursive', action='store_true',
+                        help='Scan subdirectories (local/, power/, blog/, ...)')
+    parser.add_argument('--include', action='append', metavar='GLOB',
+                        help='Only check files matching GLOB (repeatable, default: *.html)')
+    parser.add_argument('--exclude', action='append', metavar='GLOB', default=[],
+                        help='Skip files or directories matching GLOB (repeatable)')
+    parser.add_argument('-j', '--jobs', type=int, default=1,
+                        help='Worker processes (0 = all cores, default: 1)')
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help=f'Similarity at which pages count as near-duplicates '
+                             f'(0-1, default: {DEFAULT_THRESHOLD})')
+    parser.add_argument('--show', type=int, default=10,
+                        help='Pages listed per cluster (default: 10, 0 for all)')
+    add_cache_arguments(parser)
+    add_profile_arguments(parser)
+    args = parser.parse_args(argv)
+    if not 0 < args.threshold <= 1:
+        parser.error('--threshold must be between 0 and 1')
+    return args
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    print("🔍 Checking for near-duplicate content...\n")
+
+    root_dir = args.root
+    html_files = discover_html_files(root_dir, recursive=args.recursive,
+                                     include=args.include, exclude=args.exclude)
+
+    if not html_files:
+        print("⚠️  No HTML files found")
+        return 0
+
+    # Signatures are computed (and cached) in the workers; clustering needs them all
+    if args.profile:
+        checker = ProfiledCheck(check_similarity_file)
+    else:
+        checker = CachedCheck(check_similarity_file, CACHE_NAMESPACE, enabled=not args.no_cache)
+
+    with maybe_cprofile(args.profile_out) as profiled:
+        outcomes = map_in_pool(profiled(checker), html_files, jobs=args.jobs)
+
+    labels = [html_file.relative_to(root_dir).as_posix() for html_file in html_files]
+    index = SimilarityIndex(args.threshold)
+    skipped = []
+    for page_id, outcome in enumerate(outcomes):
+        if outcome[0]['signature'] is None:
+            skipped.append(page_id)
+        else:
+            index.add(page_id, decode_signature(outcome[0]['signature']))
+    clusters = index.clusters()
+
+    for page_ids, lowest in clusters:
+        first = index.signatures[page_ids[0]]
+        print(f"📑 {len(page_ids)} pages at least {lowest:.0%} similar to {labels[page_ids[0]]}:")
+        shown = page_ids[1:args.show] if args.show > 0 else page_ids[1:]
+        for page_id in shown:
+            print(f"    - {labels[page_id]} ({similarity(first, index.signatures[page_id]):.0%})")
+        if len(shown) < len(page_ids) - 1:
+            print(f"    ... and {len(page_ids) - 1 - len(shown)} more")
+        print()
+
+    if skipped:
+        print(f"⚠️  {len(skipped)} pages have too little body text to compare:")
+        for page_id in skipped:
+            print(f"    - {labels[page_id]}")
+        print()
+
+    duplicated = sum(len(page_ids) for page_ids, _ in clusters)
+    print(f"📊 Summary:")
+    print(f"   Files checked: {len(html_files)}")
+    print(f"   Threshold: {args.threshold:.0%} ({index.bands} bands of {index.rows})")
+    print(f"   Clusters: {len(clusters)}")
+    print(f"   Pages in clusters: {duplicated}\n")
+
+    if args.profile:
+        print_profile(labels, [outcome[1] for outcome in outcomes], top=args.profile_top)
+    else:
+        finish_cache(checker, outcomes, show_stats=args.cache_stats)
+
+    if clusters:
+        print("❌ Near-duplicate check FAILED\n")
+        return 1
+    else:
+        print("✅ Near-duplicate check PASSED\n")
+        return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+
+"""
+Generate sitemaps from the build output
+Lists every indexable, self-canonical page in sharded sitemaps plus an
+index, rewriting only the files whose content changed
+"""
+
+import argparse
+import sys
+from itertools import islice
+from pathlib import Path
+from urllib.parse import urlsplit
+
+from tpp_audit.cache import CacheTally, CachedCheck, add_cache_arguments
+from tpp_audit.discovery import iter_html_files
+from tpp_audit.pool import map_in_pool
+from tpp_audit.sitemap import MAX_BYTES, MAX_URLS, LocSet
+from tpp_audit.sitemapgen import (
+    CACHE_NAMESPACE,
+    DEFAULT_INDEX_NAME,
+    DEFAULT_SHARD_PREFIX,
+    LASTMOD_SOURCES,
+    LastmodState,
+    ShardedSitemapWriter,
+    exclusion_reason,
+    format_lastmod,
+    sitemap_page,
+)
+from tpp_audit.urls import SITE_URL, load_redirects, page_url_path, url_key
+
+# Pages are parsed this many at a time so memory stays flat on big sites
+BATCH_SIZE = 1000
+
+def batches(items, size):
+    items = iter(items)
+    while True:
+        batch = list(islice(items, size))
+        if not batch:
+            return
+        yield batch
+
+def max_urls(value):
+    count = int(value)
+    if not 1 <= count <= MAX_URLS:
+        raise argparse.ArgumentTypeError(f"must be between 1 and {MAX_URLS}, got {value}")
+    return count
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Generate sitemaps from the build output')
+    parser.add_argument('--root', type=Path, default=Path(__file__).parent.parent,
+                        help='Build output / site root (default: repository root)')
+    parser.add_argument('--out', type=Path, required=True,
+                        help='Directory to write sitemaps to, e.g. a build directory')
+    parser.add_argument('--site-url', default=SITE_URL,
+                        help=f'Origin for <loc> values (default: {SITE_URL})')
+    parser.add_argument('--include', action='append', metavar='GLOB',
+                        help='Only list files matching GLOB (repeatable, default: *.html)')
+    parser.add_argument('--exclude', action='append', metavar='GLOB', default=[],
+                        help='Skip files or directories matching GLOB (repeatable)')
+    parser.add_argument('-j', '--jobs', type=int, default=1,
+                        help='Worker processes (0 = all cores, default: 1)')
+    parser.add_argument('--lastmod', choices=LASTMOD_SOURCES, default='hash',
+                        help='hash: moves only when page content changes; mtime: file '
+                             'modification time (default: hash)')
+    parser.add_argument('--state', type=Path,
+                        help='Content hash state for --lastmod hash '
+                             '(default: sitemap-state.sqlite3 next to the result cache)')
+    parser.add_argument('--gzip', action='store_true',
+                        help='Write .xml.gz shards')
+    parser.add_argument('--index-name', default=DEFAULT_INDEX_NAME,
+                        help=f'Sitemap index file name (default: {DEFAULT_INDEX_NAME})')
+    parser.add_argument('--prefix', default=DEFAULT_SHARD_PREFIX,
+                        help=f'Shard file name prefix (default: {DEFAULT_SHARD_PREFIX})')
+    parser.add_argument('--max-urls', type=max_urls, default=MAX_URLS,
+                        help=f'URLs per shard, at most {MAX_URLS} (default: {MAX_URLS})')
+    add_cache_arguments(parser)
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    print("🗺️  Generating sitemaps...\n")
+
+    root_dir = args.root
+    out_dir = args.out
+    out_dir.mkdir(parents=True, exist_ok=True)
+    # Discovery is consumed lazily, one batch at a time
+    html_files = iter_html_files(root_dir, include=args.include, exclude=args.exclude)
+
+    site_url = args.site_url.rstrip('/')
+    site_host = urlsplit(site_url).netloc.lower()
+    redirects = load_redirects(root_dir)
+    checker = CachedCheck(sitemap_page, CACHE_NAMESPACE, enabled=not args.no_cache)
+    state = LastmodState(args.state) if args.lastmod == 'hash' else None
+    writer = ShardedSitemapWriter(out_dir, site_url, prefix=args.prefix, gzipped=args.gzip,
+                                  max_urls=args.max_urls, max_bytes=MAX_BYTES)
+
+    seen = LocSet()
+    skipped = {'noindex': 0, 'non-canonical': 0, 'redirected': 0, 'duplicate': 0}
+    tally = CacheTally(checker)
+    scanned = 0
+    listed = 0
+
+    for batch in batches(html_files, BATCH_SIZE):
+        outcomes = map_in_pool(checker, batch, jobs=args.jobs)
+        tally.add(outcomes)
+        scanned += len(batch)
+        for html_file, (facts, _, _) in zip(batch, outcomes):
+            url_path = page_url_path(html_file.relative_to(root_dir).as_posix())
+            key = url_key(url_path)
+
+            reason = exclusion_reason(url_path, facts, site_host)
+            if reason is None:
+                rule = redirects.get(key)
+                # Unforced rules only apply when no file matches
+                if rule is not None and rule[1].endswith('!'):
+                    reason = 'redirected'
+            if reason is None and seen.add(key):
+                reason = 'duplicate'
+            if reason is not None:
+                skipped[reason] += 1
+                continue
+
+            loc = site_url + url_path
+            mtime = html_file.stat().st_mtime
+            if state is not None:
+                lastmod = state.lastmod(loc, facts['hash'], mtime)
+            else:
+                lastmod = format_lastmod(mtime)
+            writer.add(loc, lastmod)
+            listed += 1
+
+    if not listed:
+        # An empty <sitemapindex> is invalid, so the existing files are left alone
+        tally.finish(show_stats=args.cache_stats)
+        if not scanned:
+            print("❌ No HTML files found\n")
+        else:
+            print(f"❌ None of the {scanned} pages can be listed; sitemaps left unchanged\n")
+        return 1
+
+    shards, index_written, removed = writer.close(args.index_name)
+    if state is not None:
+        state.finish()
+
+    for name, newest, written in shards:
+        print(f"  {'✏️  Wrote' if written else '✓ Unchanged'} {name}")
+    print(f"  {'✏️  Wrote' if index_written else '✓ Unchanged'} {args.index_name}")
+    for name in removed:
+        print(f"  🗑️  Removed {name}")
+    print()
+
+    print(f"📊 Summary:")
+    print(f"   Pages scanned: {scanned}")
+    print(f"   URLs listed: {listed} in {len(shards)} sitemaps")
+    for reason, count in skipped.items():
+        if count:
+            print(f"   Skipped ({reason}): {count}")
+    print(f"   Files written: {sum(written for _, _, written in shards) + index_written}\n")
+
+    tally.finish(show_stats=args.cache_stats)
+
+    print("✅ Sitemap generation complete\n")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+
+"""
+Semrush audit comparison
+Loads Semrush site audit exports, diffs two crawls per page and per issue
+(fixed, introduced, still open), and joins the newest crawl with the meta
+tag and schema validators' findings for the build
+"""
+
+import argparse
+import heapq
+import sys
+import time
+from pathlib import Path
+
+from tpp_audit.cache import add_cache_arguments, finish_cache
+from tpp_audit.discovery import discover_html_files
+from tpp_audit.runner import ERROR, run_audit
+from tpp_audit.semrush import (
+    AuditSnapshot,
+    ExportError,
+    compare_audits,
+    diff_snapshots,
+    find_exports,
+    join_findings,
+    page_changes,
+    read_table,
+)
+from tpp_audit.urls import page_url_path, url_key
+
+# Validators joined with the crawl (check-meta-tags.py and validate-schema.py)
+LOCAL_CHECKS = ['meta', 'schema']
+
+ISSUE_ICONS = {'ERROR': '❌', 'WARNING': '⚠️ ', 'NOTICE': 'ℹ️ '}
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Compare Semrush audits and join them with the validators')
+    parser.add_argument('--exports', type=Path, default=Path(__file__).parent.parent,
+                        help='Directory holding the Semrush CSV exports (default: repository root)')
+    parser.add_argument('--root', type=Path, default=Path(__file__).parent.parent,
+                        help='Site root for the validators (default: repository root)')
+    parser.add_argument('--old', metavar='YYYYMMDD',
+                        help='Older crawl (default: the one before --new)')
+    parser.add_argument('--new', metavar='YYYYMMDD',
+                        help='Newer crawl (default: the latest export)')
+    parser.add_argument('--top', type=int, default=20,
+                        help='Pages listed per section (default: 20)')
+    parser.add_argument('--no-local', action='store_true',
+                        help="Skip running the validators on the build")
+    parser.add_argument('-j', '--jobs', type=int, default=1,
+                        help='Worker processes for the validators (0 = all cores, default: 1)')
+    add_cache_arguments(parser)
+    return parser.parse_args(argv)
+
+def pick_crawls(exports, old, new):
+    """(old date or None, new date) among crawls that have a mega export"""
+    dates = sorted(date for date, paths in exports.items() if 'mega_export' in paths)
+    if not dates:
+        raise ExportError("No *_mega_export_*.csv files found")
+    new = new or dates[-1]
+    if new not in exports:
+        raise ExportError(f"No exports for {new}")
+    if old is None:
+        older = [date for date in dates if date < new]
+        old = older[-1] if older else None
+    elif old not in exports:
+        raise ExportError(f"No exports for {old}")
+    return old, new
+
+def load_snapshot(date, paths):
+    started = time.perf_counter()
+    snapshot = AuditSnapshot.load(date, paths)
+    elapsed = (time.perf_counter() - started) * 1000
+    print(f"  ✓ {date}: {len(snapshot.keys)} rows, {len(snapshot.key_set)} URLs, "
+          f"{len(snapshot.counts)} issue types ({elapsed:.0f} ms)")
+    return snapshot
+
+def print_diff(old, new, top):
+    """Per-issue and per-page changes between two crawls; returns new errors"""
+    diffs = diff_snapshots(old, new)
+    print(f"📊 Audit diff {old.date} -> {new.date}:")
+    new_errors = 0
+    for diff in diffs:
+        if not (diff.fixed or diff.introduced or diff.still_open or diff.gone):
+            continue
+        icon = ISSUE_ICONS.get(diff.issue_type, '  ')
+        gone = f", {len(diff.gone)} no longer crawled" if diff.gone else ''
+        print(f"  {icon} {diff.issue}: {len(diff.fixed)} fixed, {len(diff.introduced)} new, "
+              f"{len(diff.still_open)} still open{gone}")
+        if diff.issue_type == 'ERROR':
+            new_errors += len(diff.introduced)
+    print()
+
+    changes = page_changes(diffs)
+    pages = changes['introduced'].keys() | changes['fixed'].keys()
+    ranked = heapq.nsmallest(top, pages, key=lambda key: (-changes['introduced'][key],
+                                                          -changes['fixed'][key], key))
+    if ranked:
+        print(f"📄 Pages that changed ({len(pages)}):")
+        for key in ranked:
+            print(f"  {key}: +{changes['introduced'][key]} new, {changes['fixed'][key]} fixed, "
+                  f"{changes['still_open'][key]} still open")
+        if len(pages) > top:
+            print(f"  ... and {len(pages) - top} more")
+        print()
+    return new_errors
+
+def print_semrush_compare(paths):
+    """Fallback for a single crawl: Semrush's own comparison with the previous one"""
+    if 'compare-audits' not in paths:
+        print("ℹ️  Only one crawl exported; nothing to compare\n")
+        return
+    moved, (old_label, new_label) = compare_audits(read_table(paths['compare-audits']))
+    print(f"📊 Semrush compare-audits ({old_label} -> {new_label}):")
+    for issue, old_count, new_count, delta in moved:
+        print(f"  {issue}: {old_count} -> {new_count} ({delta:+d})")
+    if not moved:
+        print("  ✓ No changes")
+    print()
+
+def local_findings(root_dir, jobs, use_cache, show_stats):
+    """url_key -> [errors, warnings] from the meta and schema validators"""
+    html_files = discover_html_files(root_dir, recursive=True)
+    page_results, _, cached_check = run_audit(root_dir, html_files, LOCAL_CHECKS,
+                                              jobs=jobs, use_cache=use_cache)
+    local = {}
+    for html_file, result, _, _ in page_results:
+        key = url_key(page_url_path(Path(html_file).relative_to(root_dir).as_posix()))
+        totals = local.setdefault(key, [0, 0])
+        for findings in result['findings'].values():
+            for severity, _ in findings:
+                totals[0 if severity == ERROR else 1] += 1
+    if page_results:
+        finish_cache(cached_check, [outcome[1:] for outcome in page_results], show_stats=show_stats)
+    return local
+
+def print_join(snapshot, local, top):
+    rows, crawl_only, build_only = join_findings(snapshot, local)
+    print(f"🔗 Crawl {snapshot.date} vs build ({', '.join(LOCAL_CHECKS)} validators):")
+    for key, issues, errors, warnings in rows[:top]:
+        print(f"  {key}: {issues} Semrush issues, {errors} errors, {warnings} warnings")
+    if len(rows) > top:
+        print(f"  ... and {len(rows) - top} more")
+    print()
+
+    if crawl_only:
+        print(f"🕳️  Crawled but not in the build ({len(crawl_only)}):")
+        for key in crawl_only[:top]:
+            status = snapshot.statuses.get(key)
+            print(f"  {key}" + (f" (HTTP {status})" if status else ''))
+        if len(crawl_only) > top:
+            print(f"  ... and {len(crawl_only) - top} more")
+        print()
+    return rows, crawl_only, build_only
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    print("📥 Loading Semrush exports...")
+    try:
+        exports = find_exports(args.exports)
+        old_date, new_date = pick_crawls(exports, args.old, args.new)
+        new = load_snapshot(new_date, exports[new_date])
+        old = load_snapshot(old_date, exports[old_date]) if old_date else None
+    except (OSError, ExportError) as e:
+        print(f"❌ {e}")
+        return 2
+    print()
+
+    new_errors = 0
+    if old is not None:
+        new_errors = print_diff(old, new, args.top)
+    else:
+        print_semrush_compare(exports[new_date])
+
+    joined = None
+    if not args.no_local:
+        local = local_findings(args.root, args.jobs, not args.no_cache, args.cache_stats)
+        joined = print_join(new, local, args.top)
+
+    print(f"📊 Summary:")
+    print(f"   Crawl: {new_date}" + (f" (compared with {old_date})" if old_date else ''))
+    print(f"   URLs crawled: {len(new.key_set)}")
+    if old is not None:
+        print(f"   New errors: {new_errors}")
+    if joined is not None:
+        rows, crawl_only, build_only = joined
+        print(f"   Pages in both: {len(rows)}")
+        print(f"   Crawled, not built: {len(crawl_only)}")
+        print(f"   Built, not crawled: {len(build_only)}")
+    print()
+
+    if new_errors:
+        print("❌ New Semrush errors since the previous crawl\n")
+        return 1
+    print("✅ Semrush comparison complete\n")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,29 @@
+"""
+Shared test setup: makes tpp_audit importable and keeps the result cache
+out of the working tree
+"""
+
+import importlib.util
+import sys
+from pathlib import Path
+
+import pytest
+
+SCRIPTS_DIR = Path(__file__).resolve().parent.parent
+
+if str(SCRIPTS_DIR) not in sys.path:
+    sys.path.insert(0, str(SCRIPTS_DIR))
+
+
+def load_script(name):
+    """Import a script whose file name is not a valid module name"""
+    spec = importlib.util.spec_from_file_location(
+        name.replace('-', '_'), SCRIPTS_DIR / f"{name}.py")
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+@pytest.fixture(autouse=True)
+def isolated_cache(tmp_path, monkeypatch):
+    monkeypatch.setenv('TPP_AUDIT_CACHE', str(tmp_path / 'results.sqlite3'))
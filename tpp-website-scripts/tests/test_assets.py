@@ -0,0 +1,142 @@
+"""
+Asset extraction, the shared asset graph and size parsing
+"""
+
+import pytest
+
+from tpp_audit.assets import AssetGraph, css_refs, extract_assets, parse_size, weigh_pages
+
+SITE = 'https://theprofitplatform.com.au'
+
+
+def build(root, files):
+    for rel_path, content in files.items():
+        path = root / rel_path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(content if isinstance(content, bytes) else b'x' * content)
+    return root
+
+
+def page(*assets, base=None, og_image=None):
+    return {'base': base, 'assets': [list(asset) for asset in assets], 'og_image': og_image}
+
+
+@pytest.mark.parametrize('text, size', [
+    ('2048', 2048),
+    ('900B', 900),
+    ('300KB', 300 * 1024),
+    ('300k', 300 * 1024),
+    ('1.5MB', 1536 * 1024),
+    (' 2 MiB ', 2 * 1024 * 1024),
+    ('0.5kb', 512),
+])
+def test_parse_size(text, size):
+    assert parse_size(text) == size
+
+
+@pytest.mark.parametrize('text', ['', 'KB', '1GB', '-1KB', '1.5.0MB', '10 bytes'])
+def test_parse_size_rejects(text):
+    with pytest.raises(ValueError, match='Invalid size'):
+        parse_size(text)
+
+
+def test_css_refs_reads_imports_urls_and_the_first_font_source():
+    css = b'''@import "base.css";
+    @import url(theme.css) screen;
+    /* @import "commented.css"; */
+    .hero { background: url('/img/hero.jpg') }
+    .icon { background: url(data:image/png;base64,AAA) }
+    @font-face { font-family: X; src: url(/f/x.woff2) format("woff2"), url(/f/x.woff) format("woff"); }
+    .svg { fill: url(#gradient) }
+    '''
+    assert css_refs(css) == [
+        ('css', 'base.css'),
+        ('css', 'theme.css'),
+        ('image', '/img/hero.jpg'),
+        ('font', '/f/x.woff2'),
+    ]
+
+
+def test_extract_assets_groups_alternatives_into_one_download():
+    data = b'''<head><base href="/blog/"><link rel="stylesheet" href="/site.css">
+    <link rel="preload" as="font" href="/f/x.woff2"><link rel="alternate stylesheet" href="/alt.css">
+    <meta property="og:image" content="/og.jpg">
+    <script src="/app.js">var s = "<img src='/not.png'>";</script>
+    <style>.a { background: url(/bg.png) }</style></head>
+    <body><!-- <img src="/commented.png"> -->
+    <img src="/a.jpg" srcset="/a-2x.jpg 2x, /a-3x.jpg 3x">
+    <picture><source srcset="/p.webp 1x, /p-2x.webp 2x"><img src="/p.jpg"></picture>
+    <img src="data:image/gif;base64,R0lGOD">
+    <video poster="/poster.jpg"></video></body>'''
+    assert extract_assets(data) == {
+        'base': '/blog/',
+        'og_image': '/og.jpg',
+        'assets': [
+            ['css', ['/site.css']],
+            ['font', ['/f/x.woff2']],
+            ['js', ['/app.js']],
+            ['image', ['/bg.png']],
+            ['image', ['/a.jpg', '/a-2x.jpg', '/a-3x.jpg']],
+            ['image', ['/p.webp', '/p-2x.webp', '/p.jpg']],
+            ['image', ['/poster.jpg']],
+        ],
+    }
+
+
+def test_largest_srcset_candidate_is_counted(tmp_path):
+    build(tmp_path, {'index.html': 100, 'a.jpg': 1000, 'a-2x.jpg': 3000, 'a-3x.jpg': 2000})
+    _, [weight] = weigh_pages(tmp_path, ['index.html'], [
+        page(('image', ['/a.jpg', '/a-2x.jpg', '/a-3x.jpg', '/a-4x.jpg', 'https://cdn.example/a.jpg'])),
+    ])
+    assert weight.by_kind == {'html': 100, 'css': 0, 'js': 0, 'image': 3000, 'font': 0}
+    assert weight.missing == [('image', '/a-4x.jpg')]
+    assert weight.external == 1
+
+
+def test_stylesheet_closure_follows_imports_relative_to_each_sheet(tmp_path):
+    build(tmp_path, {
+        'index.html': 10,
+        'css/site.css': b'@import "parts/grid.css"; .a { background: url(../img/bg.png) }',
+        'css/parts/grid.css': b'.b { background: url(/img/grid.png) } .c { background: url(gone.png) }',
+        'img/bg.png': 200,
+        'img/grid.png': 300,
+    })
+    graph, [weight] = weigh_pages(tmp_path, ['index.html'], [page(('css', ['/css/site.css']))])
+    assert weight.by_kind['css'] == (tmp_path / 'css/site.css').stat().st_size + \
+        (tmp_path / 'css/parts/grid.css').stat().st_size
+    assert weight.by_kind['image'] == 500
+    grid = graph.ids['/css/parts/grid.css']
+    assert graph.css_missing == {grid: [('image', 'gone.png')]}
+
+
+def test_import_cycles_terminate_and_every_sheet_gets_the_whole_cycle(tmp_path):
+    build(tmp_path, {
+        'a.html': 1,
+        'b.html': 1,
+        'a.css': b'@import "b.css"; .a { background: url(a.png) }',
+        'b.css': b'@import "a.css"; .b { background: url(b.png) }',
+        'a.png': 100,
+        'b.png': 1000,
+    })
+    # a.css is weighed first, so b.css's closure is first reached mid-cycle
+    graph, weights = weigh_pages(tmp_path, ['a.html', 'b.html'], [
+        page(('css', ['/a.css'])),
+        page(('css', ['/b.css'])),
+    ])
+    assert [weight.by_kind['image'] for weight in weights] == [1100, 1100]
+    assert weights[0].by_kind == weights[1].by_kind | {'html': 1}
+    assert graph.closure(graph.ids['/b.css']) == graph.closure(graph.ids['/a.css'])
+
+
+def test_shared_assets_are_stated_once_and_og_image_checked_alone(tmp_path):
+    build(tmp_path, {'a.html': 1, 'b/index.html': 1, 'site.css': 50, 'og.jpg': 5000})
+    graph, weights = weigh_pages(tmp_path, ['a.html', 'b/index.html'], [
+        page(('css', ['/site.css']), og_image=f"{SITE}/og.jpg"),
+        page(('css', ['../site.css']), og_image='/missing.jpg'),
+    ], site_url=SITE)
+    assert graph.stats == 4
+    assert [weight.total for weight in weights] == [51, 51]
+    assert weights[0].og_image == (f"{SITE}/og.jpg", 5000)
+    assert weights[0].over_budget({'og:image': 4096, 'total': 100}) == [('og:image', 5000, 4096)]
+    assert weights[1].og_image == ('/missing.jpg', None)
+    assert weights[1].missing == [('og:image', '/missing.jpg')]
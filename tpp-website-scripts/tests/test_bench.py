@@ -0,0 +1,45 @@
+"""
+Benchmark harness: child process failures and baseline comparison
+"""
+
+import multiprocessing
+import os
+import time
+
+import pytest
+
+from tpp_audit.bench import BenchmarkError, _wait_for_result, compare_to_baseline
+
+
+def start(target, args=()):
+    context = multiprocessing.get_context('spawn')
+    queue = context.Queue()
+    process = context.Process(target=target, args=args)
+    process.start()
+    return process, queue
+
+
+def test_crashed_child_is_reported_with_its_exit_code():
+    process, queue = start(os._exit, (3,))
+    with pytest.raises(BenchmarkError, match='exited with code 3'):
+        _wait_for_result('meta', process, queue, timeout=60)
+    process.join()
+
+
+def test_hung_child_is_terminated():
+    process, queue = start(time.sleep, (60,))
+    with pytest.raises(BenchmarkError, match='no result after'):
+        _wait_for_result('meta', process, queue, timeout=0.5)
+    process.join()
+    assert process.exitcode != 0
+
+
+def test_regressions_beyond_tolerance():
+    baseline = {'meta': {'files_per_sec': 100.0, 'peak_rss_kb': 1000}}
+    assert compare_to_baseline({'meta': {'files_per_sec': 85.0, 'peak_rss_kb': 1100}},
+                               baseline, 0.2) == []
+    regressions = compare_to_baseline({'meta': {'files_per_sec': 70.0, 'peak_rss_kb': 1300}},
+                                      baseline, 0.2)
+    assert len(regressions) == 2
+    assert compare_to_baseline({'schema': {'files_per_sec': 1.0, 'peak_rss_kb': 1}},
+                               baseline, 0.2) == []
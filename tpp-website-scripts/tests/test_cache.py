@@ -0,0 +1,122 @@
+"""
+ResultCache, CachedCheck keys and variants, LRU pruning and CacheTally
+"""
+
+import time
+
+import pytest
+
+from tpp_audit.cache import (
+    CachedCheck,
+    CacheTally,
+    ResultCache,
+    cache_namespace,
+    cache_path,
+    finish_cache,
+)
+
+
+class Recorder:
+    """Picklable check that records which files it actually ran on"""
+
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, path, data):
+        self.calls.append(path.name)
+        return {'size': len(data) if data is not None else None, 'name': path.name}
+
+
+@pytest.fixture
+def pages(tmp_path):
+    site = tmp_path / 'site'
+    (site / 'local').mkdir(parents=True)
+    for rel_path, text in [('a.html', 'same'), ('b.html', 'same'), ('local/c.html', 'same'),
+                           ('d.html', 'different')]:
+        (site / rel_path).write_text(text)
+    return site
+
+
+def test_cache_path_follows_the_environment(tmp_path):
+    assert cache_path() == tmp_path / 'results.sqlite3'
+
+
+def test_namespace_changes_with_version_and_rules():
+    base = cache_namespace('check', 1, {'a': 1})
+    assert base == cache_namespace('check', 1, {'a': 1})
+    assert base != cache_namespace('check', 2, {'a': 1})
+    assert base != cache_namespace('check', 1, {'a': 2})
+
+
+def test_identical_content_shares_an_entry(pages):
+    check = Recorder()
+    cached = CachedCheck(check, 'ns')
+    outcomes = [cached(pages / name) for name in ('a.html', 'b.html', 'd.html', 'a.html')]
+    # b.html has a.html's bytes, so it gets a.html's findings
+    assert check.calls == ['a.html', 'd.html']
+    assert [hit for _, _, hit in outcomes] == [False, True, False, True]
+    assert outcomes[1][0] == {'size': 4, 'name': 'a.html'}
+    cached.close()
+
+
+def test_variant_splits_the_key(pages):
+    check = Recorder()
+    top_level = lambda path: 'local' if path.parent.name == 'local' else ''
+    cached = CachedCheck(check, 'ns', variant=top_level)
+    cached(pages / 'a.html')
+    findings, digest, hit = cached(pages / 'local' / 'c.html')
+    assert not hit and digest.endswith('|local')
+    assert cached(pages / 'b.html')[2]
+    assert check.calls == ['a.html', 'c.html']
+    cached.close()
+
+
+def test_streaming_digest_skips_the_read(pages):
+    check = Recorder()
+    cached = CachedCheck(check, 'ns', digest=lambda path: path.name)
+    assert cached(pages / 'a.html') == ({'size': None, 'name': 'a.html'}, 'a.html', False)
+    assert cached(pages / 'a.html')[2]
+    cached.close()
+
+
+def test_disabled_cache_always_runs(pages, tmp_path):
+    check = Recorder()
+    cached = CachedCheck(check, 'ns', enabled=False)
+    assert cached(pages / 'a.html')[1:] == (None, False)
+    assert cached(pages / 'a.html')[1:] == (None, False)
+    assert check.calls == ['a.html', 'a.html']
+    finish_cache(cached, [])
+    assert not (tmp_path / 'results.sqlite3').exists()
+
+
+def test_prune_evicts_least_recently_used(tmp_path):
+    cache = ResultCache(tmp_path / 'lru.sqlite3', max_bytes=100)
+    payload = {'x': 'y' * 30}  # 39 bytes of JSON: two fit, three do not
+    for digest in ('old', 'middle', 'new'):
+        cache.put('ns', digest, payload)
+        time.sleep(0.01)
+    cache.touch('ns', ['old'])
+
+    assert cache.prune() == 1
+    assert cache.get('ns', 'middle') is None
+    assert cache.get('ns', 'old') == payload and cache.get('ns', 'new') == payload
+    assert cache.stats() == {'entries': 2, 'bytes': 78}
+    cache.close()
+
+
+def test_tally_touches_hits_as_it_goes(pages, tmp_path, capsys):
+    cached = CachedCheck(Recorder(), 'ns')
+    tally = CacheTally(cached)
+    tally.add([cached(pages / 'a.html'), cached(pages / 'd.html')])
+    cache = cached.cache()
+    before = dict(cache.conn.execute('SELECT digest, last_used FROM results'))
+    time.sleep(0.01)
+    tally.add([cached(pages / 'b.html')])
+    after = dict(cache.conn.execute('SELECT digest, last_used FROM results'))
+    assert [digest for digest in after if after[digest] > before[digest]] == [
+        cached(pages / 'a.html')[1]]
+
+    tally.finish(show_stats=True)
+    assert (tally.hits, tally.misses) == (1, 2)
+    out = capsys.readouterr().out
+    assert 'Hits: 1' in out and 'Misses: 2' in out and 'Entries: 2' in out
@@ -0,0 +1,116 @@
+"""
+HeadExtractor against the BeautifulSoup lookups it replaced
+"""
+
+import pytest
+
+from tpp_audit.discovery import discover_html_files
+from tpp_audit.headparse import CHUNK_SIZE, extract_head, extract_head_text
+
+from conftest import SCRIPTS_DIR
+
+bs4 = pytest.importorskip('bs4')
+
+SITE_ROOT = SCRIPTS_DIR.parent
+
+LOOKUPS = [
+    ('name', 'description'),
+    ('name', 'robots'),
+    ('property', 'og:title'),
+    ('property', 'og:image'),
+    ('name', 'twitter:card'),
+]
+
+DOCUMENTS = {
+    'plain': """<!DOCTYPE html><html><head>
+        <title>Plumbing in Parramatta | The Profit Platform</title>
+        <meta name="description" content="Fast local help.">
+        <meta property="og:title" content="Plumbing">
+        <link rel="stylesheet" href="/a.css"><link rel="canonical" href="https://x.test/a">
+        </head><body><p>Hi</p></body></html>""",
+    'entities and self-closing tags': """<html><head>
+        <title>Tom &amp; Jerry&#39;s &mdash; caf&eacute;</title>
+        <meta name="description" content="Q&amp;A &quot;quoted&quot;"/>
+        <META NAME="robots" CONTENT="noindex">
+        <link rel="alternate canonical" href="/b" />
+        </head><body></body></html>""",
+    'first match wins': """<html><head><title>One</title><title>Two</title>
+        <meta name="description" content="first"><meta name="description" content="second">
+        <link rel="canonical" href="/1"><link rel="canonical" href="/2">
+        </head></html>""",
+    'empty and nested title': """<html><head><title></title>
+        <meta property="og:image" content>
+        <meta name="twitter:card">
+        </head><body></body></html>""",
+    'title with child tags': """<html><head><title>A <b>bold</b> title</title></head></html>""",
+    'implicit head closed by body': """<html><title>No head tag</title>
+        <meta name="description" content="before body">
+        <body><p>text</p></body></html>""",
+    'no head or body': """<title>Fragment</title><meta name="description" content="x">""",
+    'no title': """<html><head><meta name="description" content="d"></head><body></body></html>""",
+    'comments and scripts': """<html><head><!-- <title>not me</title> -->
+        <script>var s = "<title>nor me</title>";</script>
+        <title>Real</title></head><body></body></html>""",
+}
+
+
+def soup_view(html):
+    """What the old check-meta-tags.py read through BeautifulSoup"""
+    soup = bs4.BeautifulSoup(html, 'html.parser')
+    title = soup.find('title')
+    canonical = soup.find('link', rel='canonical')
+    return {
+        'title': None if title is None else (title.string or ''),
+        'metas': [_attrs(soup.find('meta', attrs={name: value})) for name, value in LOOKUPS],
+        'canonical': canonical.get('href') if canonical else None,
+    }
+
+
+def head_view(head):
+    canonical = head.find_link('canonical')
+    return {
+        'title': head.title,
+        'metas': [head.find_meta(name, value) for name, value in LOOKUPS],
+        'canonical': canonical.get('href') if canonical else None,
+    }
+
+
+def _attrs(tag):
+    if tag is None:
+        return None
+    # bs4 lower-cases attribute names and keeps multi-valued ones as lists
+    return {name: ' '.join(value) if isinstance(value, list) else value
+            for name, value in tag.attrs.items()}
+
+
+@pytest.mark.parametrize('html', DOCUMENTS.values(), ids=DOCUMENTS.keys())
+def test_matches_beautifulsoup(html):
+    assert head_view(extract_head_text(html)) == soup_view(html)
+
+
+def test_chunk_boundaries_do_not_matter(tmp_path):
+    padding = '<meta name="x" content="%s">' % ('p' * CHUNK_SIZE)
+    html = DOCUMENTS['plain'].replace('<title>', padding + '<title>', 1)
+    path = tmp_path / 'page.html'
+    path.write_text(html, encoding='utf-8')
+    assert head_view(extract_head(path)) == head_view(extract_head_text(html)) == soup_view(html)
+
+
+def test_stops_at_head_unless_asked_not_to():
+    html = DOCUMENTS['plain'].replace('<p>Hi</p>', '<meta name="robots" content="noindex">')
+    assert extract_head_text(html).done
+    assert extract_head_text(html).find_meta('name', 'robots') is None
+    full = extract_head_text(html, stop_at_head=False)
+    assert full.head_done and full.find_meta('name', 'robots') is None
+
+
+def site_pages():
+    pages = discover_html_files(SITE_ROOT, recursive=True)
+    # An even spread keeps the run short; every page matched when this landed
+    return pages[::max(1, len(pages) // 40)]
+
+
+@pytest.mark.parametrize('page', site_pages(), ids=lambda page: page.relative_to(SITE_ROOT).as_posix())
+def test_site_pages_match_beautifulsoup(page):
+    html = page.read_text(encoding='utf-8')
+    assert head_view(extract_head(page)) == soup_view(html)
@@ -0,0 +1,71 @@
+"""
+Hreflang reciprocity across the site
+"""
+
+from tpp_audit.hreflang import check_hreflang
+
+SITE = 'https://theprofitplatform.com.au'
+
+
+def facts(*alternates, canonical=None):
+    return {'canonical': canonical, 'alternates': [list(pair) for pair in alternates]}
+
+
+def test_reciprocal_pages_are_clean():
+    paths = ['en/index.html', 'fr/index.html']
+    pages = [
+        facts(('en', '/en/'), ('fr', '/fr/'), ('x-default', '/en/')),
+        facts(('en', '/en/'), ('fr', '/fr/'), ('x-default', '/en/')),
+    ]
+    assert check_hreflang(paths, pages, SITE) == []
+
+
+def test_missing_return_link_is_reported():
+    paths = ['en/index.html', 'fr/index.html']
+    pages = [
+        facts(('en', '/en/'), ('fr', '/fr/'), ('x-default', '/en/')),
+        facts(('fr', '/fr/'), ('x-default', '/fr/')),
+    ]
+    assert check_hreflang(paths, pages, SITE) == [
+        ('error', "en/index.html: hreflang 'fr' target /fr/ does not link back"),
+    ]
+
+
+def test_apex_and_www_alternates_name_the_same_page():
+    paths = ['en/index.html', 'fr/index.html']
+    apex, www = SITE, SITE.replace('://', '://www.')
+    pages = [
+        facts(('en', f"{apex}/en/"), ('fr', f"{www}/fr/"), ('x-default', f"{www}/en/")),
+        facts(('en', f"{www}/en/"), ('fr', f"{apex}/fr/"), ('x-default', f"{apex}/en/")),
+    ]
+    assert check_hreflang(paths, pages, SITE) == []
+    assert check_hreflang(paths, pages, www) == []
+
+
+def test_self_reference_default_and_codes():
+    paths = ['en/index.html', 'fr/index.html']
+    pages = [
+        facts(('fr', '/fr/'), ('english', '/en/'), ('FR', '/fr/other')),
+        facts(('en', '/en/'), ('fr', '/fr/'), ('x-default', '/en/')),
+    ]
+    assert check_hreflang(paths, pages, SITE) == [
+        ('error', "en/index.html: Invalid hreflang code 'english'"),
+        ('error', "en/index.html: hreflang 'FR' points at both "
+                  "theprofitplatform.com.au/fr and theprofitplatform.com.au/fr/other"),
+        ('warning', "en/index.html: hreflang 'FR' target is not a page in the build: /fr/other"),
+        ('warning', "en/index.html: No x-default hreflang"),
+    ]
+
+
+def test_non_canonical_pages_and_targets():
+    paths = ['en/index.html', 'fr/index.html', 'fr-old.html']
+    pages = [
+        facts(('en', '/en/'), ('fr', '/fr-old.html'), ('x-default', '/en/')),
+        facts(('en', '/en/'), ('fr', '/fr/'), ('x-default', '/en/')),
+        facts(('en', '/en/'), ('fr', '/fr-old.html'), ('x-default', '/en/'), canonical='/fr/'),
+    ]
+    findings = check_hreflang(paths, pages, SITE)
+    assert ('error', "fr-old.html: declares hreflang but is not canonical "
+                     "(canonical is theprofitplatform.com.au/fr)") in findings
+    assert ('error', "en/index.html: hreflang 'fr' target /fr-old.html is not canonical "
+                     "(canonical is theprofitplatform.com.au/fr)") in findings
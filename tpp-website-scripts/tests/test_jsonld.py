@@ -0,0 +1,107 @@
+"""
+Byte-level JSON-LD scanning and validation of @graph and nested entities
+"""
+
+import json
+
+import pytest
+
+from tpp_audit.discovery import discover_html_files
+from tpp_audit.jsonld import loads, scan_json_ld
+from tpp_audit.schema import check_html, iter_entities, validate_schema
+
+from conftest import SCRIPTS_DIR, load_script
+
+SITE_ROOT = SCRIPTS_DIR.parent
+
+BUSINESS = {'@type': 'LocalBusiness', 'name': 'TPP', 'address': 'Sydney', 'telephone': '1'}
+
+
+def script(body, attrs='type="application/ld+json"'):
+    return f"<script {attrs}>{body}</script>"
+
+
+def test_finds_every_spelling_of_the_type_attribute():
+    html = ''.join([
+        script('{"a": 1}'),
+        script('{"b": 2}', "type='application/ld+json'"),
+        script('{"c": 3}', 'id="x" type=application/ld+json data-x="1"'),
+        script('{"d": 4}', 'TYPE = "application/ld+json"'),
+        '<SCRIPT type="application/ld+json">{"e": 5}</SCRIPT >',
+    ]).encode('utf-8')
+    assert [loads(block) for block in scan_json_ld(html)] == [
+        {'a': 1}, {'b': 2}, {'c': 3}, {'d': 4}, {'e': 5}]
+
+
+def test_skips_other_scripts_and_comments():
+    html = ''.join([
+        script('var t = "application/ld+json";', 'type="text/javascript"'),
+        script('{"no": 1}', 'data-type="application/ld+json"'),
+        script('{"no": 2}', 'type="application/ld+json+extra"'),
+        '<!-- ' + script('{"no": 3}') + ' -->',
+        script('{"yes": 1}'),
+        '<scripts type="application/ld+json">{"no": 4}</scripts>',
+    ]).encode('utf-8')
+    assert [loads(block) for block in scan_json_ld(html)] == [{'yes': 1}]
+
+
+def test_body_runs_to_the_first_closing_tag():
+    html = (script('{"text": "a</b>c"}') + script('{"n": 2}')).encode('utf-8')
+    assert scan_json_ld(html) == [b'{"text": "a</b>c"}', b'{"n": 2}']
+
+
+def test_graph_and_nested_entities_are_validated():
+    block = {
+        '@context': 'https://schema.org',
+        '@graph': [
+            dict(BUSINESS, **{'@id': '#biz'}),
+            {'@type': 'WebSite', 'name': 'TPP', 'publisher': {'@id': '#biz'}},
+            {'@type': ['ProfessionalService', 'Organization'], 'name': 'Pro',
+             'url': 'https://x.test', 'address': 'Sydney'},
+            {'@type': 'FAQPage', 'mainEntity': [
+                {'@type': 'Question', 'name': 'Why?'},
+            ], 'author': {'@type': 'Organization', 'url': 'https://x.test'}},
+        ],
+    }
+    html = script(json.dumps(block)).encode('utf-8')
+    assert check_html(html) == {'invalid': [], 'schemas': [['@graph', [
+        '@graph[1] (WebSite): Missing required field: url',
+        '@graph[2] (ProfessionalService, Organization): Missing required field: telephone',
+        '@graph[3].author (Organization): Missing required field: name',
+    ]]]}
+
+
+def test_references_and_top_level_messages():
+    # A bare {"@id", "@type"} points elsewhere and is not checked
+    assert validate_schema({'@type': 'WebSite', 'name': 'x', 'url': 'y',
+                            'about': {'@id': '#biz', '@type': 'LocalBusiness'}}) == []
+    assert validate_schema({'@type': 'Organization', 'name': 'x'}) == [
+        'Missing required field: url']
+    assert [types for types, _ in iter_entities([BUSINESS, {'@graph': [BUSINESS]}])] == [
+        ('LocalBusiness',), ('LocalBusiness',)]
+
+
+def test_invalid_blocks_are_reported_not_raised():
+    html = (script('{"@type": "WebSite",}') + script(json.dumps(BUSINESS))).encode('utf-8')
+    findings = check_html(html)
+    assert len(findings['invalid']) == 1
+    assert findings['schemas'] == [['LocalBusiness', []]]
+
+
+def test_site_pages_match_beautifulsoup():
+    bs4 = pytest.importorskip('bs4')
+    pages = discover_html_files(SITE_ROOT, recursive=True)
+    for page in pages[::max(1, len(pages) // 40)]:
+        data = page.read_bytes()
+        soup = bs4.BeautifulSoup(data, 'html.parser')
+        # Compared as text: some pages carry unrendered template expressions
+        expected = [tag.string or '' for tag in soup.find_all('script', type='application/ld+json')]
+        assert [block.decode('utf-8') for block in scan_json_ld(data)] == expected, page
+
+
+def test_validate_schema_script_keeps_its_helpers():
+    validator = load_script('validate-schema')
+    assert validator.validate_schema({'@type': 'WebSite', 'name': 'x'}) == [
+        'Missing required field: url']
+    page = '<html><head>' + script(json.dumps(BUSINESS)) + '</head></html>'
+    assert validator.extract_json_ld(page) == [BUSINESS]
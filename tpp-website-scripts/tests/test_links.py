@@ -0,0 +1,146 @@
+"""
+_redirects parsing, URL resolution and the offline link graph
+"""
+
+import pytest
+
+from tpp_audit.links import build_graph, extract_links
+from tpp_audit.urls import MAX_REDIRECT_HOPS, SiteIndex, load_redirects, resolve_href, site_hosts
+
+SITE = 'https://theprofitplatform.com.au'
+HOSTS = site_hosts(SITE)
+
+
+def build(root, files, redirects=''):
+    for rel_path in files:
+        path = root / rel_path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text('<html></html>')
+    if redirects:
+        (root / '_redirects').write_text(redirects)
+    return root
+
+
+def test_load_redirects_keeps_exact_rules_only(tmp_path):
+    (tmp_path / '_redirects').write_text(
+        '# Moved pages\n'
+        '/old-page    /new-page\n'
+        '/old-page/   /ignored  302\n'
+        '/promo.html  https://example.com/promo  302  # campaign\n'
+        '/blog/*      /articles/:splat  301\n'
+        '/team/:name  /about  301\n'
+        '/index.html  /  301\n'
+        '/forced      /elsewhere  301!\n'
+        '/lonely\n'
+    )
+    assert load_redirects(tmp_path) == {
+        '/old-page': ('/new-page', '301'),
+        '/promo': ('https://example.com/promo', '302'),
+        '/forced': ('/elsewhere', '301!'),
+    }
+
+
+def test_load_redirects_without_a_file(tmp_path):
+    assert load_redirects(tmp_path) == {}
+
+
+@pytest.mark.parametrize('href, base_path, expected', [
+    ('contact', '/services/plumbing', '/services/contact'),
+    ('contact', '/services/', '/services/contact'),
+    ('../about/', '/services/plumbing', '/about/'),
+    ('../../../x', '/a/b', '/x'),
+    ('/about?ref=nav#team', '/services/', '/about'),
+    ('#top', '/services/', '/services/'),
+    ('?page=2', '/blog/', '/blog/'),
+    ('https://www.theprofitplatform.com.au', '/blog/', '/'),
+    ('HTTPS://THEPROFITPLATFORM.COM.AU/a%20b', '/', '/a b'),
+    ('https://example.com/about', '/', None),
+    ('//example.com/about', '/', None),
+    ('mailto:hi@theprofitplatform.com.au', '/', None),
+    ('javascript:void(0)', '/', None),
+    ('..', '/services/plumbing/', '/services/'),
+])
+def test_resolve_href(href, base_path, expected):
+    assert resolve_href(href, base_path, HOSTS) == expected
+
+
+def test_site_index_finds_every_served_form(tmp_path):
+    site = SiteIndex(build(tmp_path, ['index.html', 'about.html', 'services/index.html',
+                                      'img/logo.png', 'node_modules/x.html']))
+    assert site.find_file('/') == '/index.html'
+    assert site.find_file('/about') == '/about.html'
+    assert site.find_file('/services') == '/services/index.html'
+    assert site.find_file('/services/') == '/services/index.html'
+    assert site.find_file('/img/logo.png') == '/img/logo.png'
+    assert site.find_file('/about/') is None
+    assert site.find_file('/node_modules/x.html') is None
+
+
+def test_redirects_apply_where_no_file_matches_unless_forced(tmp_path):
+    site = SiteIndex(build(tmp_path, ['a.html', 'b.html', 'c.html'],
+                           '/a  /b  301\n'
+                           '/missing  /b  301\n'
+                           '/c  /b  301!\n'
+                           '/hop1  /hop2\n'
+                           '/hop2  /b\n'
+                           '/offsite  https://example.com/\n'))
+    assert site.resolve('/a') == ('/a.html', [])
+    assert site.resolve('/missing') == ('/b.html', ['/b'])
+    assert site.resolve('/c') == ('/b.html', ['/b'])
+    assert site.resolve('/hop1') == ('/b.html', ['/hop2', '/b'])
+    assert site.resolve('/offsite') == (None, ['https://example.com/'])
+    assert site.resolve('/nowhere') == (None, [])
+    assert site.resolve('/missing') is site.resolve('/missing')
+
+
+def test_redirect_loops_and_long_chains_give_up(tmp_path):
+    hops = ''.join(f"/step{n}  /step{n + 1}\n" for n in range(MAX_REDIRECT_HOPS + 2))
+    site = SiteIndex(build(tmp_path, [f"step{MAX_REDIRECT_HOPS + 2}.html"],
+                           '/ping  /pong\n/pong  /ping\n' + hops))
+    found, chain = site.resolve('/ping')
+    assert found is None
+    assert chain[:2] == ['/pong', '/ping'] and len(chain) == MAX_REDIRECT_HOPS + 1
+    found, chain = site.resolve('/step0')
+    assert found is None and len(chain) == MAX_REDIRECT_HOPS + 1
+    assert site.resolve('/step2')[0] == f"/step{MAX_REDIRECT_HOPS + 2}.html"
+
+
+def test_extract_links_reads_urls_and_skips_comments_scripts_and_styles():
+    data = b'''<html><head><base href="/blog/"><base href="/ignored/">
+    <link rel="stylesheet" href="/css/site.css">
+    <script src="/js/app.js">var a = '<a href="/not-a-link">';</script>
+    <style>a { background: url(/bg.png) }</style>
+    </head><body>
+    <!-- <a href="/commented">x</a> -->
+    <a href='/about' title="a > b">About</a>
+    <a href=/contact>Contact</a>
+    <a data-href="/nope" href="/about">Again</a>
+    <img src="/img/a.jpg" srcset="/img/a-2x.jpg 2x, /img/a-3x.jpg 3x" alt="">
+    <img srcset="data:image/png;base64,AAA, BBB 2x">
+    <a href="/faq?q=1&amp;r=2">FAQ</a>
+    <a href="">Empty</a>
+    </body></html>'''
+    assert extract_links(data) == {
+        'base': '/blog/',
+        'links': ['/css/site.css', '/js/app.js', '/about', '/contact', '/img/a.jpg',
+                  '/img/a-2x.jpg', '/img/a-3x.jpg', '/faq?q=1&r=2'],
+    }
+
+
+def test_graph_resolves_relative_links_against_base(tmp_path):
+    build(tmp_path, ['index.html', 'blog/index.html', 'blog/post.html', 'about.html',
+                     'orphan.html'], '/old-about  /about\n')
+    paths = ['index.html', 'blog/index.html', 'blog/post.html', 'about.html', 'orphan.html']
+    facts = [
+        {'base': None, 'links': ['blog/', 'old-about', 'missing', 'https://example.com/']},
+        {'base': None, 'links': ['post', '../about']},
+        # Relative links on the post resolve against /blog/, not the post itself
+        {'base': '/blog/', 'links': ['index.html', 'post.html', 'gone']},
+        {'base': 'https://example.com/', 'links': ['anything']},
+        {'base': None, 'links': []},
+    ]
+    graph = build_graph(tmp_path, paths, facts, SITE)
+    assert graph.broken == [(0, 'missing', '/missing', []), (2, 'gone', '/blog/gone', [])]
+    assert graph.redirected == [(0, 'old-about', ['/about'])]
+    assert list(graph.inbound_counts()) == [0, 2, 1, 2, 0]
+    assert graph.orphans() == [4]
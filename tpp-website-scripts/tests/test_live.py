@@ -0,0 +1,162 @@
+"""
+LiveChecker against a stand-in server on localhost
+"""
+
+import asyncio
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from tpp_audit.live import LiveChecker, RateLimiter, check_live, is_live, rebase_redirect
+
+PRODUCTION = 'https://theprofitplatform.com.au'
+
+
+class StandIn(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    # path -> (status, Location); /flaky fails until it has been asked twice
+    routes = {
+        '/ok': (200, None),
+        '/missing': (404, None),
+        '/old': (301, '/older'),
+        '/older': (302, PRODUCTION + '/ok'),
+        '/loop': (301, '/loop'),
+    }
+
+    def respond(self):
+        server = self.server
+        with server.lock:
+            server.hits.append((self.command, self.path, time.monotonic()))
+            flaky_seen = sum(path == '/flaky' for _, path, _ in server.hits)
+        if self.path == '/flaky':
+            status, location = (503, None) if flaky_seen <= 2 else (200, None)
+        elif self.path == '/head-refused' and self.command == 'HEAD':
+            status, location = 405, None
+        elif self.path == '/head-refused':
+            status, location = 200, None
+        else:
+            status, location = self.routes.get(self.path, (404, None))
+        body = b'' if self.command == 'HEAD' else b'stand-in'
+        self.send_response(status)
+        if location:
+            self.send_header('Location', location)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    do_HEAD = respond
+    do_GET = respond
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    httpd = ThreadingHTTPServer(('127.0.0.1', 0), StandIn)
+    httpd.hits = []
+    httpd.lock = threading.Lock()
+    thread = threading.Thread(target=httpd.serve_forever, args=(0.05,), daemon=True)
+    thread.start()
+    httpd.base_url = f"http://127.0.0.1:{httpd.server_address[1]}"
+    yield httpd
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def run(server, paths, **options):
+    options = {'base_url': server.base_url, 'backoff': 0.01, 'rate': 0, 'timeout': 5, **options}
+    results = {}
+    stats = check_live([PRODUCTION + path for path in paths],
+                       on_result=lambda result: results.__setitem__(result['url'], result),
+                       **options)
+    return {url[len(PRODUCTION):]: result for url, result in results.items()}, stats
+
+
+def test_ok_and_not_found(server):
+    results, stats = run(server, ['/ok', '/missing'])
+    assert is_live(results['/ok'])
+    assert results['/ok']['final_url'] == server.base_url + '/ok'
+    assert results['/missing']['status'] == 404
+    assert not is_live(results['/missing'])
+    assert stats['urls'] == 2
+
+
+def test_redirect_chain_stays_on_base_url(server):
+    results, _ = run(server, ['/old'])
+    result = results['/old']
+    # The absolute production Location is followed on the stand-in, not production
+    assert result['redirects'] == [[301, server.base_url + '/older'], [302, PRODUCTION + '/ok']]
+    assert result['final_url'] == server.base_url + '/ok'
+    assert result['status'] == 200 and result['error'] is None
+    assert not is_live(result)
+
+
+def test_redirect_loop(server):
+    results, _ = run(server, ['/loop'])
+    assert results['/loop']['error'] == 'Redirect loop'
+
+
+def test_retries_5xx(server):
+    results, _ = run(server, ['/flaky'], retries=2)
+    assert results['/flaky']['status'] == 200
+    assert results['/flaky']['requests'] == 3
+
+    server.hits.clear()
+    results, _ = run(server, ['/flaky'], retries=1)
+    assert results['/flaky']['status'] == 503
+
+
+def test_head_falls_back_to_get(server):
+    results, _ = run(server, ['/head-refused'])
+    assert results['/head-refused']['status'] == 200
+    assert [command for command, _, _ in server.hits] == ['HEAD', 'GET']
+
+
+def test_rate_limit_spaces_requests(server):
+    rate = 20.0
+    run(server, ['/ok'] * 8, rate=rate, concurrency=4)
+    starts = sorted(at for _, _, at in server.hits)
+    assert len(starts) == 8
+    # 8 requests at 20/s need at least 7 intervals of 50ms
+    assert starts[-1] - starts[0] >= 7 / rate * 0.9
+
+
+def test_rate_limiter_reserves_slots():
+    async def spaced():
+        limiter = RateLimiter(50)
+        started = time.monotonic()
+        await asyncio.gather(*(limiter.wait() for _ in range(5)))
+        return time.monotonic() - started
+
+    assert asyncio.run(spaced()) >= 4 / 50 * 0.9
+
+
+def test_connections_are_reused(server):
+    _, stats = run(server, ['/ok', '/missing', '/ok'], concurrency=1)
+    assert stats['requests'] == 3
+    assert stats['connections'] == 1
+
+
+@pytest.mark.parametrize('options', [
+    {'concurrency': 0},
+    {'concurrency': -1},
+    {'rate': -1},
+    {'timeout': 0},
+    {'retries': -1},
+])
+def test_rejects_invalid_options(options):
+    with pytest.raises(ValueError):
+        LiveChecker(**options)
+
+
+def test_rebase_redirect():
+    base = 'http://127.0.0.1:8000'
+    assert rebase_redirect(PRODUCTION + '/a', PRODUCTION + '/b', base) == base + '/a'
+    assert rebase_redirect('https://www.theprofitplatform.com.au/a?x=1', PRODUCTION + '/b',
+                           base) == base + '/a?x=1'
+    assert rebase_redirect('https://example.com/a', PRODUCTION + '/b', base) == 'https://example.com/a'
+    assert rebase_redirect(PRODUCTION + '/a', PRODUCTION + '/b', None) == PRODUCTION + '/a'
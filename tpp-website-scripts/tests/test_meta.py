@@ -0,0 +1,104 @@
+"""
+Meta tag rules, per-path overrides and severities
+"""
+
+import json
+
+import pytest
+
+from tpp_audit.headparse import extract_head_text
+from tpp_audit.meta import RuleConfig, RuleSet, check_head, load_rules
+
+CONFIG = {
+    'version': 1,
+    'rules': [
+        {'id': 'title', 'tag': 'title', 'label': 'Title', 'length': {'min': 10, 'max': 30}},
+        {'id': 'description', 'tag': 'meta', 'match': {'name': 'description'},
+         'label': 'Description', 'length': {'min': 20}},
+        {'id': 'og:image', 'tag': 'meta', 'match': {'property': 'og:image'}},
+        {'id': 'canonical', 'tag': 'link', 'match': {'rel': 'canonical'}},
+    ],
+    'overrides': [
+        {'path': 'blog/*', 'rules': {'description': {'severity': 'warning'}},
+         'disable': ['og:image']},
+        {'path': 'blog/drafts/*', 'rules': {'description': {'severity': 'error',
+                                                             'length': {'min': 5}}},
+         'add': [{'id': 'robots', 'tag': 'meta', 'match': {'name': 'robots'},
+                  'severity': 'warning'}]},
+    ],
+}
+
+HEAD = extract_head_text(
+    '<html><head><title>A short one</title>'
+    '<meta name="description" content="Too brief">'
+    '<link rel="preload canonical" href="/page">'
+    '</head><body></body></html>'
+)
+
+
+def evaluate(rel_path, head=HEAD, config=CONFIG):
+    return RuleConfig(config).for_path(rel_path).evaluate(head)
+
+
+def test_base_rules_apply_in_order_with_their_severity():
+    assert evaluate('index.html') == [
+        ['error', 'Description too short: 9 chars (min 20)'],
+        ['error', 'Missing meta tag: property="og:image"'],
+    ]
+
+
+def test_overrides_patch_and_disable_rules_for_matching_paths():
+    assert evaluate('blog/post.html') == [
+        ['warning', 'Description too short: 9 chars (min 20)'],
+    ]
+
+
+def test_later_overrides_win_over_earlier_ones():
+    # blog/drafts/x.html matches both overrides; the second is applied last
+    assert evaluate('blog/drafts/x.html') == [
+        ['warning', 'Missing meta tag: name="robots"'],
+    ]
+
+
+def test_override_combinations_are_compiled_once():
+    config = RuleConfig(CONFIG)
+    assert config.override_key('blog/drafts/x.html') == '0,1'
+    assert config.override_key('') == ''
+    assert config.for_path('blog/a.html') is config.for_path('blog/b.html')
+    assert config.for_path('about.html') is config.for_path('')
+
+
+def test_title_length_and_whitespace_title():
+    long_title = extract_head_text('<title>' + 'x' * 31 + '</title>')
+    blank = extract_head_text('<title>   </title>')
+    assert ['error', 'Title too long: 31 chars (max 30)'] in evaluate('index.html', long_title)
+    assert ['error', 'Missing or empty <title> tag'] in evaluate('index.html', blank)
+
+
+def test_check_head_keeps_errors_only(tmp_path, monkeypatch):
+    path = tmp_path / 'rules.json'
+    path.write_text(json.dumps(CONFIG))
+    monkeypatch.setenv('TPP_META_RULES', str(path))
+    assert load_rules().config == CONFIG
+    assert check_head(HEAD, rel_path='blog/post.html') == []
+    assert check_head(HEAD, rel_path='index.html') == [
+        'Description too short: 9 chars (min 20)',
+        'Missing meta tag: property="og:image"',
+    ]
+
+
+@pytest.mark.parametrize('spec, message', [
+    ({'id': 'x', 'tag': 'meta', 'match': {'name': 'x'}, 'colour': 'red'}, 'unknown keys'),
+    ({'id': 'x', 'tag': 'script'}, 'unsupported tag'),
+    ({'id': 'x', 'tag': 'meta', 'match': {}}, 'exactly one attribute'),
+    ({'id': 'x', 'tag': 'meta', 'match': {'name': 'x'}, 'severity': 'fatal'}, 'severity'),
+])
+def test_invalid_rules_are_rejected(spec, message):
+    with pytest.raises(ValueError, match=message):
+        RuleSet([spec])
+
+
+def test_rule_ids_must_be_unique():
+    spec = {'id': 'x', 'tag': 'title'}
+    with pytest.raises(ValueError, match='unique'):
+        RuleSet([spec, spec])
@@ -0,0 +1,53 @@
+"""
+NAP normalisation and cross-page conflicts
+"""
+
+from tpp_audit.nap import NapIndex, business_key, nap_entities, normalise_address, normalise_phone
+
+
+def business(name, address='1 George Street, Sydney, NSW', telephone='02 9000 0000'):
+    return {'@context': 'https://schema.org', '@type': 'ProfessionalService', 'name': name,
+            'address': address, 'telephone': telephone}
+
+
+def conflicts(pages):
+    index = NapIndex()
+    for page_id, schemas in enumerate(pages):
+        index.add(page_id, nap_entities(schemas))
+    return index, list(index.conflicts())
+
+
+def test_normalisation():
+    assert business_key('The Profit Platform - Pricing') == 'the profit platform'
+    assert business_key('Smith & Sons | Sydney') == 'smith and sons'
+    assert normalise_phone('+61 (0)2 9000 0000') == normalise_phone('02-9000-0000') == '0290000000'
+    assert normalise_address({'streetAddress': '1 George Street', 'addressRegion': 'New South Wales',
+                              'addressCountry': 'Australia'}) == normalise_address(
+        '1 George St, NSW, AU')
+
+
+def test_page_suffixes_are_not_name_variants():
+    index, found = conflicts([
+        [business('The Profit Platform')],
+        [business('The Profit Platform - Pricing')],
+        [business('the profit platform | Sydney')],
+    ])
+    assert index.businesses() == 1
+    assert found == []
+
+
+def test_address_and_phone_drift_is_reported_most_common_first():
+    index, found = conflicts([
+        [business('TPP', telephone='+61 2 9000 0000')],
+        [business('TPP - Blog', address='1 George St, Sydney, New South Wales')],
+        [business('TPP', address='9 Pitt St, Sydney, NSW'), business('TPP')],
+    ])
+    assert found == [('TPP', 'address', [
+        ('1 George Street, Sydney, NSW', [0, 1, 2]),
+        ('9 Pitt St, Sydney, NSW', [2]),
+    ])]
+
+
+def test_entities_without_names_or_other_types_are_skipped():
+    assert nap_entities([{'@type': 'LocalBusiness', 'telephone': '1'},
+                         {'@type': 'Organization', 'name': 'TPP', 'telephone': '1'}]) == []
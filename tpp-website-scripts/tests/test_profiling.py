@@ -0,0 +1,38 @@
+"""
+cProfile output from validators run with several --jobs
+"""
+
+import pstats
+
+from tpp_audit.pool import map_in_pool
+from tpp_audit.profiling import maybe_cprofile
+
+
+def work_in_worker(n):
+    return sum(range(n))
+
+
+def profiled_functions(path):
+    return {name for _, _, name in pstats.Stats(str(path)).stats}
+
+
+def test_worker_stats_are_merged_into_the_profile(tmp_path):
+    path = tmp_path / 'run.prof'
+    with maybe_cprofile(path) as profiled:
+        results = map_in_pool(profiled(work_in_worker), [1000] * 8, jobs=2)
+    assert results == [sum(range(1000))] * 8
+    stats = pstats.Stats(str(path))
+    calls = [entry[1] for (_, _, name), entry in stats.stats.items() if name == 'work_in_worker']
+    assert calls == [8]
+
+
+def test_single_job_is_profiled_in_process(tmp_path):
+    path = tmp_path / 'run.prof'
+    with maybe_cprofile(path) as profiled:
+        map_in_pool(profiled(work_in_worker), [10, 20], jobs=1)
+    assert 'work_in_worker' in profiled_functions(path)
+
+
+def test_no_path_leaves_func_unwrapped():
+    with maybe_cprofile(None) as profiled:
+        assert profiled(work_in_worker) is work_in_worker
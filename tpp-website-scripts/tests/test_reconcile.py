@@ -0,0 +1,60 @@
+"""
+Sitemap <-> build output reconciliation
+"""
+
+from tpp_audit.reconcile import reconcile
+
+SITE = 'https://theprofitplatform.com.au'
+
+
+def write_sitemap(root, paths, name='sitemap.xml'):
+    urls = ''.join(f"<url><loc>{SITE}{path}</loc></url>" for path in paths)
+    (root / name).write_text('<?xml version="1.0" encoding="UTF-8"?>\n'
+                             '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">'
+                             f"{urls}</urlset>\n")
+
+
+def page(canonical=None, noindex=False):
+    return {'canonical': canonical, 'noindex': noindex}
+
+
+def test_served_forms_of_a_page_match_its_sitemap_url(tmp_path):
+    write_sitemap(tmp_path, ['/', '/about', '/services/', '/contact.html'])
+    paths = ['index.html', 'about.html', 'services/index.html', 'contact/index.html']
+    result = reconcile(tmp_path, paths, [page()] * 4, ['sitemap.xml'])
+    assert result == {'no_page': [], 'redirected': [], 'missing': [], 'not_canonical': []}
+
+
+def test_unmatched_urls_are_split_by_redirects(tmp_path):
+    write_sitemap(tmp_path, ['/', '/old-page', '/gone', '/blog/*'])
+    (tmp_path / '_redirects').write_text('/old-page /new-page 301\n'
+                                         '/blog/* /articles/:splat 301\n')
+    result = reconcile(tmp_path, ['index.html', 'new-page.html'], [page()] * 2, ['sitemap.xml'])
+    assert result['no_page'] == [f"{SITE}/blog/*", f"{SITE}/gone"]
+    assert result['redirected'] == [(f"{SITE}/old-page", '/new-page', '301')]
+    assert result['missing'] == [('new-page.html', '/new-page.html')]
+
+
+def test_noindex_and_canonicalised_pages_are_not_expected_in_the_sitemap(tmp_path):
+    write_sitemap(tmp_path, ['/', '/print'])
+    paths = ['index.html', 'private.html', 'print.html', 'copy.html']
+    facts = [page(f"{SITE}/"), page(noindex=True), page('/'), page('/')]
+    result = reconcile(tmp_path, paths, facts, ['sitemap.xml'])
+    assert result['missing'] == []
+    assert result['not_canonical'] == [(f"{SITE}/print", 'print.html', '/')]
+
+
+def test_canonical_on_another_host_is_not_canonical(tmp_path):
+    write_sitemap(tmp_path, ['/about'])
+    www = SITE.replace('://', '://www.')
+    result = reconcile(tmp_path, ['about.html'], [page(f"{www}/about")], ['sitemap.xml'])
+    assert result['not_canonical'] == [(f"{SITE}/about", 'about.html', f"{www}/about")]
+    result = reconcile(tmp_path, ['about.html'], [page(f"{SITE}/about/")], ['sitemap.xml'])
+    assert result['not_canonical'] == []
+
+
+def test_every_sitemap_is_read_and_the_first_loc_wins(tmp_path):
+    write_sitemap(tmp_path, ['/a'], 'sitemap-0.xml')
+    write_sitemap(tmp_path, ['/a/', '/b'], 'sitemap-1.xml')
+    result = reconcile(tmp_path, [], [], ['sitemap-0.xml', 'sitemap-1.xml', 'missing.xml'])
+    assert result['no_page'] == [f"{SITE}/a", f"{SITE}/b"]
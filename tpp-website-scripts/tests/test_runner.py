@@ -0,0 +1,26 @@
+"""
+Check selection in the single-pass runner
+"""
+
+import pytest
+
+from tpp_audit.runner import CHECKS, IndexCheck, needs_every_page, select_checks
+
+
+def test_page_checks_alone_do_not_need_every_page():
+    assert not needs_every_page(select_checks(['meta', 'schema']))
+
+
+@pytest.mark.parametrize('name', [name for name, check in CHECKS.items()
+                                  if isinstance(check, IndexCheck) or check.site_wide])
+def test_site_wide_checks_need_every_page(name):
+    assert needs_every_page(select_checks(['meta', name]))
+
+
+def test_default_selection_needs_every_page():
+    assert needs_every_page(select_checks())
+
+
+def test_unknown_checks_are_rejected():
+    with pytest.raises(ValueError, match='nope'):
+        select_checks(['meta', 'nope'])
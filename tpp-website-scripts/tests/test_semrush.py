@@ -0,0 +1,143 @@
+"""
+Semrush export tables, URL keys and crawl comparison
+"""
+
+import pytest
+
+from tpp_audit.semrush import (
+    AuditSnapshot,
+    ExportError,
+    compare_audits,
+    crawl_key,
+    crawl_keys,
+    diff_snapshots,
+    find_exports,
+    join_findings,
+    page_key,
+    read_table,
+)
+
+SITE = 'https://theprofitplatform.com.au'
+
+
+def write_csv(path, text):
+    path.write_text(text, encoding='utf-8-sig')
+    return path
+
+
+def test_read_table_maps_header_names_to_columns(tmp_path):
+    table = read_table(write_csv(tmp_path / 'a.csv',
+                                 'Page URL,Broken links,Note\n'
+                                 '/a,1,x\n'
+                                 '/b,n/a\n'
+                                 '/c,2.0,y,extra\n'))
+    assert table.header == ['Page URL', 'Broken links', 'Note']
+    assert len(table) == 3 and 'Note' in table and 'Extra' not in table
+    assert table.column('Page URL') == ('/a', '/b', '/c')
+    assert table.column('Note') == ('x', '', 'y')
+    assert list(table.counts('Broken links')) == [1, 0, 2]
+    with pytest.raises(ExportError, match="Missing column 'Status'"):
+        table.column('Status')
+
+
+def test_read_table_with_only_a_header(tmp_path):
+    table = read_table(write_csv(tmp_path / 'a.csv', 'Page URL,Broken links\n'))
+    assert len(table) == 0
+    assert table.column('Broken links') == ()
+
+
+@pytest.mark.parametrize('url, key', [
+    (f"{SITE}/", '/'),
+    (SITE, '/'),
+    ('http://www.theprofitplatform.com.au/about/', '/about'),
+    (f"{SITE}/about.html", '/about'),
+    (f"{SITE}/services/index.html", '/services'),
+    (f"{SITE}/index.html", '/'),
+    (f"{SITE}/blog/?tag=seo", '/blog?tag=seo'),
+    (f"{SITE}/blog?", '/blog'),
+    (f"{SITE}/about#team", '/about'),
+    (f"{SITE}/caf%C3%A9", '/café'),
+])
+def test_crawl_key(url, key):
+    assert crawl_key(url) == key
+
+
+def test_crawl_keys_matches_per_url_keys():
+    urls = (f"{SITE}/", f"{SITE}/a.html", f"{SITE}/b/?x=1", f"{SITE}/a%0Ab")
+    assert crawl_keys(urls) == tuple(map(crawl_key, urls))
+    assert crawl_keys(urls[:3]) == ('/', '/a', '/b?x=1')
+    assert crawl_keys(()) == ()
+    assert page_key('/blog?tag=seo') == '/blog'
+
+
+def test_find_exports_groups_by_date(tmp_path):
+    for name in ['site.com.au_mega_export_20240101.csv', 'site.com.au_issues_20240101.csv',
+                 'site.com.au_pages_20240201.csv', 'notes.csv']:
+        (tmp_path / name).write_text('')
+    assert find_exports(tmp_path) == {
+        '20240101': {'mega_export': tmp_path / 'site.com.au_mega_export_20240101.csv',
+                     'issues': tmp_path / 'site.com.au_issues_20240101.csv'},
+        '20240201': {'pages': tmp_path / 'site.com.au_pages_20240201.csv'},
+    }
+
+
+def snapshot(tmp_path, date, mega, issues=None, pages=None):
+    paths = {'mega_export': write_csv(tmp_path / f"mega-{date}.csv", mega)}
+    if issues:
+        paths['issues'] = write_csv(tmp_path / f"issues-{date}.csv", issues)
+    if pages:
+        paths['pages'] = write_csv(tmp_path / f"pages-{date}.csv", pages)
+    return AuditSnapshot.load(date, paths)
+
+
+def test_snapshot_maps_issue_columns_and_types(tmp_path):
+    crawl = snapshot(
+        tmp_path, '20240101',
+        'Page URL,Broken links,Missing alt\n'
+        f"{SITE}/a/,2,0\n"
+        f"{SITE}/a?page=2,1,n/a\n"
+        f"{SITE}/b.html,0,3\n",
+        issues='Issue,Issue Type\nBroken links,ERROR\n',
+        pages=f"Page URL,HTTP Status Code\n{SITE}/b/,404\n",
+    )
+    assert crawl.keys == ('/a', '/a?page=2', '/b')
+    assert set(crawl.counts) == {'Broken links', 'Missing alt'}
+    assert crawl.issue_type('Broken links') == 'ERROR'
+    assert crawl.issue_type('Missing alt') == 'NOTICE'
+    assert crawl.statuses == {'/b': '404'}
+    assert crawl.open_pages('Broken links') == {'/a', '/a?page=2'}
+    assert crawl.open_pages('Nope') == set()
+    # Query variants of /a add to its page, but each issue is counted once
+    assert crawl.page_totals() == {'/a': 1, '/b': 1}
+    with pytest.raises(ExportError, match='No mega export'):
+        AuditSnapshot.load('20240101', {})
+
+
+def test_diff_snapshots_and_join_findings(tmp_path):
+    old = snapshot(tmp_path, '1', f"Page URL,Broken links\n{SITE}/a,1\n{SITE}/b,1\n{SITE}/c,1\n",
+                   issues='Issue,Issue Type\nBroken links,ERROR\n')
+    new = snapshot(tmp_path, '2', 'Page URL,Broken links,Missing alt\n'
+                                  f"{SITE}/a,0,1\n{SITE}/b,1,0\n{SITE}/d,2,0\n",
+                   issues='Issue,Issue Type\nBroken links,ERROR\nMissing alt,WARNING\n')
+    broken, alt = diff_snapshots(old, new)
+    assert (broken.issue, broken.issue_type, alt.issue_type) == ('Broken links', 'ERROR', 'WARNING')
+    assert broken.fixed == {'/a'} and broken.gone == {'/c'}
+    assert broken.introduced == {'/d'} and broken.still_open == {'/b'}
+    assert alt.introduced == {'/a'}
+
+    rows, crawl_only, build_only = join_findings(new, {'/a': [0, 1], '/b': [2, 0], '/e': [1, 0]})
+    assert rows == [('/b', 1, 2, 0), ('/a', 1, 0, 1)]
+    assert crawl_only == ['/d'] and build_only == ['/e']
+
+
+def test_compare_audits_reads_the_two_crawl_columns(tmp_path):
+    table = read_table(write_csv(tmp_path / 'compare.csv',
+                                 'Issue Id,Issue,Jan 1,Feb 1,Delta,Delta Percent\n'
+                                 '1,Broken links,5,2,-3,-60\n'
+                                 '2,Missing alt,4,4,0,0\n'
+                                 '3,Slow pages,,1,1,n/a\n'))
+    moved, crawls = compare_audits(table)
+    assert crawls == ('Jan 1', 'Feb 1')
+    assert moved == [('Broken links', 5, 2, -3), ('Slow pages', 0, 1, 1)]
+    with pytest.raises(ExportError, match='two crawl columns'):
+        compare_audits(read_table(write_csv(tmp_path / 'bad.csv', 'Issue,Jan 1,Delta\n')))
@@ -0,0 +1,81 @@
+"""
+JSON-lines protocol of python -m tpp_audit serve
+"""
+
+import io
+import json
+import subprocess
+import sys
+
+from tpp_audit.__main__ import PROTOCOL_VERSION, serve
+
+from conftest import SCRIPTS_DIR
+
+PAGE = """<!DOCTYPE html>
+<html lang="en-AU">
+<head>
+<title>Plumbing in Parramatta | The Profit Platform</title>
+<meta name="description" content="Plumbing help for Parramatta homes and businesses.">
+</head>
+<body><main><p>Hello</p></main></body>
+</html>
+"""
+
+
+def run_serve(tmp_path, lines):
+    stdin = io.StringIO(''.join(line + '\n' for line in lines))
+    stdout = io.StringIO()
+    assert serve(tmp_path, stdin=stdin, stdout=stdout) == 0
+    return [json.loads(line) for line in stdout.getvalue().splitlines()]
+
+
+def test_bad_lines_are_answered_and_the_server_keeps_serving(tmp_path):
+    (tmp_path / 'about.html').write_text(PAGE)
+    real_stdout = sys.stdout
+    ready, *responses = run_serve(tmp_path, [
+        '[1, 2]',
+        '"x"',
+        '42',
+        'null',
+        '{not json',
+        '',
+        '{"id": 5, "op": "dance"}',
+        '{"id": 6, "op": "check", "files": ["about.html"], "checks": ["nope"]}',
+        '{"id": 7, "op": "check", "files": ["about.html"], "checks": ["meta"]}',
+        '{"id": 8, "op": "shutdown"}',
+        '{"id": 9, "op": "ping"}',
+    ])
+
+    assert sys.stdout is real_stdout
+    assert ready['event'] == 'ready' and ready['protocol'] == PROTOCOL_VERSION
+    assert 'meta' in ready['checks']
+
+    # Blank lines are skipped; everything after shutdown is ignored
+    assert [response['id'] for response in responses] == [None] * 5 + [5, 6, 7, 8]
+    for response in responses[:4]:
+        assert response == {'id': None, 'ok': False,
+                            'error': 'ValueError: Request must be a JSON object'}
+    assert responses[4]['error'].startswith('JSONDecodeError')
+    assert responses[5]['error'] == 'ValueError: Unknown op: dance'
+    assert not responses[6]['ok']
+
+    checked = responses[7]
+    assert checked['ok'] and checked['elapsed_ms'] >= 0
+    assert checked['result']['checks'] == ['meta']
+    assert [result['path'] for result in checked['result']['files']] == ['about.html']
+    assert responses[8] == {'id': 8, 'ok': True}
+
+
+def test_ping_and_checks_over_a_pipe(tmp_path):
+    requests = [{'id': 1, 'op': 'ping'}, [3], {'id': 2, 'op': 'checks'}]
+    proc = subprocess.run(
+        [sys.executable, '-m', 'tpp_audit', '--root', str(tmp_path), 'serve'],
+        input=''.join(json.dumps(request) + '\n' for request in requests),
+        capture_output=True, text=True, cwd=SCRIPTS_DIR, timeout=60,
+    )
+    assert proc.returncode == 0, proc.stderr
+    ready, *responses = [json.loads(line) for line in proc.stdout.splitlines()]
+    assert ready['event'] == 'ready'
+    assert responses[0] == {'id': 1, 'ok': True}
+    assert responses[1]['id'] is None and not responses[1]['ok']
+    assert responses[2]['checks'] == ready['checks']
@@ -0,0 +1,118 @@
+"""
+MinHash signatures and LSH clustering of near-duplicate pages
+"""
+
+import os
+import random
+import subprocess
+import sys
+
+import pytest
+
+from tpp_audit.similarity import (
+    NUM_PERM,
+    body_words,
+    decode_signature,
+    find_near_duplicates,
+    lsh_params,
+    minhash,
+    page_signature,
+    shingle_hashes,
+    similarity,
+)
+
+from conftest import SCRIPTS_DIR
+
+_rng = random.Random(1)
+VOCABULARY = [f"word{n}" for n in range(5000)]
+
+
+def text(n_words, rng=_rng):
+    return [rng.choice(VOCABULARY) for _ in range(n_words)]
+
+
+def page(words, boilerplate='Call us today'):
+    return (f"<html><body><nav>{boilerplate}</nav><main><h1>Title</h1><p>{' '.join(words)}</p>"
+            f"<script>var x = 1;</script></main><footer>{boilerplate}</footer></body></html>"
+            ).encode('utf-8')
+
+
+def exact_jaccard(a, b):
+    a, b = set(shingle_hashes(a)), set(shingle_hashes(b))
+    return len(a & b) / len(a | b)
+
+
+def test_body_words_reads_main_only_and_skips_scripts():
+    words = body_words(page(['Plumber', 'in', 'Parramatta&amp;Ryde']))
+    assert words == ['title', 'plumber', 'in', 'parramatta', 'ryde']
+
+
+def test_signature_round_trips_and_is_deterministic():
+    facts = page_signature(page(text(200)))
+    assert facts['words'] == 201
+    signature = decode_signature(facts['signature'])
+    assert len(signature) == NUM_PERM
+    assert page_signature(page(text(0)))['signature'] is None
+    assert decode_signature(page_signature(page(['a'] * 10))['signature']) == \
+        decode_signature(page_signature(page(['a'] * 10))['signature'])
+
+
+@pytest.mark.parametrize('changed', [10, 50, 150])
+def test_minhash_estimates_jaccard(changed):
+    rng = random.Random(changed)
+    base = text(600, rng)
+    edited = list(base)
+    for i in rng.sample(range(len(base)), changed):
+        edited[i] = rng.choice(VOCABULARY)
+    estimate = similarity(minhash(shingle_hashes(base)), minhash(shingle_hashes(edited)))
+    # Standard error of a 128-value estimate is at most ~0.045
+    assert abs(estimate - exact_jaccard(base, edited)) < 0.15
+
+
+def test_lsh_params_midpoint_is_at_or_below_threshold():
+    for threshold in (0.5, 0.8, 0.9):
+        bands, rows = lsh_params(NUM_PERM, threshold)
+        assert bands * rows == NUM_PERM
+        assert (1 / bands) ** (1 / rows) <= threshold
+
+
+def test_templated_pages_cluster_and_distinct_pages_do_not():
+    rng = random.Random(7)
+    template = text(400, rng)
+    facts = []
+    # Suburb pages: the same template with a different suburb name swapped in
+    for suburb in ['parramatta', 'ryde', 'penrith', 'blacktown']:
+        words = list(template)
+        words[100] = words[250] = suburb
+        facts.append(page_signature(page(words)))
+    facts.append(page_signature(page(text(400, rng))))
+    facts.append(page_signature(page(text(3, rng))))
+    facts.append(page_signature(page(text(400, rng))))
+
+    clusters = find_near_duplicates(facts, threshold=0.8)
+    assert len(clusters) == 1
+    page_ids, lowest = clusters[0]
+    assert page_ids == [0, 1, 2, 3]
+    assert 0.8 <= lowest < 1
+
+
+def test_clusters_merge_across_buckets_largest_first():
+    rng = random.Random(11)
+    big, small = text(400, rng), text(400, rng)
+    facts = [page_signature(page(small)), page_signature(page(big))]
+    facts += [page_signature(page(big)) for _ in range(3)]
+    facts += [page_signature(page(small))]
+
+    clusters = find_near_duplicates(facts)
+    assert [page_ids for page_ids, _ in clusters] == [[1, 2, 3, 4], [0, 5]]
+    assert all(lowest == 1 for _, lowest in clusters)
+
+
+def test_loading_the_runner_does_not_import_numpy(tmp_path):
+    # A stand-in numpy that leaves a marker when something imports it
+    (tmp_path / 'numpy.py').write_text(
+        f"open({str(tmp_path / 'imported')!r}, 'w').close()\n")
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join([str(tmp_path), str(SCRIPTS_DIR)]))
+    subprocess.run([sys.executable, '-c', 'import tpp_audit.api, tpp_audit.runner'],
+                   check=True, env=env, cwd=tmp_path)
+    assert not (tmp_path / 'imported').exists()
@@ -0,0 +1,98 @@
+"""
+LocSet, iter_locs and check_sitemap over plain, gzip and index sitemaps
+"""
+
+import gzip
+import random
+
+from tpp_audit.sitemap import LocSet, check_sitemap, iter_locs, sitemap_digest, sitemap_files
+
+SITE = 'https://theprofitplatform.com.au'
+NS = 'http://www.sitemaps.org/schemas/sitemap/0.9'
+
+
+def urlset(locs):
+    entries = ''.join(f"<url><loc>{loc}</loc><lastmod>2024-05-01</lastmod></url>\n"
+                      for loc in locs)
+    return f'<?xml version="1.0" encoding="UTF-8"?>\n<urlset xmlns="{NS}">\n{entries}</urlset>\n'
+
+
+def sitemapindex(names):
+    entries = ''.join(f"<sitemap><loc>{SITE}/{name}</loc></sitemap>\n" for name in names)
+    return (f'<?xml version="1.0" encoding="UTF-8"?>\n'
+            f'<sitemapindex xmlns="{NS}">\n{entries}</sitemapindex>\n')
+
+
+def write(path, text):
+    if path.suffix == '.gz':
+        with gzip.open(path, 'wt', encoding='utf-8') as f:
+            f.write(text)
+    else:
+        path.write_text(text, encoding='utf-8')
+    return path
+
+
+def test_locset_reports_duplicates_across_growth():
+    locs = [f"{SITE}/page-{n}" for n in range(5000)]
+    seen = LocSet(capacity=8)
+    assert [seen.add(loc) for loc in locs] == [False] * len(locs)
+    assert len(seen) == len(locs)
+    shuffled = random.Random(3).sample(locs, len(locs))
+    assert all(seen.add(loc) for loc in shuffled)
+    assert not seen.add(f"{SITE}/page-5000")
+    assert len(seen) == len(locs) + 1
+
+
+def test_iter_locs_reads_gzip(tmp_path):
+    locs = [f"{SITE}/a", f"{SITE}/b?x=1&amp;y=2"]
+    path = write(tmp_path / 'sitemap.xml.gz', urlset(locs))
+    assert list(iter_locs(path)) == [f"{SITE}/a", f"{SITE}/b?x=1&y=2"]
+    assert check_sitemap(path) == {'url_count': 2, 'sitemaps': ['sitemap.xml.gz'], 'errors': []}
+
+
+def test_iter_locs_follows_an_index(tmp_path):
+    write(tmp_path / 'sitemap-0.xml', urlset([f"{SITE}/a", f"{SITE}/b"]))
+    write(tmp_path / 'sitemap-1.xml.gz', urlset([f"{SITE}/c"]))
+    index = write(tmp_path / 'sitemap-index.xml',
+                  sitemapindex(['sitemap-0.xml', 'sitemap-1.xml.gz', 'sitemap-2.xml']))
+
+    assert [path.name for path in sitemap_files(index)] == [
+        'sitemap-index.xml', 'sitemap-0.xml', 'sitemap-1.xml.gz', 'sitemap-2.xml']
+    # The missing child is skipped here; check_sitemap reports it
+    assert list(iter_locs(index)) == [f"{SITE}/a", f"{SITE}/b", f"{SITE}/c"]
+
+    findings = check_sitemap(index)
+    assert findings['url_count'] == 3
+    assert findings['sitemaps'] == ['sitemap-index.xml', 'sitemap-0.xml', 'sitemap-1.xml.gz']
+    assert findings['errors'] == [f"Child sitemap not found in build: {SITE}/sitemap-2.xml"]
+
+
+def test_duplicates_are_found_across_children(tmp_path):
+    write(tmp_path / 'sitemap-0.xml', urlset([f"{SITE}/a"]))
+    write(tmp_path / 'sitemap-1.xml', urlset([f"{SITE}/b", f"{SITE}/a"]))
+    index = write(tmp_path / 'sitemap-index.xml', sitemapindex(['sitemap-0.xml', 'sitemap-1.xml']))
+    assert check_sitemap(index)['errors'] == [
+        f"sitemap-1.xml: URL 2: Duplicate <loc>: {SITE}/a"]
+
+
+def test_broken_files_stop_iteration_quietly(tmp_path):
+    write(tmp_path / 'sitemap-0.xml', urlset([f"{SITE}/a"])[:-len('</urlset>\n')])
+    (tmp_path / 'sitemap-1.xml').write_bytes(b'')
+    write(tmp_path / 'sitemap-2.xml.gz', urlset([f"{SITE}/c"]))
+    (tmp_path / 'sitemap-3.xml.gz').write_bytes(b'not gzip')
+    index = write(tmp_path / 'sitemap-index.xml', sitemapindex(
+        ['sitemap-0.xml', 'sitemap-1.xml', 'sitemap-2.xml.gz', 'sitemap-3.xml.gz']))
+
+    assert list(iter_locs(index)) == [f"{SITE}/a", f"{SITE}/c"]
+    errors = check_sitemap(index)['errors']
+    assert [error.split(':')[0] for error in errors] == [
+        'sitemap-0.xml', 'sitemap-1.xml', 'sitemap-3.xml.gz']
+
+
+def test_digest_covers_children(tmp_path):
+    child = write(tmp_path / 'sitemap-0.xml', urlset([f"{SITE}/a"]))
+    index = write(tmp_path / 'sitemap-index.xml', sitemapindex(['sitemap-0.xml']))
+    before = sitemap_digest(index)
+    assert sitemap_digest(index, chunk_size=7) == before
+    write(child, urlset([f"{SITE}/b"]))
+    assert sitemap_digest(index) != before
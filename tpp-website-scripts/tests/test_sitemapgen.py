@@ -0,0 +1,68 @@
+"""
+Sharded sitemap writer limits and streaming discovery
+"""
+
+import pytest
+
+from tpp_audit.discovery import discover_html_files, iter_html_files
+from tpp_audit.sitemap import MAX_URLS, iter_locs
+from tpp_audit.sitemapgen import ShardedSitemapWriter
+
+SITE = 'https://theprofitplatform.com.au'
+
+
+def test_shards_at_max_urls_and_lists_them_in_the_index(tmp_path):
+    writer = ShardedSitemapWriter(tmp_path, SITE, max_urls=2)
+    for n in range(5):
+        writer.add(f"{SITE}/page-{n}", '2024-01-0%d' % (n + 1))
+    shards, index_written, removed = writer.close()
+
+    assert [name for name, _, _ in shards] == ['sitemap-0.xml', 'sitemap-1.xml', 'sitemap-2.xml']
+    assert [newest for _, newest, _ in shards] == ['2024-01-02', '2024-01-04', '2024-01-05']
+    assert index_written and removed == []
+    assert list(iter_locs(tmp_path / 'sitemap-index.xml')) == [
+        f"{SITE}/page-{n}" for n in range(5)]
+
+
+def test_unchanged_shards_are_not_rewritten_and_stale_ones_removed(tmp_path):
+    writer = ShardedSitemapWriter(tmp_path, SITE, max_urls=1)
+    writer.add(f"{SITE}/a", '2024-01-01')
+    writer.add(f"{SITE}/b", '2024-01-01')
+    writer.close()
+
+    writer = ShardedSitemapWriter(tmp_path, SITE, max_urls=1)
+    writer.add(f"{SITE}/a", '2024-01-01')
+    shards, index_written, removed = writer.close()
+
+    assert shards == [('sitemap-0.xml', '2024-01-01', False)]
+    assert index_written
+    assert removed == ['sitemap-1.xml']
+
+
+def test_empty_index_is_never_written(tmp_path):
+    writer = ShardedSitemapWriter(tmp_path, SITE)
+    with pytest.raises(ValueError):
+        writer.close()
+    assert list(tmp_path.iterdir()) == []
+
+
+@pytest.mark.parametrize('max_urls', [0, -1, MAX_URLS + 1])
+def test_max_urls_is_clamped_to_the_protocol_limit(tmp_path, max_urls):
+    with pytest.raises(ValueError):
+        ShardedSitemapWriter(tmp_path, SITE, max_urls=max_urls)
+
+
+def test_iter_html_files_matches_discover_html_files(tmp_path):
+    for rel_path in ['index.html', 'a.html', 'a/x.html', 'a/b/y.html', 'a-b/z.html',
+                     'B/upper.html', 'node_modules/skip.html', '.hidden/skip.html',
+                     'drafts/skip.html', 'notes.txt']:
+        path = tmp_path / rel_path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text('<html></html>')
+
+    iterated = iter_html_files(tmp_path, exclude=['drafts'])
+    assert not isinstance(iterated, list)
+    found = list(iterated)
+    assert found == discover_html_files(tmp_path, recursive=True, exclude=['drafts'])
+    assert [path.relative_to(tmp_path).as_posix() for path in found] == [
+        'B/upper.html', 'a/b/y.html', 'a/x.html', 'a-b/z.html', 'a.html', 'index.html']
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+
+"""
+Unified site audit
+Runs meta tag, JSON-LD schema, duplicate, near-duplicate content, NAP
+consistency, hreflang, internal link, asset weight, sitemap and sitemap
+reconciliation checks with one parse per page
+"""
+
+import argparse
+import os
+import sys
+from pathlib import Path
+
+from tpp_audit.cache import add_cache_arguments, finish_cache
+from tpp_audit.discovery import discover_html_files
+from tpp_audit.runner import CHECKS, ERROR, needs_every_page, run_audit, select_checks
+from tpp_audit.watch import DEFAULT_DEBOUNCE, AuditSession, watch_site
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Run all site checks in a single pass')
+    parser.add_argument('--root', type=Path, default=Path(__file__).parent.parent,
+                        help='Site root to scan (default: repository root)')
+    parser.add_argument('-r', '--recursive', action='store_true',
+                        help='Scan subdirectories (local/, power/, blog/, ...); always on '
+                             'when a site-wide check is selected')
+    parser.add_argument('--include', action='append', metavar='GLOB',
+                        help='Only check files matching GLOB (repeatable, default: *.html)')
+    parser.add_argument('--exclude', action='append', metavar='GLOB', default=[],
+                        help='Skip files or directories matching GLOB (repeatable)')
+    parser.add_argument('-j', '--jobs', type=int, default=1,
+                        help='Worker processes (0 = all cores, default: 1)')
+    parser.add_argument('--checks', default=','.join(CHECKS),
+                        help=f"Comma-separated checks to run (default: {','.join(CHECKS)})")
+    parser.add_argument('--rules', type=Path,
+                        help='Meta tag rules file (default: meta-rules.json, or $TPP_META_RULES)')
+    parser.add_argument('--watch', action='store_true',
+                        help='Keep running and re-validate pages as they change (implies -r)')
+    parser.add_argument('--poll', action='store_true',
+                        help='Watch by polling instead of inotify')
+    parser.add_argument('--debounce', type=float, default=DEFAULT_DEBOUNCE,
+                        help=f'Seconds of quiet before re-validating (default: {DEFAULT_DEBOUNCE})')
+    add_cache_arguments(parser)
+    return parser.parse_args(argv)
+
+def print_findings(findings, totals):
+    """Print one page's (or site check's) findings and add them to totals"""
+    clean = True
+
+    for check_name, results in findings.items():
+        for severity, message in results:
+            clean = False
+            if severity == ERROR:
+                print(f"  ❌ {check_name}: {message}")
+                totals[check_name][0] += 1
+            else:
+                print(f"  ⚠️  {check_name}: {message}")
+                totals[check_name][1] += 1
+
+    if clean:
+        print("  ✓ No issues")
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    if args.rules:
+        # Exported so worker processes load the same rules
+        os.environ['TPP_META_RULES'] = str(args.rules.resolve())
+    check_names = [name.strip() for name in args.checks.split(',') if name.strip()]
+
+    unknown = [name for name in check_names if name not in CHECKS]
+    if unknown:
+        print(f"❌ Unknown check(s): {', '.join(unknown)}")
+        return 2
+
+    print(f"🔍 Running site audit ({', '.join(check_names)})...\n")
+
+    root_dir = args.root
+
+    if args.watch:
+        session = AuditSession(root_dir, check_names, include=args.include,
+                               exclude=args.exclude, use_cache=not args.no_cache)
+        return watch_site(session, poll=args.poll, debounce=args.debounce)
+
+    # Site-wide checks need every page, as validate-sitemap.py --reconcile does
+    recursive = args.recursive or needs_every_page(select_checks(check_names))
+    html_files = discover_html_files(root_dir, recursive=recursive,
+                                     include=args.include, exclude=args.exclude)
+
+    page_results, site_results, cached_check = run_audit(
+        root_dir, html_files, check_names, jobs=args.jobs, use_cache=not args.no_cache)
+
+    totals = {name: [0, 0] for name in check_names}
+
+    for html_file, result, _, _ in page_results:
+        print(f"📄 {html_file.relative_to(root_dir).as_posix()}")
+        print_findings(result['findings'], totals)
+        print()
+
+    for check_name, results in site_results.items():
+        print(f"🌐 {check_name}")
+        print_findings({check_name: results}, totals)
+        print()
+
+    total_errors = sum(errors for errors, _ in totals.values())
+
+    print(f"📊 Summary:")
+    print(f"   Files checked: {len(page_results)}")
+    for check_name, (errors, warnings) in totals.items():
+        print(f"   {check_name}: {errors} errors, {warnings} warnings")
+    print(f"   Total errors: {total_errors}\n")
+
+    if page_results:
+        finish_cache(cached_check, [outcome[1:] for outcome in page_results],
+                     show_stats=args.cache_stats)
+
+    if total_errors > 0:
+        print("❌ Site audit FAILED\n")
+        return 1
+    else:
+        print("✅ Site audit PASSED\n")
+        return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,28 @@
+"""
+Shared helpers for the tpp-website-scripts validators
+
+The library interface (audit, check_meta, check_schema, check_sitemap and
+their result classes, see tpp_audit.api) is available from the package
+itself and loaded on first access, so importing one helper module does not
+pull in every check
+"""
+
+_API_NAMES = {
+    'AuditResult',
+    'FileResult',
+    'Finding',
+    'audit',
+    'available_checks',
+    'check_meta',
+    'check_schema',
+    'check_sitemap',
+}
+
+__all__ = sorted(_API_NAMES)
+
+
+def __getattr__(name):
+    if name in _API_NAMES:
+        from tpp_audit import api
+        return getattr(api, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
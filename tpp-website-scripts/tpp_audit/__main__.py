@@ -0,0 +1,179 @@
+"""
+Validator command line: python -m tpp_audit {check,serve,list}
+
+check runs checks once and prints findings (or JSON); serve keeps one
+process warm and answers JSON-lines requests on stdin, so a build can send
+batches of files without paying interpreter and import start-up per check.
+Only argparse and json are imported before a command needs more
+
+Protocol (one JSON object per line each way):
+
+    <- {"event": "ready", "protocol": 1, "checks": [...]}
+    -> {"id": 1, "op": "check", "files": ["about.html"], "checks": ["meta"]}
+    <- {"id": 1, "ok": true, "elapsed_ms": 3.1, "result": {...}}
+    -> {"id": 2, "op": "shutdown"}
+    <- {"id": 2, "ok": true}
+
+op defaults to "check"; "files" defaults to every page and "checks" to
+meta and schema; "root" and "use_cache" override the server's defaults.
+"ping" and "checks" are also understood. A failed request answers
+{"id": ..., "ok": false, "error": "..."} and the server keeps running.
+"""
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+PROTOCOL_VERSION = 1
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m tpp_audit',
+                                     description='Run the site validators')
+    parser.add_argument('--root', type=Path,
+                        help='Site root (default: repository root)')
+    parser.add_argument('--no-cache', action='store_true',
+                        help='Ignore and do not update the result cache')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    check = commands.add_parser('check', help='Check files once and print the findings')
+    check.add_argument('files', nargs='*',
+                       help='Pages relative to the root (default: every page)')
+    check.add_argument('--checks',
+                       help='Comma-separated checks (default: meta,schema)')
+    check.add_argument('-j', '--jobs', type=int, default=1,
+                       help='Worker processes (0 = all cores, default: 1)')
+    check.add_argument('--json', action='store_true',
+                       help='Print the result as JSON')
+
+    commands.add_parser('serve', help='Answer JSON-lines requests on stdin')
+    commands.add_parser('list', help='List the available checks')
+    return parser.parse_args(argv)
+
+
+def split_checks(value):
+    if not value:
+        return None
+    return [name.strip() for name in value.split(',') if name.strip()]
+
+
+def print_result(result):
+    for file_result in result.files:
+        if not file_result.findings:
+            continue
+        print(f"📄 {file_result.path}")
+        for finding in file_result.findings:
+            icon = '❌' if finding.severity == 'error' else '⚠️ '
+            print(f"  {icon} {finding.check}: {finding.message}")
+        print()
+    for name, findings in result.site.items():
+        print(f"🌐 {name}")
+        for finding in findings:
+            icon = '❌' if finding.severity == 'error' else '⚠️ '
+            print(f"  {icon} {finding.message}")
+        if not findings:
+            print("  ✓ No issues")
+        print()
+
+    print(f"📊 {len(result.files)} files, {result.errors} errors, {result.warnings} warnings "
+          f"({', '.join(result.checks)})\n")
+    print("✅ PASSED\n" if result.ok else "❌ FAILED\n")
+
+
+def run_check(args):
+    from tpp_audit.api import audit
+
+    try:
+        result = audit(args.files or None, args.root, split_checks(args.checks),
+                       jobs=args.jobs, use_cache=not args.no_cache)
+    except ValueError as e:
+        print(f"❌ {e}")
+        return 2
+    if args.json:
+        json.dump(result.to_dict(), sys.stdout, ensure_ascii=False)
+        print()
+    else:
+        print_result(result)
+    return 0 if result.ok else 1
+
+
+def handle_request(request, root, use_cache):
+    """Answer one decoded request; returns (response, keep serving)"""
+    from tpp_audit.api import audit, available_checks
+
+    op = request.get('op', 'check')
+    response = {'id': request.get('id'), 'ok': True}
+    if op == 'shutdown':
+        return response, False
+    if op == 'ping':
+        return response, True
+    if op == 'checks':
+        response['checks'] = available_checks()
+        return response, True
+    if op != 'check':
+        raise ValueError(f"Unknown op: {op}")
+
+    started = time.perf_counter()
+    result = audit(request.get('files'), request.get('root') or root, request.get('checks'),
+                   use_cache=request.get('use_cache', use_cache))
+    response['elapsed_ms'] = round((time.perf_counter() - started) * 1000, 1)
+    response['result'] = result.to_dict()
+    return response, True
+
+
+def serve(root=None, use_cache=True, stdin=sys.stdin, stdout=sys.stdout):
+    """JSON-lines loop; returns when stdin closes or on shutdown"""
+    from tpp_audit.api import available_checks
+    from tpp_audit.meta import load_rules
+
+    def send(message):
+        stdout.write(json.dumps(message, ensure_ascii=False) + '\n')
+        stdout.flush()
+
+    # Anything a check prints goes to stderr so stdout stays pure protocol
+    real_stdout, sys.stdout = sys.stdout, sys.stderr
+    try:
+        # Load the checks and rules before announcing readiness, so the first
+        # request is as fast as the rest
+        load_rules()
+        send({'event': 'ready', 'protocol': PROTOCOL_VERSION, 'checks': available_checks()})
+
+        for line in stdin:
+            if not line.strip():
+                continue
+            request = None
+            try:
+                request = json.loads(line)
+                if not isinstance(request, dict):
+                    raise ValueError('Request must be a JSON object')
+                response, keep_serving = handle_request(request, root, use_cache)
+            except Exception as e:
+                # Lines that are valid JSON but not an object have no id to echo
+                request_id = request.get('id') if isinstance(request, dict) else None
+                response, keep_serving = {'id': request_id, 'ok': False,
+                                          'error': f"{type(e).__name__}: {e}"}, True
+            send(response)
+            if not keep_serving:
+                break
+    finally:
+        sys.stdout = real_stdout
+    return 0
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.command == 'check':
+        return run_check(args)
+    if args.command == 'serve':
+        return serve(args.root, use_cache=not args.no_cache)
+
+    from tpp_audit.api import available_checks
+    for name in available_checks():
+        print(name)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
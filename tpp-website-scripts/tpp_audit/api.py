@@ -0,0 +1,175 @@
+"""
+Library interface to the validators
+Runs any mix of checks and returns result objects instead of printing, for
+callers that import the package or talk to the stdio server. The runner
+and the check modules are imported on first use, so importing this module
+costs next to nothing
+"""
+
+from pathlib import Path
+
+DEFAULT_ROOT = Path(__file__).resolve().parent.parent.parent
+
+# Checks run when none are named: the ones that only need the pages given
+PAGE_CHECKS = ['meta', 'schema']
+
+
+class Finding:
+    """One [severity, message] from a check"""
+
+    __slots__ = ('check', 'severity', 'message')
+
+    def __init__(self, check, severity, message):
+        self.check = check
+        self.severity = severity
+        self.message = message
+
+    def __repr__(self):
+        return f"Finding({self.check!r}, {self.severity!r}, {self.message!r})"
+
+    def to_dict(self):
+        return {'check': self.check, 'severity': self.severity, 'message': self.message}
+
+
+def _count(findings, severity):
+    return sum(finding.severity == severity for finding in findings)
+
+
+class FileResult:
+    """Findings for one page; cached is True when they came from the result cache"""
+
+    def __init__(self, path, findings, cached=False):
+        self.path = path
+        self.findings = findings
+        self.cached = cached
+
+    @property
+    def errors(self):
+        return _count(self.findings, 'error')
+
+    @property
+    def warnings(self):
+        return _count(self.findings, 'warning')
+
+    def to_dict(self):
+        return {
+            'path': self.path,
+            'errors': self.errors,
+            'warnings': self.warnings,
+            'cached': self.cached,
+            'findings': [finding.to_dict() for finding in self.findings],
+        }
+
+
+class AuditResult:
+    """Per-page results in input order plus site-wide findings by check name"""
+
+    def __init__(self, checks, files, site):
+        self.checks = checks
+        self.files = files
+        self.site = site
+
+    def findings(self):
+        for result in self.files:
+            yield from result.findings
+        for findings in self.site.values():
+            yield from findings
+
+    @property
+    def errors(self):
+        return _count(self.findings(), 'error')
+
+    @property
+    def warnings(self):
+        return _count(self.findings(), 'warning')
+
+    @property
+    def ok(self):
+        return self.errors == 0
+
+    def to_dict(self):
+        return {
+            'checks': self.checks,
+            'ok': self.ok,
+            'errors': self.errors,
+            'warnings': self.warnings,
+            'files': [result.to_dict() for result in self.files],
+            'site': {name: [finding.to_dict() for finding in findings]
+                     for name, findings in self.site.items()},
+        }
+
+
+def resolve_files(files, root_dir):
+    """Absolute paths for files given relative to root_dir (or absolute)
+
+    Raises ValueError for missing files and for files outside the root,
+    since every check keys its rules and URLs on the path relative to it.
+    """
+    resolved = []
+    for file in files:
+        path = Path(file)
+        path = (path if path.is_absolute() else root_dir / path).resolve()
+        if not path.is_relative_to(root_dir):
+            raise ValueError(f"{file} is outside the site root {root_dir}")
+        if not path.is_file():
+            raise ValueError(f"No such file: {file}")
+        resolved.append(path)
+    return resolved
+
+
+def audit(files=None, root=None, checks=None, jobs=1, use_cache=True):
+    """Run checks and return an AuditResult
+
+    files defaults to every page under root (recursively); checks defaults
+    to PAGE_CHECKS. Site-wide checks ('sitemap', 'links', ...) see only the
+    files given, so pass every page when using them.
+    """
+    from tpp_audit.cache import finish_cache
+    from tpp_audit.discovery import discover_html_files
+    from tpp_audit.runner import run_audit, select_checks
+
+    root_dir = Path(root or DEFAULT_ROOT).resolve()
+    names = [check.name for check in select_checks(checks or PAGE_CHECKS)]
+    if files is None:
+        html_files = discover_html_files(root_dir, recursive=True)
+    else:
+        html_files = resolve_files(files, root_dir)
+
+    page_results, site_results, cached_check = run_audit(root_dir, html_files, names,
+                                                         jobs=jobs, use_cache=use_cache)
+    if page_results:
+        finish_cache(cached_check, [outcome[1:] for outcome in page_results])
+
+    files = [
+        FileResult(
+            html_file.relative_to(root_dir).as_posix(),
+            [Finding(name, severity, message)
+             for name, findings in result['findings'].items()
+             for severity, message in findings],
+            cached=hit,
+        )
+        for html_file, result, _, hit in page_results
+    ]
+    site = {name: [Finding(name, severity, message) for severity, message in findings]
+            for name, findings in site_results.items()}
+    return AuditResult(names, files, site)
+
+
+def check_meta(files=None, root=None, **options):
+    """Meta tag rules (check-meta-tags.py) as an AuditResult"""
+    return audit(files, root, ['meta'], **options)
+
+
+def check_schema(files=None, root=None, **options):
+    """JSON-LD schema rules (validate-schema.py) as an AuditResult"""
+    return audit(files, root, ['schema'], **options)
+
+
+def check_sitemap(root=None, use_cache=True):
+    """The site's sitemap.xml and sitemap index (validate-sitemap.py) as an AuditResult"""
+    return audit([], root, ['sitemap'], use_cache=use_cache)
+
+
+def available_checks():
+    from tpp_audit.runner import CHECKS
+    return list(CHECKS)
@@ -0,0 +1,382 @@
+"""
+Per-page asset weight
+Finds the stylesheets, scripts, images, fonts and og:image each page
+references and resolves them against the build output through one shared
+asset graph. Every asset file is stat'ed once and every stylesheet read
+once for its @import and url() references, however many pages use it, so
+a page costs only set unions over assets already known
+"""
+
+import html
+import os
+import posixpath
+import re
+from array import array
+
+from tpp_audit.cache import cache_namespace
+from tpp_audit.urls import SiteIndex, page_url_path, resolve_href, site_hosts
+
+# Asset kinds counted in a page's transfer weight, in report order
+KINDS = ('html', 'css', 'js', 'image', 'font')
+
+# Default budgets in bytes; 'total' covers every kind, og:image is checked
+# on its own since it is fetched by link previews rather than the page
+DEFAULT_BUDGETS = {
+    'total': 1600 * 1024,
+    'html': 100 * 1024,
+    'css': 150 * 1024,
+    'js': 300 * 1024,
+    'image': 1000 * 1024,
+    'font': 200 * 1024,
+    'og:image': 1000 * 1024,
+}
+
+FONT_EXTENSIONS = ('.woff2', '.woff', '.ttf', '.otf', '.eot')
+
+# link rel -> kind; preload and modulepreload are handled by their 'as'
+LINK_KINDS = {'stylesheet': 'css', 'icon': 'image', 'shortcut': 'image'}
+PRELOAD_KINDS = {'style': 'css', 'script': 'js', 'font': 'font', 'image': 'image'}
+
+# Attribute values may contain '>' when quoted
+_ATTRS = rb'''((?:[^>"']|"[^"]*"|'[^']*')*)'''
+
+# Comments are skipped whole; <style> bodies are kept for their url()s and
+# <script> bodies skipped with the opening tag's attributes kept
+TAG_OR_SKIPPED = re.compile(
+    rb'<!--.*?-->'
+    rb'|<style\b[^>]*>(.*?)</style\s*>'
+    rb'|<script\b' + _ATTRS + rb'>.*?</script\s*>'
+    rb'|<(/?picture|link|img|source|video|meta|base)\b' + _ATTRS + rb'>',
+    re.IGNORECASE | re.DOTALL,
+)
+
+ATTR = re.compile(
+    rb'''(?:^|\s)([\w:-]+)\s*=\s*(?:"([^"]*)"|'([^']*)'|([^\s"'=<>`]+))''',
+)
+
+CSS_COMMENT = re.compile(rb'/\*.*?\*/', re.DOTALL)
+# Only the first source of an @font-face src list is downloaded
+FONT_SRC = re.compile(rb'(\bsrc\s*:)([^;}]*)')
+CSS_REF = re.compile(
+    rb'''@import\s+(?:url\(\s*)?["']?([^"')\s;]+)'''
+    rb'''|url\(\s*(?:"([^"]*)"|'([^']*)'|([^)\s]*))\s*\)''',
+    re.IGNORECASE,
+)
+
+# Bump when extraction changes so cached asset lists are invalidated
+RULES_VERSION = 1
+
+CACHE_NAMESPACE = cache_namespace('assets', RULES_VERSION, LINK_KINDS, PRELOAD_KINDS)
+
+
+def _attributes(attrs):
+    values = {}
+    for match in ATTR.finditer(attrs):
+        name = match.group(1).lower().decode('ascii', 'replace')
+        value = next(group for group in match.groups()[1:] if group is not None)
+        values.setdefault(name, html.unescape(value.decode('utf-8', 'replace')).strip())
+    return values
+
+
+def _srcset_urls(value):
+    # "a.jpg 1x, b.jpg 2x"; data: URIs contain commas and are not files
+    if value.startswith('data:'):
+        return []
+    return [candidate.split()[0] for candidate in value.split(',') if candidate.strip()]
+
+
+def css_refs(data):
+    """[(kind, raw URL)] a stylesheet (or <style> body) fetches"""
+    data = CSS_COMMENT.sub(b'', data)
+    data = FONT_SRC.sub(lambda match: match.group(1) + _first_url(match.group(2)), data)
+    refs = []
+    for match in CSS_REF.finditer(data):
+        if match.group(1) is not None:
+            refs.append(('css', match.group(1).decode('utf-8', 'replace')))
+            continue
+        url = next(group for group in match.groups()[1:] if group is not None)
+        url = url.decode('utf-8', 'replace').strip()
+        if url and not url.startswith(('data:', '#')):
+            refs.append((asset_kind(url), url))
+    return refs
+
+
+def _first_url(sources):
+    match = CSS_REF.search(sources)
+    return match.group(0) if match else b''
+
+
+def asset_kind(url):
+    """'font' for font files, otherwise 'image' (what url() in CSS usually loads)"""
+    path = url.split('?', 1)[0].split('#', 1)[0].lower()
+    return 'font' if path.endswith(FONT_EXTENSIONS) else 'image'
+
+
+def extract_assets(data):
+    """{'base', 'assets': [[kind, [candidate URLs]], ...], 'og_image'} for HTML bytes
+
+    Each entry is one download: an <img> with a srcset, or a <picture>
+    and its <source>s, is a single entry whose candidates are alternatives.
+    """
+    base = None
+    og_image = None
+    assets = []
+    picture = None
+    for match in TAG_OR_SKIPPED.finditer(data):
+        if match.group(1) is not None:
+            assets.extend([kind, [url]] for kind, url in css_refs(match.group(1)))
+            continue
+        if match.group(2) is not None:
+            src = _attributes(match.group(2)).get('src')
+            if src:
+                assets.append(['js', [src]])
+            continue
+        tag = match.group(3)
+        if tag is None:
+            continue
+        tag = tag.lower().decode('ascii')
+        if tag == 'picture':
+            picture = ['image', []]
+            continue
+        if tag == '/picture':
+            if picture and picture[1]:
+                assets.append(picture)
+            picture = None
+            continue
+
+        attrs = _attributes(match.group(4))
+        if tag == 'base':
+            base = base or attrs.get('href') or None
+        elif tag == 'meta':
+            prop = attrs.get('property') or attrs.get('name') or ''
+            if prop.lower() == 'og:image' and og_image is None:
+                og_image = attrs.get('content') or None
+        elif tag == 'link':
+            kind = _link_kind(attrs)
+            if kind and attrs.get('href'):
+                assets.append([kind, [attrs['href']]])
+        elif tag == 'video':
+            if attrs.get('poster'):
+                assets.append(['image', [attrs['poster']]])
+        elif tag in ('img', 'source'):
+            candidates = _srcset_urls(attrs.get('srcset', ''))
+            if tag == 'img' and attrs.get('src') and not attrs['src'].startswith('data:'):
+                candidates.insert(0, attrs['src'])
+            if picture is not None:
+                picture[1].extend(candidates)
+            elif tag == 'img' and candidates:
+                assets.append(['image', candidates])
+    return {'base': base, 'assets': assets, 'og_image': og_image}
+
+
+def _link_kind(attrs):
+    rel = attrs.get('rel', '').lower().split()
+    if 'preload' in rel:
+        return PRELOAD_KINDS.get(attrs.get('as', '').lower())
+    if 'modulepreload' in rel:
+        return 'js'
+    if 'alternate' in rel:
+        return None
+    for token in rel:
+        if token in LINK_KINDS:
+            return LINK_KINDS[token]
+    return None
+
+
+class PageWeight:
+    """What one page transfers: bytes per kind, plus what could not be counted
+
+    missing holds (kind, href) for internal assets with no file; external
+    counts assets on other hosts, which are not weighed. og_image is
+    (href, size or None) when the page declares one on this site.
+    """
+
+    def __init__(self, path, by_kind, missing, external, og_image):
+        self.path = path
+        self.by_kind = by_kind
+        self.missing = missing
+        self.external = external
+        self.og_image = og_image
+
+    @property
+    def total(self):
+        return sum(self.by_kind.values())
+
+    def over_budget(self, budgets):
+        """[(budget name, bytes, budget)] for every budget exceeded"""
+        over = []
+        sizes = dict(self.by_kind, total=self.total)
+        if self.og_image and self.og_image[1] is not None:
+            sizes['og:image'] = self.og_image[1]
+        for name, budget in budgets.items():
+            if sizes.get(name, 0) > budget:
+                over.append((name, sizes[name], budget))
+        return over
+
+
+class AssetGraph:
+    """Assets shared by every page, each resolved, stat'ed and scanned once
+
+    Asset ids index the parallel sizes (array('q')) and kinds columns.
+    Resolution is memoised per (href, directory it was written in), and a
+    stylesheet's transitive @import/url() closure per stylesheet, so a page
+    costs one dictionary lookup per reference. Background images in a
+    stylesheet count for every page that loads it, so weights are an upper
+    bound.
+    """
+
+    def __init__(self, root_dir, site_url=None):
+        self.site = SiteIndex(root_dir)
+        self.hosts = site_hosts(site_url) if site_url else site_hosts()
+        self.ids = {}
+        self.paths = []
+        self.kinds = []
+        self.sizes = array('q')
+        self.stats = 0
+        # {stylesheet id: [(kind, href)]} for references with no file
+        self.css_missing = {}
+        self._hrefs = {}
+        # {stylesheet id: [asset id]} it references directly
+        self._children = {}
+        self._closures = {}
+
+    def _intern(self, file_path, kind):
+        asset_id = self.ids.get(file_path)
+        if asset_id is None:
+            asset_id = self.ids[file_path] = len(self.paths)
+            self.paths.append(file_path)
+            self.kinds.append(kind)
+            try:
+                size = os.stat(self.site.root_dir / file_path.lstrip('/')).st_size
+            except OSError:
+                size = 0
+            self.stats += 1
+            self.sizes.append(size)
+        return asset_id
+
+    def resolve(self, href, base_path, kind):
+        """Asset id for href written on base_path; None when external, -1 when missing"""
+        key = (href, base_path if base_path.endswith('/') else posixpath.dirname(base_path), kind)
+        if key in self._hrefs:
+            return self._hrefs[key]
+        path = resolve_href(href, base_path, self.hosts)
+        if path is None:
+            asset_id = None
+        else:
+            found, chain = self.site.resolve(path)
+            if found is not None:
+                asset_id = self._intern(found, kind)
+            elif chain and chain[-1].startswith(('http://', 'https://')):
+                asset_id = None
+            else:
+                asset_id = -1
+        self._hrefs[key] = asset_id
+        return asset_id
+
+    def children(self, asset_id):
+        """Asset ids a stylesheet references directly, read once per stylesheet"""
+        children = self._children.get(asset_id)
+        if children is not None:
+            return children
+        children = self._children[asset_id] = []
+        if self.kinds[asset_id] != 'css':
+            return children
+        file_path = self.paths[asset_id]
+        try:
+            data = (self.site.root_dir / file_path.lstrip('/')).read_bytes()
+        except OSError:
+            data = b''
+        for kind, href in css_refs(data):
+            child = self.resolve(href, file_path, kind)
+            if child is None:
+                continue
+            if child < 0:
+                self.css_missing.setdefault(asset_id, []).append((kind, href))
+                continue
+            children.append(child)
+        return children
+
+    def closure(self, asset_id):
+        """frozenset of asset_id and everything a stylesheet pulls in"""
+        closure = self._closures.get(asset_id)
+        if closure is not None:
+            return closure
+        # Walk the whole reachable graph rather than recursing, so a sheet
+        # first reached inside an @import cycle is never memoised with only
+        # part of the cycle; closures already finished are reused whole
+        ids = {asset_id}
+        stack = [asset_id]
+        while stack:
+            current = stack.pop()
+            known = self._closures.get(current)
+            if known is not None:
+                ids |= known
+                continue
+            for child in self.children(current):
+                if child not in ids:
+                    ids.add(child)
+                    stack.append(child)
+        closure = self._closures[asset_id] = frozenset(ids)
+        return closure
+
+    def weigh(self, rel_path, facts):
+        """PageWeight for a page (path relative to the site root) and its extract_assets() facts"""
+        page_path = '/' + rel_path
+        base_path = page_url_path(rel_path)
+        if facts['base']:
+            base_path = resolve_href(facts['base'], base_path, self.hosts) or base_path
+
+        ids = {self._intern(page_path, 'html')}
+        missing = []
+        external = 0
+        for kind, candidates in facts['assets']:
+            chosen = None
+            for href in candidates:
+                asset_id = self.resolve(href, base_path, kind)
+                if asset_id is None:
+                    external += 1
+                elif asset_id < 0:
+                    missing.append((kind, href))
+                elif chosen is None or self.sizes[asset_id] > self.sizes[chosen]:
+                    # Of a srcset's alternatives, count the largest
+                    chosen = asset_id
+            if chosen is not None:
+                ids |= self.closure(chosen)
+
+        by_kind = dict.fromkeys(KINDS, 0)
+        for asset_id in ids:
+            by_kind[self.kinds[asset_id]] += self.sizes[asset_id]
+
+        og_image = None
+        if facts['og_image']:
+            href = facts['og_image']
+            asset_id = self.resolve(href, base_path, 'image')
+            if asset_id is not None:
+                og_image = (href, self.sizes[asset_id] if asset_id >= 0 else None)
+                if asset_id < 0:
+                    missing.append(('og:image', href))
+
+        return PageWeight(rel_path, by_kind, list(dict.fromkeys(missing)), external, og_image)
+
+
+def weigh_pages(root_dir, paths, facts, site_url=None):
+    """(AssetGraph, [PageWeight]) for pages (relative paths) and their extract_assets() facts"""
+    graph = AssetGraph(root_dir, site_url)
+    return graph, [graph.weigh(rel_path, page_facts) for rel_path, page_facts in zip(paths, facts)]
+
+
+def parse_size(text):
+    """Bytes from '300KB', '1.5MB', '2048' or '900B' (KB and MB are 1024-based)"""
+    match = re.fullmatch(r'\s*(\d+(?:\.\d+)?)\s*([KkMm]i?[Bb]?|[Bb])?\s*', text)
+    if not match:
+        raise ValueError(f"Invalid size: {text!r}")
+    unit = (match.group(2) or 'b')[0].lower()
+    return int(float(match.group(1)) * {'b': 1, 'k': 1024, 'm': 1024 * 1024}[unit])
+
+
+def format_size(size):
+    if size >= 1024 * 1024:
+        return f"{size / 1024 / 1024:.2f} MB"
+    if size >= 1024:
+        return f"{size / 1024:.1f} KB"
+    return f"{size} B"
@@ -0,0 +1,346 @@
+"""
+Benchmark harness for the validators
+Generates reproducible synthetic corpora and times each validator by phase
+"""
+
+import json
+import multiprocessing
+import random
+import resource
+import sys
+import time
+from pathlib import Path
+from queue import Empty
+
+from tpp_audit.headparse import extract_head_text
+from tpp_audit.meta import check_head
+from tpp_audit.jsonld import scan_json_ld
+from tpp_audit.schema import parse_json_ld, validate_schema
+from tpp_audit.sitemap import check_sitemap
+
+CORPUS_SIZES = {
+    '1k': 1_000,
+    '10k': 10_000,
+    '100k': 100_000,
+}
+
+SITEMAP_URLS = 50_000
+
+# Longest a single validator run may take before the benchmark gives up
+DEFAULT_TIMEOUT = 30 * 60.0
+
+# Bump when the generator changes so stale corpora are rebuilt
+CORPUS_VERSION = 1
+
+SUBURBS = [
+    'bondi', 'chatswood', 'crows-nest', 'double-bay', 'manly', 'mosman',
+    'neutral-bay', 'north-sydney', 'parramatta', 'st-leonards', 'surry-hills',
+    'sydney-cbd', 'penrith', 'liverpool', 'hornsby', 'ryde', 'strathfield',
+]
+
+SERVICES = ['seo-services', 'google-ads-management', 'social-media-marketing', 'web-design']
+
+WORDS = (
+    'local search results customers business growth traffic ranking strategy '
+    'campaign conversion keywords content audit technical performance sydney '
+    'agency proven reporting transparent results leads revenue marketing'
+).split()
+
+SITE_URL = 'https://theprofitplatform.com.au'
+
+
+def _sentence(rng, words):
+    return ' '.join(rng.choice(WORDS) for _ in range(words)).capitalize() + '.'
+
+
+def _json_ld(rng, url, suburb):
+    business = {
+        '@context': 'https://schema.org',
+        '@type': 'LocalBusiness',
+        'name': 'The Profit Platform',
+        'url': url,
+        'telephone': '+61 2 8000 0000',
+        'address': {
+            '@type': 'PostalAddress',
+            'addressLocality': suburb.replace('-', ' ').title(),
+            'addressRegion': 'NSW',
+            'addressCountry': 'AU',
+        },
+    }
+    # Roughly one page in twenty has a broken LocalBusiness block
+    if rng.random() < 0.05:
+        del business['telephone']
+
+    faq = {
+        '@context': 'https://schema.org',
+        '@type': 'FAQPage',
+        'mainEntity': [
+            {
+                '@type': 'Question',
+                'name': _sentence(rng, 8),
+                'acceptedAnswer': {'@type': 'Answer', 'text': _sentence(rng, 40)},
+            }
+            for _ in range(rng.randint(3, 8))
+        ],
+    }
+    graph = {
+        '@context': 'https://schema.org',
+        '@graph': [
+            {'@type': 'WebSite', 'name': 'The Profit Platform', 'url': SITE_URL},
+            {'@type': 'BreadcrumbList', 'itemListElement': [
+                {'@type': 'ListItem', 'position': 1, 'name': 'Home', 'item': SITE_URL},
+                {'@type': 'ListItem', 'position': 2, 'name': suburb, 'item': url},
+            ]},
+        ],
+    }
+    return [business, faq, graph]
+
+
+def generate_page(rng, index, body_kb=8):
+    """Build one synthetic suburb landing page"""
+    service = SERVICES[index % len(SERVICES)]
+    suburb = SUBURBS[index % len(SUBURBS)]
+    slug = f"{service}-{suburb}-{index}"
+    url = f"{SITE_URL}/local/{slug}/"
+
+    title = f"{service.replace('-', ' ').title()} {suburb.title()} | The Profit Platform"
+    if rng.random() < 0.1:
+        title += ' | Sydney Digital Marketing Agency'
+    description = ' '.join(_sentence(rng, 6) for _ in range(rng.randint(3, 5)))
+
+    head = [
+        '<meta charset="utf-8">',
+        '<meta name="viewport" content="width=device-width, initial-scale=1">',
+        f'<title>{title}</title>',
+        f'<meta name="description" content="{description}">',
+        f'<meta property="og:title" content="{title}">',
+        f'<meta property="og:description" content="{description}">',
+        f'<meta property="og:image" content="{SITE_URL}/assets/og/{service}.jpg">',
+        f'<meta property="og:url" content="{url}">',
+        '<meta property="og:type" content="website">',
+        f'<meta name="twitter:title" content="{title}">',
+        f'<link rel="canonical" href="{url}">',
+        '<link rel="preconnect" href="https://fonts.googleapis.com">',
+        '<link rel="stylesheet" href="/css/critical.css">',
+        '<link rel="stylesheet" href="/css/main.css" media="print" onload="this.media=\'all\'">',
+        '<link rel="icon" href="/favicon.ico">',
+        '<script async src="https://www.googletagmanager.com/gtag/js?id=G-XXXX"></script>',
+        '<style>' + ' '.join(f'.c{i}{{margin:{i}px;padding:{i}px}}' for i in range(120)) + '</style>',
+    ]
+    if rng.random() > 0.03:
+        head.append('<meta name="twitter:card" content="summary_large_image">')
+
+    body = []
+    size = 0
+    while size < body_kb * 1024:
+        paragraph = f"<section><h2>{_sentence(rng, 5)}</h2><p>{_sentence(rng, 60)}</p></section>"
+        body.append(paragraph)
+        size += len(paragraph)
+
+    scripts = ''.join(
+        f'<script type="application/ld+json">{json.dumps(block, indent=2)}</script>'
+        for block in _json_ld(rng, url, suburb)
+    )
+
+    html = (
+        '<!DOCTYPE html><html lang="en-AU"><head>'
+        + '\n'.join(head)
+        + '</head><body><header><nav><a href="/">Home</a></nav></header><main>'
+        + ''.join(body)
+        + '</main><footer>' + scripts + '</footer></body></html>'
+    )
+    return f"local/{slug}/index.html", html
+
+
+def generate_sitemap(rng, url_count=SITEMAP_URLS):
+    parts = ['<?xml version="1.0" encoding="UTF-8"?>\n',
+             '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n']
+    for i in range(url_count):
+        parts.append(
+            f"  <url><loc>{SITE_URL}/local/page-{i}/</loc>"
+            f"<lastmod>2025-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}</lastmod>"
+            f"<changefreq>{rng.choice(['daily', 'weekly', 'monthly'])}</changefreq>"
+            f"<priority>{rng.choice(['0.5', '0.6', '0.8'])}</priority></url>\n"
+        )
+    parts.append('</urlset>\n')
+    return ''.join(parts)
+
+
+def ensure_corpus(corpus_dir, pages, seed=1, body_kb=8, sitemap_urls=SITEMAP_URLS):
+    """Generate a corpus unless an identical one already exists"""
+    corpus_dir = Path(corpus_dir)
+    manifest_path = corpus_dir / 'corpus.json'
+    manifest = {
+        'version': CORPUS_VERSION,
+        'pages': pages,
+        'seed': seed,
+        'body_kb': body_kb,
+        'sitemap_urls': sitemap_urls,
+    }
+
+    if manifest_path.exists() and json.loads(manifest_path.read_text()) == manifest:
+        return corpus_dir
+
+    rng = random.Random(seed)
+    for index in range(pages):
+        rel_path, html = generate_page(rng, index, body_kb)
+        path = corpus_dir / rel_path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(html, encoding='utf-8')
+
+    (corpus_dir / 'sitemap.xml').write_text(generate_sitemap(rng, sitemap_urls), encoding='utf-8')
+    manifest_path.write_text(json.dumps(manifest, indent=2))
+    return corpus_dir
+
+
+def _read(path):
+    with open(path, 'rb') as f:
+        return f.read().decode('utf-8')
+
+
+def _bench_meta(paths, timings):
+    for path in paths:
+        t0 = time.perf_counter()
+        text = _read(path)
+        t1 = time.perf_counter()
+        head = extract_head_text(text)
+        t2 = time.perf_counter()
+        check_head(head)
+        t3 = time.perf_counter()
+        timings['read'] += t1 - t0
+        timings['parse'] += t2 - t1
+        timings['rules'] += t3 - t2
+
+
+def _bench_schema(paths, timings):
+    for path in paths:
+        t0 = time.perf_counter()
+        with open(path, 'rb') as f:
+            data = f.read()
+        t1 = time.perf_counter()
+        schemas = parse_json_ld(scan_json_ld(data), [])
+        t2 = time.perf_counter()
+        for schema in schemas:
+            validate_schema(schema)
+        t3 = time.perf_counter()
+        timings['read'] += t1 - t0
+        timings['parse'] += t2 - t1
+        timings['rules'] += t3 - t2
+
+
+def _bench_sitemap(paths, timings):
+    for path in paths:
+        t0 = time.perf_counter()
+        check_sitemap(path)
+        t1 = time.perf_counter()
+        # The sitemap is streamed, so reading, parsing and rules interleave
+        timings['stream'] += t1 - t0
+
+
+# name -> (phase function, phases, files it reads)
+VALIDATORS = {
+    'meta': (_bench_meta, ['read', 'parse', 'rules'], 'pages'),
+    'schema': (_bench_schema, ['read', 'parse', 'rules'], 'pages'),
+    'sitemap': (_bench_sitemap, ['stream'], 'sitemap'),
+}
+
+
+def _peak_rss_kb():
+    # VmHWM resets on exec; ru_maxrss can carry the parent's peak across
+    # the fork+exec that spawns the benchmark process
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is bytes on macOS and kilobytes on Linux
+    return peak // 1024 if sys.platform == 'darwin' else peak
+
+
+def _run_case(name, corpus_dir, queue):
+    func, phases, kind = VALIDATORS[name]
+    corpus_dir = Path(corpus_dir)
+    if kind == 'sitemap':
+        paths = [corpus_dir / 'sitemap.xml']
+    else:
+        paths = sorted((corpus_dir / 'local').glob('*/index.html'))
+
+    timings = {phase: 0.0 for phase in phases}
+    started = time.perf_counter()
+    func(paths, timings)
+    total = time.perf_counter() - started
+
+    queue.put({
+        'files': len(paths),
+        'bytes': sum(path.stat().st_size for path in paths),
+        'phases': timings,
+        'total': total,
+        'peak_rss_kb': _peak_rss_kb(),
+    })
+
+
+class BenchmarkError(Exception):
+    """A validator run crashed or timed out without reporting"""
+
+
+def _wait_for_result(name, process, queue, timeout):
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            return queue.get(timeout=1.0)
+        except Empty:
+            pass
+        if not process.is_alive():
+            # The result may have been flushed just before the child exited
+            try:
+                return queue.get(timeout=1.0)
+            except Empty:
+                raise BenchmarkError(f"{name}: benchmark process exited with code "
+                                     f"{process.exitcode} without a result") from None
+        if time.monotonic() > deadline:
+            process.terminate()
+            raise BenchmarkError(f"{name}: no result after {timeout:g}s")
+
+
+def run_benchmark(name, corpus_dir, timeout=DEFAULT_TIMEOUT):
+    """Time one validator in a fresh process so peak RSS is its own
+
+    Raises BenchmarkError if the process dies or runs past timeout seconds.
+    """
+    context = multiprocessing.get_context('spawn')
+    queue = context.Queue()
+    process = context.Process(target=_run_case, args=(name, str(corpus_dir), queue))
+    process.start()
+    try:
+        result = _wait_for_result(name, process, queue, timeout)
+    finally:
+        process.join()
+
+    result['files_per_sec'] = result['files'] / result['total'] if result['total'] else 0.0
+    result['mb_per_sec'] = result['bytes'] / 1024 / 1024 / result['total'] if result['total'] else 0.0
+    return result
+
+
+def compare_to_baseline(results, baseline, tolerance):
+    """Return regression messages for throughput drops or RSS growth beyond tolerance"""
+    regressions = []
+    for name, result in results.items():
+        previous = baseline.get(name)
+        if not previous:
+            continue
+        floor = previous['files_per_sec'] * (1 - tolerance)
+        if result['files_per_sec'] < floor:
+            regressions.append(
+                f"{name}: throughput {result['files_per_sec']:.1f} files/s "
+                f"< {floor:.1f} (baseline {previous['files_per_sec']:.1f})"
+            )
+        ceiling = previous['peak_rss_kb'] * (1 + tolerance)
+        if result['peak_rss_kb'] > ceiling:
+            regressions.append(
+                f"{name}: peak RSS {result['peak_rss_kb'] / 1024:.1f} MiB "
+                f"> {ceiling / 1024:.1f} MiB (baseline {previous['peak_rss_kb'] / 1024:.1f} MiB)"
+            )
+    return regressions
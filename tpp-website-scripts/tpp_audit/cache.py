@@ -0,0 +1,239 @@
+"""
+Persistent result cache for the validators
+Findings are stored per file, keyed by content hash and rule-set version
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import time
+from pathlib import Path
+
+DEFAULT_CACHE_PATH = Path(__file__).resolve().parent.parent / '.cache' / 'results.sqlite3'
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+# One connection per (process, cache file); keyed by pid so forked workers
+# never reuse a connection inherited from the parent
+_open_caches = {}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    namespace TEXT NOT NULL,
+    digest TEXT NOT NULL,
+    findings TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    last_used REAL NOT NULL,
+    PRIMARY KEY (namespace, digest)
+)
+"""
+
+
+def cache_path():
+    """Cache location, overridable with TPP_AUDIT_CACHE"""
+    return Path(os.environ.get('TPP_AUDIT_CACHE', DEFAULT_CACHE_PATH))
+
+
+def cache_namespace(validator, version, *rule_tables):
+    """Build a namespace that changes whenever the validator's rules change
+
+    Bump version for logic changes; edits to the rule tables passed in are
+    picked up automatically.
+    """
+    rules = json.dumps(rule_tables, sort_keys=True, default=repr)
+    rules_hash = hashlib.sha1(rules.encode('utf-8')).hexdigest()[:12]
+    return f"{validator}:{version}:{rules_hash}"
+
+
+def content_digest(data):
+    """Hash raw file bytes"""
+    return hashlib.sha256(data).hexdigest()
+
+
+class ResultCache:
+    """SQLite-backed findings store
+
+    SQLite in WAL mode lets parallel workers read and insert concurrently;
+    eviction is done once by the parent process after a run.
+    """
+
+    def __init__(self, path=None, max_bytes=DEFAULT_MAX_BYTES):
+        self.path = Path(path or cache_path())
+        self.max_bytes = max_bytes
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(self.path, timeout=30)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        self.conn.execute(SCHEMA)
+        self.conn.commit()
+
+    def get(self, namespace, digest):
+        """Return cached findings, or None on a miss"""
+        row = self.conn.execute(
+            'SELECT findings FROM results WHERE namespace = ? AND digest = ?',
+            (namespace, digest),
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def put(self, namespace, digest, findings):
+        payload = json.dumps(findings)
+        with self.conn:
+            self.conn.execute(
+                'INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?)',
+                (namespace, digest, payload, len(payload), time.time()),
+            )
+
+    def touch(self, namespace, digests):
+        """Mark entries as recently used so eviction keeps them"""
+        now = time.time()
+        with self.conn:
+            self.conn.executemany(
+                'UPDATE results SET last_used = ? WHERE namespace = ? AND digest = ?',
+                ((now, namespace, digest) for digest in digests),
+            )
+
+    def prune(self):
+        """Evict least recently used entries until the cache fits max_bytes"""
+        with self.conn:
+            cursor = self.conn.execute(
+                """
+                DELETE FROM results WHERE rowid IN (
+                    SELECT rowid FROM (
+                        SELECT rowid, SUM(size) OVER (
+                            ORDER BY last_used DESC, rowid DESC
+                        ) AS running FROM results
+                    ) WHERE running > ?
+                )
+                """,
+                (self.max_bytes,),
+            )
+        return cursor.rowcount
+
+    def stats(self):
+        entries, size = self.conn.execute(
+            'SELECT COUNT(*), COALESCE(SUM(size), 0) FROM results'
+        ).fetchone()
+        return {'entries': entries, 'bytes': size}
+
+    def close(self):
+        self.conn.close()
+
+
+class CachedCheck:
+    """Picklable wrapper that consults the cache before running a check
+
+    check receives (path, data) where data is the file's raw bytes. Calling
+    the wrapper returns (findings, digest, hit). Each worker process opens
+    its own connection lazily. When findings also depend on where the file
+    lives (e.g. per-directory rule overrides), variant(path) returns a short
+    string that is folded into the key. Checks that stream their input pass
+    digest(path), which computes the key without loading the file; the
+    check then receives data=None.
+    """
+
+    def __init__(self, check, namespace, enabled=True, path=None, variant=None, digest=None):
+        self.check = check
+        self.namespace = namespace
+        self.enabled = enabled
+        self.path = Path(path or cache_path())
+        self.variant = variant
+        self.digest = digest
+
+    def __call__(self, file_path):
+        if self.digest is not None:
+            data = None
+        else:
+            with open(file_path, 'rb') as f:
+                data = f.read()
+
+        if not self.enabled:
+            return self.check(file_path, data), None, False
+
+        digest = self.digest(file_path) if self.digest is not None else content_digest(data)
+        if self.variant is not None:
+            variant = self.variant(file_path)
+            if variant:
+                digest = f"{digest}|{variant}"
+        cache = self.cache()
+
+        findings = cache.get(self.namespace, digest)
+        if findings is not None:
+            return findings, digest, True
+
+        findings = self.check(file_path, data)
+        cache.put(self.namespace, digest, findings)
+        return findings, digest, False
+
+    def cache(self):
+        """Open (once per process) and return the underlying ResultCache"""
+        key = (os.getpid(), self.path)
+        if key not in _open_caches:
+            _open_caches[key] = ResultCache(self.path)
+        return _open_caches[key]
+
+    def close(self):
+        cache = _open_caches.pop((os.getpid(), self.path), None)
+        if cache is not None:
+            cache.close()
+
+
+def add_cache_arguments(parser):
+    """Register the shared --no-cache / --cache-stats switches"""
+    parser.add_argument('--no-cache', action='store_true',
+                        help='Ignore and do not update the result cache')
+    parser.add_argument('--cache-stats', action='store_true',
+                        help='Print cache hit/miss statistics')
+
+
+def finish_cache(cached_check, outcomes, show_stats=False):
+    """Refresh LRU timestamps, evict, and optionally print statistics
+
+    outcomes is the list of (findings, digest, hit) tuples from a run.
+    """
+    tally = CacheTally(cached_check)
+    tally.add(outcomes)
+    tally.finish(show_stats)
+
+
+class CacheTally:
+    """Running hit/miss counts for a run too large to keep every outcome
+
+    add() refreshes the LRU timestamps of each batch's hits straight away,
+    so only the counts are carried through to finish().
+    """
+
+    def __init__(self, cached_check):
+        self.cached_check = cached_check
+        self.hits = 0
+        self.misses = 0
+
+    def add(self, outcomes):
+        """Count a batch of (findings, digest, hit) tuples"""
+        hits = [digest for _, digest, hit in outcomes if hit]
+        self.hits += len(hits)
+        self.misses += len(outcomes) - len(hits)
+        if hits and self.cached_check.enabled:
+            self.cached_check.cache().touch(self.cached_check.namespace, hits)
+
+    def finish(self, show_stats=False):
+        """Evict, close the cache and optionally print statistics"""
+        cached_check = self.cached_check
+        if not cached_check.enabled:
+            if show_stats:
+                print("💾 Cache disabled (--no-cache)\n")
+            return
+
+        cache = cached_check.cache()
+        try:
+            evicted = cache.prune()
+            stats = cache.stats()
+        finally:
+            cached_check.close()
+
+        if not show_stats:
+            return
+        print(f"💾 Cache:")
+        print(f"   Hits: {self.hits}")
+        print(f"   Misses: {self.misses}")
+        print(f"   Evicted: {evicted}")
+        print(f"   Entries: {stats['entries']} ({stats['bytes'] / 1024:.1f} KiB)\n")
@@ -0,0 +1,97 @@
+"""
+Discover HTML files in the site tree
+Shared by the validators so every check audits the same set of pages
+"""
+
+import os
+from fnmatch import fnmatch
+from pathlib import Path
+
+DEFAULT_INCLUDE = ['*.html']
+
+# Directories that never hold site pages
+SKIP_DIRS = {'node_modules', '__pycache__'}
+
+
+def _matches(rel_path, patterns):
+    """Check a POSIX relative path against a list of glob patterns"""
+    return any(fnmatch(rel_path, pattern) for pattern in patterns)
+
+
+def _dir_excluded(rel_dir, exclude):
+    """Check whether a whole directory is excluded (e.g. 'archive/*' prunes archive/)"""
+    return _matches(rel_dir, exclude) or _matches(rel_dir + '/', exclude)
+
+
+def is_site_path(rel_path, include=None, exclude=None):
+    """Check whether a POSIX path relative to the root would be discovered
+
+    Used by watch mode to filter filesystem events with the same rules as
+    discover_html_files(recursive=True).
+    """
+    include = include or DEFAULT_INCLUDE
+    exclude = exclude or []
+    parts = rel_path.split('/')
+    for depth, name in enumerate(parts[:-1], 1):
+        if name in SKIP_DIRS or name.startswith('.'):
+            return False
+        if _dir_excluded('/'.join(parts[:depth]), exclude):
+            return False
+    return _matches(rel_path, include) and not _matches(rel_path, exclude)
+
+
+def discover_html_files(root_dir, recursive=False, include=None, exclude=None):
+    """Return a sorted list of HTML files under root_dir
+
+    Patterns are matched against the path relative to root_dir using
+    forward slashes, e.g. 'local/*' or '*/index.html'.
+    """
+    root_dir = Path(root_dir)
+    include = include or DEFAULT_INCLUDE
+    exclude = exclude or []
+
+    if not recursive:
+        return sorted(
+            path for path in root_dir.iterdir()
+            if path.is_file()
+            and _matches(path.name, include)
+            and not _matches(path.name, exclude)
+        )
+
+    return list(iter_html_files(root_dir, include, exclude))
+
+
+def iter_html_files(root_dir, include=None, exclude=None):
+    """Yield the HTML files under root_dir recursively, in sorted order
+
+    The same files and order as discover_html_files(recursive=True), but
+    directories are read one at a time as the caller consumes them, so
+    memory depends on the largest directory rather than the size of the site.
+    """
+    include = include or DEFAULT_INCLUDE
+    exclude = exclude or []
+    yield from _walk(Path(root_dir), '', include, exclude)
+
+
+def _walk(directory, prefix, include, exclude):
+    try:
+        with os.scandir(directory) as entries:
+            # Merging files and subdirectories by name matches sorted(Path)
+            entries = sorted(entries, key=lambda entry: entry.name)
+    except OSError:
+        return
+    for entry in entries:
+        rel_path = prefix + entry.name
+        try:
+            is_dir = entry.is_dir()
+        except OSError:
+            is_dir = False
+        if is_dir:
+            # Like os.walk, symlinked directories are not followed
+            if (not entry.is_symlink()
+                    and entry.name not in SKIP_DIRS
+                    and not entry.name.startswith('.')
+                    and not _dir_excluded(rel_path, exclude)):
+                yield from _walk(Path(entry.path), rel_path + '/', include, exclude)
+        elif _matches(rel_path, include) and not _matches(rel_path, exclude):
+            yield Path(entry.path)
@@ -0,0 +1,89 @@
+"""
+Cross-page duplicate index
+Groups pages sharing a title, meta description, og:url or canonical URL
+"""
+
+from hashlib import blake2b
+from urllib.parse import urlsplit, urlunsplit
+
+from tpp_audit.cache import cache_namespace
+
+DUPLICATE_FIELDS = ['title', 'description', 'og:url', 'canonical']
+
+# Bump when normalisation changes so cached fingerprints are invalidated
+RULES_VERSION = 1
+
+CACHE_NAMESPACE = cache_namespace('duplicates', RULES_VERSION, DUPLICATE_FIELDS)
+
+
+def normalise_text(value):
+    """Collapse whitespace and case so trivial variants still collide"""
+    return ' '.join(value.split()).casefold()
+
+
+def normalise_url(value):
+    """Lower-case scheme/host, drop fragments, index.html and trailing slashes"""
+    parts = urlsplit(value.strip())
+    path = parts.path
+    if path.endswith('/index.html'):
+        path = path[:-len('index.html')]
+    path = path.rstrip('/') or '/'
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), path, parts.query, ''))
+
+
+def fingerprint(value):
+    """64-bit hash of a normalised value
+
+    Only fingerprints are kept, so memory per page is a few integers no
+    matter how long titles or descriptions are.
+    """
+    return int.from_bytes(blake2b(value.encode('utf-8'), digest_size=8).digest(), 'big')
+
+
+def page_fingerprints(head):
+    """Fingerprint the duplicate-prone fields of one page (None when absent)"""
+    description = head.find_meta('name', 'description')
+    og_url = head.find_meta('property', 'og:url')
+    canonical = head.find_link('canonical')
+
+    values = {
+        'title': normalise_text(head.title or ''),
+        'description': normalise_text(description.get('content', '')) if description else '',
+        'og:url': normalise_url(og_url.get('content', '')) if og_url else '',
+        'canonical': normalise_url(canonical.get('href', '')) if canonical else '',
+    }
+    # Empty strings and URLs that normalise to a bare '/' carry no identity
+    return {
+        field: fingerprint(value) if value.strip('/') else None
+        for field, value in values.items()
+    }
+
+
+class DuplicateIndex:
+    """Hash index of page fingerprints, built incrementally in one pass
+
+    Each field maps fingerprint -> first page id; a group list is only
+    allocated once a second page shares the fingerprint, so unique pages
+    cost one dict entry per field and reporting is linear in page count.
+    """
+
+    def __init__(self, fields=DUPLICATE_FIELDS):
+        self.fields = list(fields)
+        self._first = {field: {} for field in self.fields}
+        self._groups = {field: {} for field in self.fields}
+
+    def add(self, page_id, fingerprints):
+        for field in self.fields:
+            value = fingerprints.get(field)
+            if value is None:
+                continue
+            first = self._first[field].setdefault(value, page_id)
+            if first != page_id:
+                self._groups[field].setdefault(value, [first]).append(page_id)
+
+    def collisions(self):
+        """Yield (field, [page ids]) for every group of two or more pages"""
+        for field in self.fields:
+            groups = sorted(self._groups[field].values(), key=lambda ids: (-len(ids), ids[0]))
+            for page_ids in groups:
+                yield field, page_ids
@@ -0,0 +1,126 @@
+"""
+Streaming <head> extractor
+Collects title, meta and link tags in one pass and stops at </head>
+"""
+
+from html.parser import HTMLParser
+
+CHUNK_SIZE = 16 * 1024
+
+
+class HeadExtractor(HTMLParser):
+    """Event-driven parser that records everything the meta checks need
+
+    The head ends at </head> or at the first <body> tag (an implicitly
+    closed head). If neither ever appears the head is malformed and the
+    whole document is scanned instead. With stop_at_head=False parsing
+    continues to the end of the page (for subclasses that look at the
+    body); head fields are still only taken from the head.
+    """
+
+    def __init__(self, stop_at_head=True):
+        super().__init__(convert_charrefs=True)
+        self.stop_at_head = stop_at_head
+        self.title = None
+        self.metas = []
+        self.links = []
+        self.head_done = False
+        self.done = False
+        self._in_title = False
+        self._title_parts = []
+        self._title_has_tags = False
+
+    def handle_starttag(self, tag, attrs):
+        if self.done:
+            return
+        if self._in_title:
+            self._title_has_tags = True
+        if self.head_done:
+            return
+        if tag == 'meta':
+            self.metas.append(_attr_dict(attrs))
+        elif tag == 'link':
+            self.links.append(_attr_dict(attrs))
+        elif tag == 'title' and self.title is None and not self._in_title:
+            self._in_title = True
+        elif tag == 'body':
+            self._finish_head()
+
+    def handle_startendtag(self, tag, attrs):
+        # <meta ... /> and <link ... /> are reported here
+        self.handle_starttag(tag, attrs)
+
+    def handle_endtag(self, tag):
+        if self.head_done:
+            return
+        if tag == 'title' and self._in_title:
+            self._close_title()
+        elif tag == 'head':
+            self._finish_head()
+
+    def handle_data(self, data):
+        if self._in_title:
+            self._title_parts.append(data)
+
+    def close(self):
+        super().close()
+        self._finish_head()
+        self.done = True
+
+    def _close_title(self):
+        self._in_title = False
+        # Mirror bs4's Tag.string: None when empty or when it has child tags
+        if self._title_parts and not self._title_has_tags:
+            self.title = ''.join(self._title_parts)
+        else:
+            self.title = ''
+
+    def _finish_head(self):
+        if self._in_title:
+            self._close_title()
+        self.head_done = True
+        if self.stop_at_head:
+            self.done = True
+
+    def find_meta(self, attr_name, attr_value):
+        """Return the attributes of the first matching <meta>, or None"""
+        for meta in self.metas:
+            if meta.get(attr_name) == attr_value:
+                return meta
+        return None
+
+    def find_link(self, rel):
+        """Return the attributes of the first <link> whose rel contains rel"""
+        for link in self.links:
+            if rel in (link.get('rel') or '').split():
+                return link
+        return None
+
+
+def _attr_dict(attrs):
+    """Build an attribute dict; valueless attributes become '' like bs4"""
+    return {name: (value if value is not None else '') for name, value in attrs}
+
+
+def extract_head_text(html_content, stop_at_head=True):
+    """Parse head data from an already-loaded document"""
+    parser = HeadExtractor(stop_at_head)
+    for start in range(0, len(html_content), CHUNK_SIZE):
+        parser.feed(html_content[start:start + CHUNK_SIZE])
+        if parser.done:
+            return parser
+    parser.close()
+    return parser
+
+
+def extract_head(html_file, stop_at_head=True):
+    """Stream a file through HeadExtractor, reading only as far as needed"""
+    parser = HeadExtractor(stop_at_head)
+    with open(html_file, 'r', encoding='utf-8') as f:
+        while not parser.done:
+            chunk = f.read(CHUNK_SIZE)
+            if not chunk:
+                parser.close()
+                break
+            parser.feed(chunk)
+    return parser
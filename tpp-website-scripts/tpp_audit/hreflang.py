@@ -0,0 +1,146 @@
+"""
+Hreflang reciprocity graph
+Collects every page's <link rel="alternate" hreflang> set and checks
+return links, self-references, x-default, duplicate languages and
+agreement with rel=canonical across the whole site
+"""
+
+import re
+from urllib.parse import urljoin
+
+from tpp_audit.cache import cache_namespace
+from tpp_audit.urls import SITE_URL, page_url_path, site_hosts, url_id
+
+X_DEFAULT = 'x-default'
+
+# language[-script][-region] as used by hreflang (ISO 639-1, ISO 15924,
+# ISO 3166-1 alpha-2 or UN M.49), or x-default
+LANGUAGE_CODE = re.compile(r'^(?:[a-z]{2,3}(?:-[a-z]{4})?(?:-(?:[a-z]{2}|\d{3}))?|x-default)$',
+                           re.IGNORECASE)
+
+# Bump when the collected facts change so cached results are invalidated
+RULES_VERSION = 1
+
+CACHE_NAMESPACE = cache_namespace('hreflang', RULES_VERSION, LANGUAGE_CODE.pattern)
+
+
+def page_hreflang(head):
+    """One page's canonical and [[hreflang, href], ...] as written, from the head parse"""
+    canonical = head.find_link('canonical')
+    alternates = []
+    for link in head.links:
+        if 'alternate' not in (link.get('rel') or '').split():
+            continue
+        lang = (link.get('hreflang') or '').strip()
+        href = (link.get('href') or '').strip()
+        if lang:
+            alternates.append([lang, href])
+    return {
+        'canonical': (canonical.get('href') or '').strip() or None if canonical else None,
+        'alternates': alternates,
+    }
+
+
+class HreflangGraph:
+    """Pages and hreflang edges keyed by url_id, built in one pass
+
+    Edges are kept in a set of (source, target) ids, so checking that a
+    target links back is a single lookup per edge instead of comparing
+    every pair of pages.
+    """
+
+    def __init__(self, site_url=SITE_URL):
+        self.site_url = site_url.rstrip('/')
+        # Apex and www links name the same page, so both map to SITE_URL's host
+        self.hosts = site_hosts(self.site_url)
+        self.host = url_id(self.site_url)[0]
+        # url_id -> page index
+        self.pages = {}
+        # url_id -> canonical url_id, for pages that declare one
+        self.canonicals = {}
+        self.edges = set()
+        # page index -> (own id, [(lang, href, target id), ...])
+        self.alternates = {}
+
+    def add(self, page_index, rel_path, facts):
+        page_url = self.site_url + page_url_path(rel_path)
+        own_id = self._url_id(page_url)
+        self.pages.setdefault(own_id, page_index)
+        if facts['canonical']:
+            self.canonicals[own_id] = self._url_id(urljoin(page_url, facts['canonical']))
+        if not facts['alternates']:
+            return
+        resolved = []
+        for lang, href in facts['alternates']:
+            target = self._url_id(urljoin(page_url, href)) if href else None
+            resolved.append((lang, href, target))
+            if target is not None:
+                self.edges.add((own_id, target))
+        self.alternates[page_index] = (own_id, resolved)
+
+    def _url_id(self, url):
+        host, key = url_id(url)
+        return (self.host if host in self.hosts else host), key
+
+    def findings(self, paths):
+        """Yield (severity, message) for every page that declares hreflang"""
+        for page_index in sorted(self.alternates):
+            own_id, resolved = self.alternates[page_index]
+            label = paths[page_index]
+            yield from self._page_findings(label, own_id, resolved)
+
+    def _page_findings(self, label, own_id, resolved):
+        seen_langs = {}
+        has_self = False
+        has_default = False
+        canonical = self.canonicals.get(own_id, own_id)
+
+        if canonical != own_id:
+            yield 'error', (f"{label}: declares hreflang but is not canonical "
+                            f"(canonical is {_display(canonical)})")
+
+        for lang, href, target in resolved:
+            if not LANGUAGE_CODE.match(lang):
+                yield 'error', f"{label}: Invalid hreflang code '{lang}'"
+            if target is None:
+                yield 'error', f"{label}: hreflang '{lang}' has no href"
+                continue
+
+            folded = lang.casefold()
+            if folded == X_DEFAULT:
+                has_default = True
+            previous = seen_langs.setdefault(folded, target)
+            if previous != target:
+                yield 'error', (f"{label}: hreflang '{lang}' points at both "
+                                f"{_display(previous)} and {_display(target)}")
+
+            if target == own_id:
+                has_self = True
+                continue
+
+            target_canonical = self.canonicals.get(target, target)
+            if target not in self.pages:
+                yield 'warning', f"{label}: hreflang '{lang}' target is not a page in the build: {href}"
+            elif target_canonical != target:
+                yield 'error', (f"{label}: hreflang '{lang}' target {href} is not canonical "
+                                f"(canonical is {_display(target_canonical)})")
+            elif (target, own_id) not in self.edges:
+                yield 'error', f"{label}: hreflang '{lang}' target {href} does not link back"
+
+        if not has_self:
+            yield 'error', f"{label}: No self-referencing hreflang"
+        if not has_default:
+            yield 'warning', f"{label}: No x-default hreflang"
+
+
+def _display(target_id):
+    host, path = target_id
+    return f"{host}{path}" if host else path
+
+
+def check_hreflang(paths, facts, site_url=SITE_URL):
+    """Build the graph from page_hreflang facts (in paths order) and return findings"""
+    graph = HreflangGraph(site_url)
+    for page_index, (rel_path, page_facts) in enumerate(zip(paths, facts)):
+        graph.add(page_index, rel_path, page_facts)
+    return list(graph.findings(paths))
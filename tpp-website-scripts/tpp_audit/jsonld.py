@@ -0,0 +1,56 @@
+"""
+Byte-level JSON-LD extraction
+Finds <script type="application/ld+json"> bodies without building a DOM
+"""
+
+import json
+import re
+
+try:
+    import orjson
+except ImportError:  # optional speed-up
+    orjson = None
+
+# HTML comments are matched (and skipped) so commented-out blocks are
+# ignored; any <script> body runs to the first </script>, as in HTML
+SCRIPT_OR_COMMENT = re.compile(
+    rb'<!--.*?-->|<script\b([^>]*)>(.*?)</script\s*>',
+    re.IGNORECASE | re.DOTALL,
+)
+
+TYPE_ATTR = re.compile(
+    rb'''(?:^|\s)type\s*=\s*(?:"([^"]*)"|'([^']*)'|([^\s"'=<>`]+))''',
+    re.IGNORECASE,
+)
+
+LD_JSON_TYPE = b'application/ld+json'
+
+DECODER = 'orjson' if orjson is not None else 'json'
+
+
+def _script_type(attrs):
+    match = TYPE_ATTR.search(attrs)
+    if not match:
+        return None
+    return next(group for group in match.groups() if group is not None)
+
+
+def scan_json_ld(data):
+    """Return the raw bytes of every JSON-LD script body in an HTML document"""
+    blocks = []
+    for match in SCRIPT_OR_COMMENT.finditer(data):
+        attrs = match.group(1)
+        # Comments have no attribute group; the type must match exactly
+        if attrs is not None and _script_type(attrs) == LD_JSON_TYPE:
+            blocks.append(match.group(2))
+    return blocks
+
+
+def loads(block):
+    """Decode one JSON-LD body (bytes or str), using orjson when installed
+
+    Raises json.JSONDecodeError (orjson's error subclasses it).
+    """
+    if orjson is not None:
+        return orjson.loads(block)
+    return json.loads(block)
@@ -0,0 +1,178 @@
+"""
+Offline internal link graph
+Extracts href/src targets at the byte level and resolves them against the
+build output, so broken links and orphan pages are found without a crawl
+"""
+
+import html
+import re
+from array import array
+
+from tpp_audit.cache import cache_namespace
+from tpp_audit.urls import SiteIndex, page_url_path, resolve_href, site_hosts
+
+# tag -> attributes holding a URL the browser will fetch or follow
+LINK_ATTRS = {
+    'a': ['href'],
+    'area': ['href'],
+    'link': ['href'],
+    'img': ['src', 'srcset'],
+    'source': ['src', 'srcset'],
+    'script': ['src'],
+    'iframe': ['src'],
+    'audio': ['src'],
+    'video': ['src', 'poster'],
+    'embed': ['src'],
+    'track': ['src'],
+}
+
+# Attribute values may contain '>' when quoted
+_ATTRS = rb'''((?:[^>"']|"[^"]*"|'[^']*')*)'''
+
+# Comments and <style> bodies are skipped whole; <script> bodies are
+# skipped too, but the opening tag's src is kept
+TAG_OR_SKIPPED = re.compile(
+    rb'<!--.*?-->'
+    rb'|<style\b[^>]*>.*?</style\s*>'
+    rb'|<(script)\b' + _ATTRS + rb'>.*?</script\s*>'
+    rb'|<(' + b'|'.join(tag.encode() for tag in LINK_ATTRS if tag != 'script') + rb'|base)\b'
+    + _ATTRS + rb'>',
+    re.IGNORECASE | re.DOTALL,
+)
+
+URL_ATTR = re.compile(
+    rb'''(?:^|\s)(href|src|srcset|poster)\s*=\s*(?:"([^"]*)"|'([^']*)'|([^\s"'=<>`]+))''',
+    re.IGNORECASE,
+)
+
+# Bump when extraction changes so cached link lists are invalidated
+RULES_VERSION = 1
+
+CACHE_NAMESPACE = cache_namespace('links', RULES_VERSION, LINK_ATTRS)
+
+
+def _attributes(attrs):
+    for match in URL_ATTR.finditer(attrs):
+        value = next(group for group in match.groups()[1:] if group is not None)
+        yield match.group(1).lower().decode('ascii'), html.unescape(value.decode('utf-8', 'replace'))
+
+
+def _srcset_urls(value):
+    # "a.jpg 1x, b.jpg 2x"; data: URIs contain commas and are not links
+    if value.lstrip().startswith('data:'):
+        return []
+    return [candidate.split()[0] for candidate in value.split(',') if candidate.strip()]
+
+
+def extract_links(data):
+    """Return {'base': <base href> or None, 'links': [unique raw URLs]} for HTML bytes
+
+    Links keep document order; empty values are dropped.
+    """
+    base = None
+    links = []
+    seen = set()
+    for match in TAG_OR_SKIPPED.finditer(data):
+        tag = match.group(1) or match.group(3)
+        if tag is None:
+            continue
+        tag = tag.lower().decode('ascii')
+        attrs = match.group(2) if match.group(1) else match.group(4)
+        wanted = LINK_ATTRS.get(tag, ['href'])
+        for name, value in _attributes(attrs):
+            if name not in wanted:
+                continue
+            if tag == 'base':
+                base = base or value.strip() or None
+                continue
+            for url in _srcset_urls(value) if name == 'srcset' else [value.strip()]:
+                if url and url not in seen:
+                    seen.add(url)
+                    links.append(url)
+    return {'base': base, 'links': links}
+
+
+class LinkGraph:
+    """Compact page -> target graph resolved against the build output
+
+    Pages get ids 0..n-1 in the order given and every other target file is
+    interned after them; edges live in two parallel array('I') columns, so
+    a few hundred thousand links cost a few megabytes.
+    """
+
+    def __init__(self, root_dir, site_url=None):
+        self.site = SiteIndex(root_dir)
+        self.hosts = site_hosts(site_url) if site_url else site_hosts()
+        self.pages = []
+        self.ids = {}
+        self.sources = array('I')
+        self.targets = array('I')
+        # [(page id, href as written, resolved path, redirect chain)]
+        self.broken = []
+        # [(page id, href as written, redirect chain)] for links that resolve via _redirects
+        self.redirected = []
+
+    def _intern(self, file_path):
+        node = self.ids.get(file_path)
+        if node is None:
+            node = self.ids[file_path] = len(self.ids)
+        return node
+
+    def add_pages(self, paths):
+        """Register pages (paths relative to the site root) before adding links"""
+        for rel_path in paths:
+            self.pages.append(rel_path)
+            self._intern('/' + rel_path)
+
+    def add_links(self, page_id, facts):
+        """Resolve one page's extract_links() facts and record its edges"""
+        base_path = page_url_path(self.pages[page_id])
+        base = facts['base']
+        if base:
+            base_path = resolve_href(base, base_path, self.hosts)
+            if base_path is None:
+                # An off-site <base> makes every relative link external
+                return
+
+        added = set()
+        for href in facts['links']:
+            path = resolve_href(href, base_path, self.hosts)
+            if path is None:
+                continue
+            found, chain = self.site.resolve(path)
+            if found is None:
+                # A chain ending off-site is an external link, not a broken one
+                if not chain or not chain[-1].startswith(('http://', 'https://')):
+                    self.broken.append((page_id, href, path, chain))
+                continue
+            if chain:
+                self.redirected.append((page_id, href, chain))
+            target = self._intern(found)
+            if target not in added:
+                added.add(target)
+                self.sources.append(page_id)
+                self.targets.append(target)
+
+    def inbound_counts(self):
+        """Inbound links per page id from other pages (self-links ignored)"""
+        counts = array('I', bytes(4 * len(self.pages)))
+        page_count = len(self.pages)
+        for source, target in zip(self.sources, self.targets):
+            if target < page_count and source != target:
+                counts[target] += 1
+        return counts
+
+    def orphans(self, counts=None):
+        """Page ids nothing else links to; the home page is never an orphan"""
+        counts = self.inbound_counts() if counts is None else counts
+        return [page_id for page_id, count in enumerate(counts)
+                if not count and page_url_path(self.pages[page_id]) != '/']
+
+
+def build_graph(root_dir, paths, facts, site_url=None):
+    """LinkGraph for pages (relative paths) and their extract_links() facts"""
+    graph = LinkGraph(root_dir, site_url)
+    graph.add_pages(paths)
+    for page_id, page_facts in enumerate(facts):
+        graph.add_links(page_id, page_facts)
+    return graph
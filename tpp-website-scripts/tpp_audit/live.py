@@ -0,0 +1,370 @@
+"""
+Live URL checks
+A small asyncio HTTP/1.1 client (stdlib streams only) with keep-alive
+connection pooling, bounded concurrency and per-host rate limits, used to
+confirm that sitemap URLs respond
+"""
+
+import asyncio
+import random
+import ssl
+import time
+from urllib.parse import quote, urljoin, urlsplit
+
+USER_AGENT = 'tpp-audit-live-check/1'
+
+DEFAULT_CONCURRENCY = 20
+# Requests per second per host, including retries, redirects and GET fallbacks
+DEFAULT_RATE = 10.0
+DEFAULT_TIMEOUT = 10.0
+DEFAULT_RETRIES = 2
+DEFAULT_BACKOFF = 0.5
+MAX_REDIRECTS = 10
+
+REDIRECT_STATUSES = {301, 302, 303, 307, 308}
+# Servers that reject or mishandle HEAD get a GET instead
+HEAD_FALLBACK_STATUSES = {403, 405, 501}
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+# Retry-After values above this are not worth waiting for in an audit
+MAX_RETRY_AFTER = 30.0
+
+# GET bodies up to this size are drained so the connection can be reused;
+# anything larger closes it instead of downloading the page
+DRAIN_LIMIT = 256 * 1024
+
+_CHUNK = 64 * 1024
+
+
+class HttpError(Exception):
+    """Malformed response from the server"""
+
+
+def rewrite_base(url, base_url):
+    """Point a URL at another origin (e.g. a local stand-in server), keeping its path"""
+    if not base_url:
+        return url
+    parts = urlsplit(url)
+    base = urlsplit(base_url)
+    return parts._replace(scheme=base.scheme, netloc=base.netloc).geturl()
+
+
+def _bare_host(host):
+    host = (host or '').lower()
+    return host[4:] if host.startswith('www.') else host
+
+
+def rebase_redirect(location, url, base_url):
+    """Keep a redirect on base_url when it points back at url's site
+
+    Production pages redirect to absolute production URLs; followed as they
+    are, a check against a staging origin would quietly leave staging.
+    Redirects to other sites are left alone.
+    """
+    if not base_url:
+        return location
+    target = urlsplit(location)
+    if _bare_host(target.hostname) != _bare_host(urlsplit(url).hostname):
+        return location
+    return rewrite_base(location, base_url)
+
+
+def _origin(parts):
+    scheme = parts.scheme.lower()
+    if scheme not in ('http', 'https') or not parts.hostname:
+        raise HttpError(f"Unsupported URL: {parts.geturl()}")
+    port = parts.port or (443 if scheme == 'https' else 80)
+    return scheme, parts.hostname.lower(), port
+
+
+class RateLimiter:
+    """Spaces request starts at least 1/rate seconds apart (rate 0 = unlimited)"""
+
+    def __init__(self, rate):
+        self.interval = 1.0 / rate if rate > 0 else 0.0
+        self._next = 0.0
+
+    async def wait(self):
+        if not self.interval:
+            return
+        now = time.monotonic()
+        slot = max(now, self._next)
+        # Reserve the slot before sleeping so concurrent callers queue up behind it
+        self._next = slot + self.interval
+        if slot > now:
+            await asyncio.sleep(slot - now)
+
+
+class _Connection:
+
+    def __init__(self, reader, writer):
+        self.reader = reader
+        self.writer = writer
+
+    def close(self):
+        self.writer.close()
+
+
+class ConnectionPool:
+    """Keep-alive HTTP/1.1 connections, at most per_host open per origin"""
+
+    def __init__(self, per_host=DEFAULT_CONCURRENCY, ssl_context=None):
+        self.per_host = per_host
+        self.ssl_context = ssl_context or ssl.create_default_context()
+        self.opened = 0
+        self._idle = {}
+        self._slots = {}
+
+    async def _open(self, origin):
+        scheme, host, port = origin
+        tls = self.ssl_context if scheme == 'https' else None
+        reader, writer = await asyncio.open_connection(
+            host, port, ssl=tls, server_hostname=host if tls else None)
+        self.opened += 1
+        return _Connection(reader, writer)
+
+    async def request(self, method, url):
+        """Send one request and return (status, headers); the body is discarded"""
+        parts = urlsplit(url)
+        origin = _origin(parts)
+        slots = self._slots.get(origin)
+        if slots is None:
+            slots = self._slots[origin] = asyncio.Semaphore(self.per_host)
+
+        async with slots:
+            idle = self._idle.setdefault(origin, [])
+            conn = idle.pop() if idle else None
+            if conn is not None:
+                try:
+                    status, headers, keep_alive = await self._exchange(conn, method, parts)
+                except (ConnectionError, asyncio.IncompleteReadError):
+                    # The server closed an idle keep-alive connection; a
+                    # fresh one is not a retry
+                    conn = None
+            if conn is None:
+                conn = await self._open(origin)
+                status, headers, keep_alive = await self._exchange(conn, method, parts)
+
+            if keep_alive:
+                idle.append(conn)
+            else:
+                conn.close()
+            return status, headers
+
+    async def _exchange(self, conn, method, parts):
+        try:
+            target = quote(parts.path or '/', safe="/%:@!$&'()*+,;=-._~")
+            if parts.query:
+                target += '?' + parts.query
+            host = parts.hostname.encode('idna').decode('ascii')
+            if parts.port:
+                host += f":{parts.port}"
+            conn.writer.write(
+                f"{method} {target} HTTP/1.1\r\n"
+                f"Host: {host}\r\n"
+                f"User-Agent: {USER_AGENT}\r\n"
+                "Accept: */*\r\n"
+                "Accept-Encoding: identity\r\n"
+                "Connection: keep-alive\r\n\r\n".encode('ascii')
+            )
+            await conn.writer.drain()
+
+            status, version, headers = await self._read_head(conn.reader)
+            connection = headers.get('connection', '').lower()
+            keep_alive = (connection != 'close'
+                          and (version != 'HTTP/1.0' or connection == 'keep-alive'))
+            if method == 'HEAD' or status in (204, 304) or 100 <= status < 200:
+                return status, headers, keep_alive
+            keep_alive = keep_alive and await self._drain_body(conn.reader, headers)
+            return status, headers, keep_alive
+        except BaseException:
+            # Timeouts cancel us mid-response; the connection is unusable
+            conn.close()
+            raise
+
+    async def _read_head(self, reader):
+        line = await reader.readuntil(b'\r\n')
+        fields = line.decode('latin-1').split(None, 2)
+        if len(fields) < 2 or not fields[0].startswith('HTTP/') or not fields[1].isdigit():
+            raise HttpError(f"Bad status line: {line[:80]!r}")
+        headers = {}
+        while True:
+            line = await reader.readuntil(b'\r\n')
+            if line == b'\r\n':
+                break
+            name, _, value = line.decode('latin-1').partition(':')
+            headers[name.strip().lower()] = value.strip()
+        return int(fields[1]), fields[0], headers
+
+    async def _drain_body(self, reader, headers):
+        """Read and drop a response body; False when the connection cannot be reused"""
+        if 'chunked' in headers.get('transfer-encoding', '').lower():
+            drained = 0
+            while True:
+                size = int((await reader.readuntil(b'\r\n')).split(b';')[0], 16)
+                if not size:
+                    # Trailers end with an empty line
+                    while await reader.readuntil(b'\r\n') != b'\r\n':
+                        pass
+                    return True
+                drained += size
+                if drained > DRAIN_LIMIT:
+                    return False
+                await reader.readexactly(size + 2)
+        length = headers.get('content-length')
+        if length is None or not length.isdigit():
+            # Body runs to connection close
+            return False
+        length = int(length)
+        if length > DRAIN_LIMIT:
+            return False
+        while length:
+            chunk = await reader.readexactly(min(length, _CHUNK))
+            length -= len(chunk)
+        return True
+
+    def close(self):
+        for idle in self._idle.values():
+            for conn in idle:
+                conn.close()
+        self._idle.clear()
+
+
+class LiveChecker:
+    """Checks URLs with HEAD (falling back to GET), retries and redirect following
+
+    Each result is a dict: url, status (final, or None), final_url,
+    redirects ([[status, location], ...]), error (or None) and requests.
+    """
+
+    def __init__(self, concurrency=DEFAULT_CONCURRENCY, rate=DEFAULT_RATE,
+                 timeout=DEFAULT_TIMEOUT, retries=DEFAULT_RETRIES, backoff=DEFAULT_BACKOFF,
+                 max_redirects=MAX_REDIRECTS, base_url=None, ssl_context=None):
+        if concurrency < 1:
+            raise ValueError(f"concurrency must be at least 1, got {concurrency}")
+        if rate < 0:
+            raise ValueError(f"rate must be positive (or 0 for unlimited), got {rate}")
+        if timeout <= 0:
+            raise ValueError(f"timeout must be positive, got {timeout}")
+        if retries < 0:
+            raise ValueError(f"retries cannot be negative, got {retries}")
+        self.concurrency = concurrency
+        self.rate = rate
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.max_redirects = max_redirects
+        self.base_url = base_url
+        self.pool = ConnectionPool(per_host=concurrency, ssl_context=ssl_context)
+        self.requests = 0
+        self._limiters = {}
+
+    async def _send(self, method, url):
+        origin = _origin(urlsplit(url))
+        limiter = self._limiters.get(origin)
+        if limiter is None:
+            limiter = self._limiters[origin] = RateLimiter(self.rate)
+        await limiter.wait()
+        self.requests += 1
+        return await asyncio.wait_for(self.pool.request(method, url), self.timeout)
+
+    async def _fetch(self, url, result):
+        """One hop with retries: returns (status, headers), counting requests in result"""
+        for attempt in range(self.retries + 1):
+            delay = self.backoff * 2 ** attempt
+            try:
+                result['requests'] += 1
+                status, headers = await self._send('HEAD', url)
+                if status in HEAD_FALLBACK_STATUSES:
+                    result['requests'] += 1
+                    status, headers = await self._send('GET', url)
+            except (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError,
+                    asyncio.LimitOverrunError, HttpError, ValueError):
+                if attempt == self.retries:
+                    raise
+            else:
+                if status not in RETRY_STATUSES or attempt == self.retries:
+                    return status, headers
+                retry_after = headers.get('retry-after', '')
+                if retry_after.isdigit():
+                    delay = max(delay, min(float(retry_after), MAX_RETRY_AFTER))
+            # Jitter keeps workers that failed together from retrying together
+            await asyncio.sleep(delay * (0.5 + random.random() / 2))
+
+    async def check(self, url):
+        result = {'url': url, 'status': None, 'final_url': None, 'redirects': [],
+                  'error': None, 'requests': 0}
+        current = rewrite_base(url, self.base_url)
+        seen = {current}
+        try:
+            while True:
+                status, headers = await self._fetch(current, result)
+                location = headers.get('location')
+                if status not in REDIRECT_STATUSES or not location:
+                    result['status'] = status
+                    result['final_url'] = current
+                    return result
+                location = urljoin(current, location)
+                result['redirects'].append([status, location])
+                current = rebase_redirect(location, url, self.base_url)
+                if current in seen:
+                    result['error'] = 'Redirect loop'
+                    return result
+                if len(result['redirects']) > self.max_redirects:
+                    result['error'] = f"More than {self.max_redirects} redirects"
+                    return result
+                seen.add(current)
+        except asyncio.TimeoutError:
+            result['error'] = f"Timed out after {self.timeout:g}s"
+        except (OSError, asyncio.IncompleteReadError, asyncio.LimitOverrunError,
+                HttpError, ValueError) as e:
+            result['error'] = f"{type(e).__name__}: {e}" if str(e) else type(e).__name__
+        return result
+
+    async def run(self, urls, on_result=None):
+        """Check an iterable of URLs, streaming them through a bounded queue
+
+        on_result is called with each result as it completes. Returns stats:
+        urls, requests, connections and elapsed seconds.
+        """
+        started = time.monotonic()
+        queue = asyncio.Queue(maxsize=self.concurrency * 2)
+        count = 0
+
+        async def produce():
+            nonlocal count
+            for url in urls:
+                count += 1
+                await queue.put(url)
+            for _ in range(self.concurrency):
+                await queue.put(None)
+
+        async def work():
+            while True:
+                url = await queue.get()
+                if url is None:
+                    return
+                result = await self.check(url)
+                if on_result is not None:
+                    on_result(result)
+
+        try:
+            await asyncio.gather(produce(), *(work() for _ in range(self.concurrency)))
+        finally:
+            self.pool.close()
+        return {
+            'urls': count,
+            'requests': self.requests,
+            'connections': self.pool.opened,
+            'elapsed': time.monotonic() - started,
+        }
+
+
+def check_live(urls, on_result=None, **options):
+    """Synchronous wrapper: run a LiveChecker over urls and return its stats"""
+    return asyncio.run(LiveChecker(**options).run(urls, on_result))
+
+
+def is_live(result):
+    """A URL is live when it answers 2xx without redirecting"""
+    return (result['error'] is None and not result['redirects']
+            and result['status'] is not None and 200 <= result['status'] < 300)
@@ -0,0 +1,213 @@
+"""
+SEO meta tag rules
+Shared by check-meta-tags.py and the unified tpp-audit runner
+
+Rules are declared in meta-rules.json (or the file named by TPP_META_RULES)
+and compiled into a table keyed by (tag, attribute, value), so a single
+walk over the head's title/meta/link elements resolves every rule. Each
+rule may set:
+
+    id        unique name, used in overrides and profiling
+    tag       'title', 'meta' or 'link'
+    match     {attribute: value} for meta/link rules (rel is matched per token)
+    value     attribute whose text is length-checked (default content/href)
+    label     prefix for length messages, e.g. "Title"
+    length    {"min": n, "max": n}
+    severity  'error' (default) or 'warning'
+    missing   message when no element matches
+
+Overrides apply to pages whose path relative to the site root matches a
+glob: {"path": "blog/*", "rules": {"description": {"severity": "warning"}},
+"disable": ["og:image"], "add": [<rule>, ...]}.
+"""
+
+import json
+import os
+from fnmatch import fnmatch
+from functools import lru_cache
+from pathlib import Path
+
+from tpp_audit.cache import cache_namespace
+from tpp_audit.profiling import NULL_TIMER
+
+DEFAULT_RULES_PATH = Path(__file__).resolve().parent.parent / 'meta-rules.json'
+
+# Bump when check logic changes so cached results are invalidated
+RULES_VERSION = 2
+
+RULE_KEYS = {'id', 'tag', 'match', 'value', 'label', 'length', 'severity', 'missing'}
+SEVERITIES = ('error', 'warning')
+DEFAULT_VALUE_ATTRS = {'meta': 'content', 'link': 'href'}
+
+
+def rules_path():
+    """Rules file location, overridable with TPP_META_RULES"""
+    return Path(os.environ.get('TPP_META_RULES', DEFAULT_RULES_PATH))
+
+
+class Rule:
+    """One compiled rule"""
+
+    def __init__(self, spec):
+        unknown = set(spec) - RULE_KEYS
+        if unknown:
+            raise ValueError(f"Rule {spec.get('id')!r}: unknown keys {sorted(unknown)}")
+        self.id = spec['id']
+        self.tag = spec['tag']
+        if self.tag not in ('title', 'meta', 'link'):
+            raise ValueError(f"Rule {self.id!r}: unsupported tag {self.tag!r}")
+
+        match = spec.get('match') or {}
+        if self.tag == 'title':
+            self.match = None
+        elif len(match) != 1:
+            raise ValueError(f"Rule {self.id!r}: match needs exactly one attribute")
+        else:
+            self.match = next(iter(match.items()))
+
+        self.value_attr = spec.get('value', DEFAULT_VALUE_ATTRS.get(self.tag))
+        self.label = spec.get('label', self.id)
+        length = spec.get('length') or {}
+        self.min_length = length.get('min')
+        self.max_length = length.get('max')
+        self.severity = spec.get('severity', 'error')
+        if self.severity not in SEVERITIES:
+            raise ValueError(f"Rule {self.id!r}: severity must be one of {SEVERITIES}")
+
+        if 'missing' in spec:
+            self.missing = spec['missing']
+        elif self.tag == 'title':
+            self.missing = "Missing or empty <title> tag"
+        else:
+            attr_name, attr_value = self.match
+            kind = 'meta tag' if self.tag == 'meta' else 'link'
+            self.missing = f"Missing {kind}: {attr_name}=\"{attr_value}\""
+
+    @property
+    def key(self):
+        if self.match is None:
+            return (self.tag, None, None)
+        return (self.tag,) + self.match
+
+    def evaluate(self, element):
+        """Return a message for this rule given its first matching element, or None"""
+        if self.tag == 'title':
+            # A whitespace-only title counts as missing
+            value = element if element and element.strip() else None
+            if value is None:
+                return self.missing
+        elif element is None:
+            return self.missing
+        else:
+            value = element.get(self.value_attr, '')
+
+        if self.min_length is not None and len(value) < self.min_length:
+            return f"{self.label} too short: {len(value)} chars (min {self.min_length})"
+        if self.max_length is not None and len(value) > self.max_length:
+            return f"{self.label} too long: {len(value)} chars (max {self.max_length})"
+        return None
+
+
+class RuleSet:
+    """Rules compiled into a (tag, attribute, value) -> [rule index] table"""
+
+    def __init__(self, specs):
+        self.rules = [Rule(spec) for spec in specs]
+        ids = [rule.id for rule in self.rules]
+        if len(ids) != len(set(ids)):
+            raise ValueError("Rule ids must be unique")
+
+        self.table = {}
+        for index, rule in enumerate(self.rules):
+            self.table.setdefault(rule.key, []).append(index)
+        # Attributes that participate in any match, so the walk skips the rest
+        self.match_attrs = {key[1] for key in self.table if key[1] is not None}
+
+    def evaluate(self, head, timer=NULL_TIMER):
+        """Walk the head once and return [[severity, message], ...] in rule order"""
+        found = [None] * len(self.rules)
+        table = self.table
+
+        for index in table.get(('title', None, None), ()):
+            found[index] = head.title
+
+        for tag, elements in (('meta', head.metas), ('link', head.links)):
+            for attrs in elements:
+                for name in self.match_attrs.intersection(attrs):
+                    value = attrs[name]
+                    for token in (value.split() if name == 'rel' else (value,)):
+                        for index in table.get((tag, name, token), ()):
+                            # First matching element wins, like soup.find
+                            if found[index] is None:
+                                found[index] = attrs
+        timer.lap('walk')
+
+        findings = []
+        for rule, element in zip(self.rules, found):
+            message = rule.evaluate(element)
+            if message:
+                findings.append([rule.severity, message])
+            timer.lap(f'rule:{rule.id}')
+        return findings
+
+
+class RuleConfig:
+    """A loaded rules file with its per-directory overrides"""
+
+    def __init__(self, config):
+        self.config = config
+        self.base = config['rules']
+        self.overrides = config.get('overrides', [])
+        self.namespace = cache_namespace('check-meta-tags', RULES_VERSION, config)
+        self._compiled = {}
+
+    def override_key(self, rel_path):
+        """Indices of the overrides that apply to rel_path, as a cache variant"""
+        if not rel_path:
+            return ''
+        return ','.join(
+            str(index) for index, override in enumerate(self.overrides)
+            if fnmatch(rel_path, override['path'])
+        )
+
+    def for_path(self, rel_path=''):
+        """Compiled RuleSet for a page, built once per override combination"""
+        key = self.override_key(rel_path)
+        if key not in self._compiled:
+            self._compiled[key] = self._compile(key)
+        return self._compiled[key]
+
+    def _compile(self, key):
+        specs = [dict(spec) for spec in self.base]
+        for index in filter(None, key.split(',')):
+            override = self.overrides[int(index)]
+            disabled = set(override.get('disable', []))
+            patches = override.get('rules', {})
+            specs = [
+                {**spec, **patches.get(spec['id'], {})}
+                for spec in specs if spec['id'] not in disabled
+            ]
+            specs.extend(override.get('add', []))
+        return RuleSet(specs)
+
+
+@lru_cache(maxsize=None)
+def _load_rules(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        return RuleConfig(json.load(f))
+
+
+def load_rules(path=None):
+    """Load and compile a rules file once per process"""
+    return _load_rules(str(path or rules_path()))
+
+
+def evaluate_head(head, rel_path='', timer=NULL_TIMER):
+    """Check meta tags collected by the head extractor, with severities"""
+    return load_rules().for_path(rel_path).evaluate(head, timer)
+
+
+def check_head(head, timer=NULL_TIMER, rel_path=''):
+    """Check meta tags collected by the head extractor (error messages only)"""
+    return [message for severity, message in evaluate_head(head, rel_path, timer)
+            if severity == 'error']
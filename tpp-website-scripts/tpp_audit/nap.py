@@ -0,0 +1,194 @@
+"""
+Cross-page NAP consistency index
+Groups LocalBusiness entities by business and reports pages whose name,
+address or phone number disagree
+"""
+
+import re
+
+from tpp_audit.cache import cache_namespace
+from tpp_audit.schema import TYPE_PARENTS, iter_entities
+
+NAP_FIELDS = ['name', 'address', 'telephone']
+
+ADDRESS_PARTS = ['streetAddress', 'addressLocality', 'addressRegion', 'postalCode', 'addressCountry']
+
+# Whole address parts that mean the same thing
+ADDRESS_ALIASES = {
+    'australia': 'au',
+    'new south wales': 'nsw',
+    'victoria': 'vic',
+    'queensland': 'qld',
+    'south australia': 'sa',
+    'western australia': 'wa',
+    'tasmania': 'tas',
+    'northern territory': 'nt',
+    'australian capital territory': 'act',
+}
+
+# Street-type words, compared in their short form
+STREET_ABBREVIATIONS = {
+    'street': 'st',
+    'road': 'rd',
+    'avenue': 'ave',
+    'parade': 'pde',
+    'highway': 'hwy',
+    'drive': 'dr',
+    'lane': 'ln',
+    'place': 'pl',
+    'terrace': 'tce',
+    'boulevard': 'blvd',
+}
+
+# "The Profit Platform - Pricing" and "The Profit Platform | Sydney" both
+# belong to "The Profit Platform"
+BRAND_SEPARATOR = re.compile(r'\s+[-–—|:]\s+')
+
+NON_ALNUM = re.compile(r'[^0-9a-z]+')
+
+# Bump when normalisation changes so cached entity facts are invalidated
+RULES_VERSION = 2
+
+CACHE_NAMESPACE = cache_namespace('nap', RULES_VERSION, NAP_FIELDS, ADDRESS_ALIASES,
+                                  STREET_ABBREVIATIONS, TYPE_PARENTS)
+
+
+def _words(value):
+    return NON_ALNUM.sub(' ', value.casefold().replace('&', ' and ')).split()
+
+
+def normalise_name(value):
+    """Case, punctuation and '&' vs 'and' insensitive business name"""
+    return ' '.join(_words(value))
+
+
+def brand_name(name):
+    """The business behind an entity name, minus any page suffix"""
+    return BRAND_SEPARATOR.split(name.strip(), 1)[0]
+
+
+def business_key(name):
+    return normalise_name(brand_name(name))
+
+
+def normalise_phone(value):
+    """Digits only, with +61 numbers rewritten to their national 0 form"""
+    digits = re.sub(r'\D', '', value)
+    if value.strip().startswith('+') and digits.startswith('61'):
+        digits = digits[2:]
+        # +61 (0)2 ... carries a redundant trunk prefix
+        digits = digits if digits.startswith('0') else '0' + digits
+    return digits
+
+
+def _address_parts(value):
+    if isinstance(value, dict):
+        return [str(value[part]) for part in ADDRESS_PARTS if value.get(part)]
+    return str(value).split(',')
+
+
+def normalise_address(value):
+    """PostalAddress (or plain string) as comparable lower-case tokens"""
+    parts = []
+    for part in _address_parts(value):
+        words = _words(part)
+        joined = ' '.join(words)
+        if joined in ADDRESS_ALIASES:
+            parts.append(ADDRESS_ALIASES[joined])
+        elif words:
+            parts.append(' '.join(STREET_ABBREVIATIONS.get(word, word) for word in words))
+    return ' '.join(parts)
+
+
+def display_address(value):
+    return ', '.join(part.strip() for part in _address_parts(value) if part.strip())
+
+
+# Names are compared on the same brand key the businesses are grouped by,
+# so a page suffix ("The Profit Platform - Pricing") is not a name variant
+NORMALISERS = {
+    'name': (business_key, brand_name),
+    'address': (normalise_address, display_address),
+    'telephone': (normalise_phone, str),
+}
+
+
+def _is_local_business(types):
+    return any(TYPE_PARENTS.get(schema_type, schema_type) == 'LocalBusiness' for schema_type in types)
+
+
+def nap_entities(schemas):
+    """Extract one page's LocalBusiness NAP facts from decoded JSON-LD blocks
+
+    Returns a JSON-serialisable list of [business key, {field: [normalised,
+    as written]}] with duplicates on the page removed. Entities without a
+    name cannot be attributed to a business and are skipped; missing
+    fields are left to the schema check.
+    """
+    entities = []
+    for schema in schemas:
+        for types, entity in iter_entities(schema):
+            name = entity.get('name')
+            if not _is_local_business(types) or not isinstance(name, str) or not name.strip():
+                continue
+            fields = {}
+            for field in NAP_FIELDS:
+                value = entity.get(field)
+                if not value or not isinstance(value, (str, dict)):
+                    continue
+                normalise, display = NORMALISERS[field]
+                normalised = normalise(value)
+                if normalised:
+                    fields[field] = [normalised, display(value)]
+            item = [business_key(name), fields]
+            if item not in entities:
+                entities.append(item)
+    return entities
+
+
+class NapIndex:
+    """Business -> field -> variant index, built incrementally in one pass
+
+    Each variant keeps the first spelling seen and the ids of the pages
+    using it; a page is recorded once per variant, so both building and
+    reporting are linear in page count.
+    """
+
+    def __init__(self, fields=NAP_FIELDS):
+        self.fields = list(fields)
+        self._businesses = {}
+
+    def add(self, page_id, entities):
+        for key, values in entities:
+            business = self._businesses.get(key)
+            if business is None:
+                business = self._businesses[key] = {
+                    'label': brand_name(values['name'][1]),
+                    'fields': {field: {} for field in self.fields},
+                }
+            for field, (normalised, written) in values.items():
+                variants = business['fields'].get(field)
+                if variants is None:
+                    continue
+                variant = variants.setdefault(normalised, [written, []])
+                # A page may mention the same business more than once
+                if not variant[1] or variant[1][-1] != page_id:
+                    variant[1].append(page_id)
+
+    def businesses(self):
+        return len(self._businesses)
+
+    def conflicts(self):
+        """Yield (business label, field, [(as written, [page ids]), ...]) where pages disagree
+
+        Variants are ordered most common first, so the first is the likely
+        canonical value.
+        """
+        for key in sorted(self._businesses):
+            business = self._businesses[key]
+            for field in self.fields:
+                variants = business['fields'][field]
+                if len(variants) < 2:
+                    continue
+                ordered = sorted(variants.values(), key=lambda item: (-len(item[1]), item[1][0]))
+                yield business['label'], field, [(written, page_ids) for written, page_ids in ordered]
@@ -0,0 +1,35 @@
+"""
+Process-pool helpers for the validators
+"""
+
+import os
+
+
+def resolve_jobs(jobs):
+    """Turn a --jobs value into a worker count (0 means all cores)"""
+    if jobs is None or jobs < 0:
+        return 1
+    if jobs == 0:
+        return os.cpu_count() or 1
+    return jobs
+
+
+def map_in_pool(func, items, jobs=1):
+    """Apply func to every item, returning results in input order
+
+    With a single job everything runs in-process so small runs do not pay
+    for worker start-up. func must be a module-level (picklable) callable.
+    """
+    items = list(items)
+    jobs = min(resolve_jobs(jobs), len(items))
+
+    if jobs <= 1:
+        return [func(item) for item in items]
+
+    # Imported here: multiprocessing is the slowest import the validators have
+    from concurrent.futures import ProcessPoolExecutor
+
+    # A few chunks per worker keeps IPC low while still balancing load
+    chunksize = max(1, len(items) // (jobs * 4))
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        return list(executor.map(func, items, chunksize=chunksize))
@@ -0,0 +1,172 @@
+"""
+Profiling hooks for the validators
+Per-file, per-phase and per-rule wall times behind a --profile flag
+"""
+
+import cProfile
+import math
+import os
+import pstats
+import tempfile
+import time
+from contextlib import contextmanager
+
+
+class FileTimer:
+    """Attributes elapsed wall time to named laps (read, parse, rule:...)
+
+    Each lap() charges the time since the previous lap to name, so callers
+    only mark the end of each step.
+    """
+
+    def __init__(self):
+        self.laps = {}
+        self._last = time.perf_counter()
+
+    def lap(self, name):
+        now = time.perf_counter()
+        self.laps[name] = self.laps.get(name, 0.0) + now - self._last
+        self._last = now
+
+
+class _NullTimer:
+    """Stand-in used when profiling is off; lap() is a bare no-op"""
+
+    __slots__ = ()
+
+    def lap(self, name):
+        pass
+
+
+NULL_TIMER = _NullTimer()
+
+
+class ProfiledCheck:
+    """Picklable wrapper that times a check(path, data, timer=...) call
+
+    Calling it returns (findings, laps). Profiling bypasses the result cache
+    so every file is really read, parsed and checked.
+    """
+
+    def __init__(self, check):
+        self.check = check
+
+    def __call__(self, file_path):
+        timer = FileTimer()
+        with open(file_path, 'rb') as f:
+            data = f.read()
+        timer.lap('read')
+        findings = self.check(file_path, data, timer=timer)
+        return findings, timer.laps
+
+
+def add_profile_arguments(parser):
+    """Register the shared --profile switches"""
+    parser.add_argument('--profile', action='store_true',
+                        help='Time read/parse/each rule per file and print a report (bypasses the cache)')
+    parser.add_argument('--profile-top', type=int, default=10, metavar='N',
+                        help='Slowest files to list in the profile report (default: 10)')
+    parser.add_argument('--profile-out', metavar='FILE',
+                        help='Also write cProfile stats to FILE, merged across --jobs workers (view with pstats)')
+
+
+# The profiler of this worker process, created on its first profiled call
+_worker_profiler = None
+
+
+class WorkerProfile:
+    """Picklable wrapper that runs func under cProfile in pool workers
+
+    Each worker keeps one profiler across its calls and rewrites
+    <stats_dir>/<pid>.prof after every call, so the stats on disk are
+    complete once the pool has returned. Calls made in the parent (a
+    single job) are left to the parent's own profiler.
+    """
+
+    def __init__(self, func, stats_dir):
+        self.func = func
+        self.stats_dir = stats_dir
+        self.parent_pid = os.getpid()
+
+    def __call__(self, item):
+        global _worker_profiler
+        if os.getpid() == self.parent_pid:
+            return self.func(item)
+        if _worker_profiler is None:
+            _worker_profiler = cProfile.Profile()
+        _worker_profiler.enable()
+        try:
+            return self.func(item)
+        finally:
+            _worker_profiler.disable()
+            _worker_profiler.dump_stats(os.path.join(self.stats_dir, f"{os.getpid()}.prof"))
+
+
+def _no_profile(func):
+    return func
+
+
+@contextmanager
+def maybe_cprofile(path):
+    """Run the block under cProfile and dump stats to path, if path is set
+
+    Yields a wrapper for the callable handed to map_in_pool; stats from
+    worker processes are merged into the parent's before writing path.
+    """
+    if not path:
+        yield _no_profile
+        return
+    with tempfile.TemporaryDirectory(prefix='tpp-cprofile-') as stats_dir:
+        profiler = cProfile.Profile()
+        profiler.enable()
+        try:
+            yield lambda func: WorkerProfile(func, stats_dir)
+        finally:
+            profiler.disable()
+            stats = pstats.Stats(profiler)
+            workers = sorted(os.listdir(stats_dir))
+            for name in workers:
+                stats.add(os.path.join(stats_dir, name))
+            stats.dump_stats(path)
+            merged = f" (merged from {len(workers)} workers)" if workers else ''
+            print(f"💾 cProfile stats written to {path}{merged}\n")
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(pct / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def print_profile(labels, laps_list, top=10):
+    """Print slowest files, latency percentiles and a per-phase/rule breakdown"""
+    totals = [sum(laps.values()) for laps in laps_list]
+    grand_total = sum(totals)
+
+    breakdown = {}
+    for laps in laps_list:
+        for name, seconds in laps.items():
+            breakdown[name] = breakdown.get(name, 0.0) + seconds
+
+    latencies = sorted(totals)
+
+    print(f"⏱️  Profile:")
+    print(f"   Files: {len(totals)}, total {grand_total:.3f}s")
+    print(f"   Latency (ms): "
+          f"p50 {percentile(latencies, 50) * 1000:.2f}, "
+          f"p90 {percentile(latencies, 90) * 1000:.2f}, "
+          f"p99 {percentile(latencies, 99) * 1000:.2f}, "
+          f"max {(latencies[-1] if latencies else 0.0) * 1000:.2f}")
+
+    print(f"   Slowest files:")
+    slowest = sorted(zip(totals, labels), key=lambda item: -item[0])[:top]
+    for seconds, label in slowest:
+        print(f"     {seconds * 1000:9.2f} ms  {label}")
+
+    print(f"   Time by phase/rule:")
+    for name, seconds in sorted(breakdown.items(), key=lambda item: -item[1]):
+        share = seconds / grand_total * 100 if grand_total else 0.0
+        print(f"     {seconds:9.4f}s {share:5.1f}%  {name}")
+    print()
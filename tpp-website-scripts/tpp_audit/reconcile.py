@@ -0,0 +1,84 @@
+"""
+Sitemap <-> build output reconciliation
+Maps every sitemap <loc> to its built page and every page back to its URL
+"""
+
+from pathlib import Path
+from urllib.parse import urlsplit
+
+from tpp_audit.cache import cache_namespace
+from tpp_audit.sitemap import DEFAULT_SITEMAPS, iter_locs
+from tpp_audit.urls import load_redirects, page_url_path, url_id, url_key
+
+# Bump when the collected facts change so cached results are invalidated
+RULES_VERSION = 1
+
+CACHE_NAMESPACE = cache_namespace('reconcile', RULES_VERSION)
+
+
+def page_facts(head):
+    """What reconciliation needs from one page: its canonical and noindex"""
+    canonical = head.find_link('canonical')
+    robots = head.find_meta('name', 'robots')
+    href = (canonical.get('href') or '').strip() if canonical else ''
+    return {
+        'canonical': href or None,
+        'noindex': bool(robots) and 'noindex' in (robots.get('content') or '').casefold(),
+    }
+
+
+def reconcile(root_dir, paths, facts, sitemap_names=DEFAULT_SITEMAPS):
+    """Compare sitemap URLs with built pages
+
+    paths are the pages' paths relative to root_dir and facts their
+    page_facts, in the same order. Returns a dict of sorted lists:
+    'no_page' [loc], 'redirected' [(loc, target, status)], 'missing'
+    [(rel_path, url path)] and 'not_canonical' [(loc, rel_path, canonical)].
+    Every lookup is a dict or set operation, so this is linear in the
+    number of pages plus sitemap URLs.
+    """
+    root_dir = Path(root_dir)
+
+    # url key -> first <loc> using it
+    sitemap = {}
+    for name in sitemap_names:
+        sitemap_path = root_dir / name
+        if sitemap_path.exists():
+            for loc in iter_locs(sitemap_path):
+                sitemap.setdefault(url_key(urlsplit(loc).path), loc)
+
+    # url key -> page index; the first file wins when two serve one URL
+    pages = {}
+    for i, rel_path in enumerate(paths):
+        pages.setdefault(url_key(page_url_path(rel_path)), i)
+
+    redirects = load_redirects(root_dir)
+    unmatched = sitemap.keys() - pages.keys()
+    redirected = unmatched & redirects.keys()
+
+    # Pages that should not be listed: noindex, or canonical elsewhere
+    listable = set()
+    not_canonical = []
+    for key, i in pages.items():
+        page = facts[i]
+        if page['noindex']:
+            continue
+        canonical = page['canonical']
+        if canonical and url_key(urlsplit(canonical).path) != key:
+            if key in sitemap:
+                not_canonical.append((sitemap[key], paths[i], canonical))
+            continue
+        if key in sitemap and canonical and urlsplit(canonical).netloc:
+            # Same path but a different host (e.g. www vs apex)
+            if url_id(canonical) != url_id(sitemap[key]):
+                not_canonical.append((sitemap[key], paths[i], canonical))
+                continue
+        listable.add(key)
+
+    return {
+        'no_page': sorted(sitemap[key] for key in unmatched - redirected),
+        'redirected': sorted((sitemap[key], *redirects[key]) for key in redirected),
+        'missing': sorted((paths[pages[key]], page_url_path(paths[pages[key]]))
+                          for key in listable - sitemap.keys()),
+        'not_canonical': sorted(not_canonical),
+    }
@@ -0,0 +1,433 @@
+"""
+Unified single-parse audit
+Each page is read and parsed once, then handed to every selected check
+"""
+
+from pathlib import Path
+
+from tpp_audit.assets import (
+    CACHE_NAMESPACE as ASSETS_NAMESPACE,
+    DEFAULT_BUDGETS,
+    extract_assets,
+    format_size,
+    weigh_pages,
+)
+from tpp_audit.cache import CachedCheck, cache_namespace
+from tpp_audit.duplicates import CACHE_NAMESPACE as DUPLICATES_NAMESPACE, DuplicateIndex, page_fingerprints
+from tpp_audit.headparse import extract_head_text
+from tpp_audit.hreflang import CACHE_NAMESPACE as HREFLANG_NAMESPACE, check_hreflang, page_hreflang
+from tpp_audit.jsonld import scan_json_ld
+from tpp_audit.links import CACHE_NAMESPACE as LINKS_NAMESPACE, build_graph, extract_links
+from tpp_audit.meta import evaluate_head, load_rules
+from tpp_audit.nap import CACHE_NAMESPACE as NAP_NAMESPACE, NapIndex, nap_entities
+from tpp_audit.pool import map_in_pool
+from tpp_audit.reconcile import CACHE_NAMESPACE as RECONCILE_NAMESPACE, page_facts, reconcile
+from tpp_audit.schema import CACHE_NAMESPACE as SCHEMA_NAMESPACE, check_schemas, parse_json_ld
+from tpp_audit.similarity import CACHE_NAMESPACE as SIMILARITY_NAMESPACE, find_near_duplicates, page_signature
+from tpp_audit.sitemap import (
+    CACHE_NAMESPACE as SITEMAP_NAMESPACE,
+    DEFAULT_SITEMAPS,
+    check_sitemap,
+    sitemap_digest,
+)
+
+# Bump when the runner's own finding format changes
+RUNNER_VERSION = 4
+
+ERROR = 'error'
+WARNING = 'warning'
+
+# name -> check instance; see register_check
+CHECKS = {}
+
+
+class PageCheck:
+    """A check that runs against one parsed page
+
+    check_page receives the HeadExtractor for the page (with the raw bytes
+    as page.source) and the page's path relative to the site root, and
+    returns a list of [severity, message] pairs. Set needs_body when the
+    check needs parser events past </head> so the parser does not stop
+    early. Checks whose results depend on the path return a
+    non-empty cache_variant for it.
+    """
+
+    name = None
+    namespace = ''
+    needs_body = False
+    site_wide = False
+
+    def check_page(self, page, rel_path):
+        raise NotImplementedError
+
+    def cache_variant(self, rel_path):
+        return ''
+
+
+class IndexCheck(PageCheck):
+    """A site-wide check fed from every page in a single pass
+
+    collect returns small JSON-serialisable facts for one page (cached
+    alongside the page's findings); report receives the relative paths and
+    facts of all pages in order, plus the site root, and returns site-level
+    findings.
+    """
+
+    def check_page(self, page, rel_path):
+        return []
+
+    def collect(self, page):
+        raise NotImplementedError
+
+    def report(self, paths, facts, root_dir):
+        raise NotImplementedError
+
+
+class SiteCheck:
+    """A check that runs once per audit against the site root"""
+
+    name = None
+    namespace = ''
+    site_wide = True
+
+    def check_site(self, root_dir, use_cache=True):
+        raise NotImplementedError
+
+
+def page_json_ld(page):
+    """Decoded JSON-LD blocks and parse errors for a page, shared by checks"""
+    if not hasattr(page, 'json_ld'):
+        invalid = []
+        page.json_ld = (parse_json_ld(scan_json_ld(page.source), invalid), invalid)
+    return page.json_ld
+
+
+def register_check(check):
+    """Add a check instance to the registry (usable as a class decorator)"""
+    if isinstance(check, type):
+        check = check()
+    CHECKS[check.name] = check
+    return check
+
+
+@register_check
+class MetaCheck(PageCheck):
+    name = 'meta'
+
+    @property
+    def namespace(self):
+        return load_rules().namespace
+
+    def check_page(self, page, rel_path):
+        return evaluate_head(page, rel_path)
+
+    def cache_variant(self, rel_path):
+        return load_rules().override_key(rel_path)
+
+
+@register_check
+class SchemaCheck(PageCheck):
+    name = 'schema'
+    namespace = SCHEMA_NAMESPACE
+
+    def check_page(self, page, rel_path):
+        # JSON-LD is found by the byte scanner, so the head parse can stop early
+        findings = check_schemas(*page_json_ld(page))
+        results = [[WARNING, f"Invalid JSON-LD: {message}"] for message in findings['invalid']]
+
+        if not findings['schemas']:
+            results.append([WARNING, "No JSON-LD schemas found"])
+
+        for i, (schema_type, errors) in enumerate(findings['schemas'], 1):
+            for error in errors:
+                results.append([ERROR, f"Schema {i} ({schema_type}): {error}"])
+
+        return results
+
+
+@register_check
+class DuplicatesCheck(IndexCheck):
+    name = 'duplicates'
+    namespace = DUPLICATES_NAMESPACE
+
+    # Paths listed per group before the rest are summarised
+    max_listed = 5
+
+    def collect(self, page):
+        return page_fingerprints(page)
+
+    def report(self, paths, facts, root_dir):
+        index = DuplicateIndex()
+        for page_id, fingerprints in enumerate(facts):
+            index.add(page_id, fingerprints)
+
+        results = []
+        for field, page_ids in index.collisions():
+            listed = ', '.join(paths[page_id] for page_id in page_ids[:self.max_listed])
+            if len(page_ids) > self.max_listed:
+                listed += f" (+{len(page_ids) - self.max_listed} more)"
+            results.append([WARNING, f"Duplicate {field} on {len(page_ids)} pages: {listed}"])
+        return results
+
+
+@register_check
+class NearDuplicatesCheck(IndexCheck):
+    name = 'near-duplicates'
+    namespace = SIMILARITY_NAMESPACE
+
+    # Paths listed per cluster before the rest are summarised
+    max_listed = 5
+
+    def collect(self, page):
+        return page_signature(page.source)
+
+    def report(self, paths, facts, root_dir):
+        results = []
+        for page_ids, lowest in find_near_duplicates(facts):
+            listed = ', '.join(paths[page_id] for page_id in page_ids[:self.max_listed])
+            if len(page_ids) > self.max_listed:
+                listed += f" (+{len(page_ids) - self.max_listed} more)"
+            results.append([WARNING, f"Near-duplicate body text on {len(page_ids)} pages "
+                                     f"(at least {lowest:.0%} similar): {listed}"])
+        return results
+
+
+@register_check
+class NapCheck(IndexCheck):
+    name = 'nap'
+    namespace = NAP_NAMESPACE
+
+    # Pages listed per variant before the rest are summarised
+    max_listed = 3
+
+    def collect(self, page):
+        return nap_entities(page_json_ld(page)[0])
+
+    def report(self, paths, facts, root_dir):
+        index = NapIndex()
+        for page_id, entities in enumerate(facts):
+            index.add(page_id, entities)
+
+        results = []
+        for label, field, variants in index.conflicts():
+            described = []
+            for written, page_ids in variants:
+                listed = ', '.join(paths[page_id] for page_id in page_ids[:self.max_listed])
+                if len(page_ids) > self.max_listed:
+                    listed += f" (+{len(page_ids) - self.max_listed} more)"
+                described.append(f"'{written}' on {len(page_ids)} pages ({listed})")
+            results.append([WARNING, f"Inconsistent {field} for {label}: {'; '.join(described)}"])
+        return results
+
+
+@register_check
+class ReconcileCheck(IndexCheck):
+    name = 'reconcile'
+    namespace = RECONCILE_NAMESPACE
+
+    def collect(self, page):
+        return page_facts(page)
+
+    def report(self, paths, facts, root_dir):
+        outcome = reconcile(root_dir, paths, list(facts))
+        results = [[ERROR, f"Sitemap URL has no page in the build: {loc}"]
+                   for loc in outcome['no_page']]
+        results.extend(
+            [ERROR, f"Sitemap URL is redirected ({status} to {target}): {loc}"]
+            for loc, target, status in outcome['redirected']
+        )
+        results.extend(
+            [ERROR, f"Sitemap URL is not canonical: {loc} ({rel_path} declares {canonical})"]
+            for loc, rel_path, canonical in outcome['not_canonical']
+        )
+        results.extend(
+            [WARNING, f"Page missing from sitemap: {rel_path} ({url_path})"]
+            for rel_path, url_path in outcome['missing']
+        )
+        return results
+
+
+@register_check
+class HreflangCheck(IndexCheck):
+    name = 'hreflang'
+    namespace = HREFLANG_NAMESPACE
+
+    def collect(self, page):
+        return page_hreflang(page)
+
+    def report(self, paths, facts, root_dir):
+        return [[severity, message] for severity, message in check_hreflang(paths, facts)]
+
+
+@register_check
+class LinksCheck(IndexCheck):
+    name = 'links'
+    namespace = LINKS_NAMESPACE
+
+    def collect(self, page):
+        return extract_links(page.source)
+
+    def report(self, paths, facts, root_dir):
+        graph = build_graph(root_dir, paths, facts)
+        results = []
+        for page_id, href, path, chain in graph.broken:
+            via = f" (redirects: {' -> '.join(chain)})" if chain else ''
+            results.append([ERROR, f"Broken link on {paths[page_id]}: {href}{via}"])
+        results.extend(
+            [WARNING, f"Orphan page (no inbound links): {paths[page_id]}"]
+            for page_id in graph.orphans()
+        )
+        return results
+
+
+@register_check
+class AssetsCheck(IndexCheck):
+    name = 'assets'
+    namespace = ASSETS_NAMESPACE
+    budgets = DEFAULT_BUDGETS
+
+    def collect(self, page):
+        return extract_assets(page.source)
+
+    def report(self, paths, facts, root_dir):
+        graph, weights = weigh_pages(root_dir, paths, facts)
+        results = []
+        for weight in weights:
+            results.extend(
+                [ERROR, f"Missing {kind} on {weight.path}: {href}"]
+                for kind, href in weight.missing
+            )
+            results.extend(
+                [WARNING, f"Over {name} budget on {weight.path}: "
+                          f"{format_size(size)} of {format_size(budget)}"]
+                for name, size, budget in weight.over_budget(self.budgets)
+            )
+        for asset_id, missing in graph.css_missing.items():
+            results.extend(
+                [ERROR, f"Missing {kind} in {graph.paths[asset_id]}: {href}"]
+                for kind, href in missing
+            )
+        return results
+
+
+@register_check
+class SitemapCheck(SiteCheck):
+    name = 'sitemap'
+    namespace = SITEMAP_NAMESPACE
+
+    def check_site(self, root_dir, use_cache=True):
+        sitemap_path = Path(root_dir) / DEFAULT_SITEMAPS[0]
+        if not sitemap_path.exists():
+            return [[ERROR, f'Sitemap file not found: {DEFAULT_SITEMAPS[0]}']]
+
+        # Other default sitemaps (the index) are optional
+        extra_paths = [Path(root_dir) / name for name in DEFAULT_SITEMAPS[1:]]
+        cached_check = CachedCheck(check_sitemap, self.namespace, enabled=use_cache,
+                                   digest=sitemap_digest)
+        results = []
+        try:
+            for path in [sitemap_path] + [path for path in extra_paths if path.exists()]:
+                findings = cached_check(path)[0]
+                prefix = '' if path == sitemap_path else f"{path.name}: "
+                results.extend([ERROR, f"{prefix}{error}"] for error in findings['errors'])
+        finally:
+            cached_check.close()
+        return results
+
+
+def select_checks(names=None):
+    """Resolve check names (default: all registered) to check instances"""
+    names = names or list(CHECKS)
+    unknown = [name for name in names if name not in CHECKS]
+    if unknown:
+        raise ValueError(f"Unknown check(s): {', '.join(unknown)}")
+    return [CHECKS[name] for name in names]
+
+
+def needs_every_page(checks):
+    """True when a selected check judges pages against the whole site
+
+    Index and site checks compare pages with each other, the sitemap or the
+    build output, so a run that only sees the top-level pages reports
+    everything below them as missing.
+    """
+    return any(isinstance(check, IndexCheck) or check.site_wide for check in checks)
+
+
+class PageAudit:
+    """Picklable per-page callable: one read, one parse, every page check
+
+    Returns {'findings': {check name: [[severity, message], ...]},
+    'facts': {index check name: facts}}.
+    """
+
+    def __init__(self, root_dir, check_names):
+        self.root_dir = Path(root_dir)
+        self.check_names = list(check_names)
+
+    def relative(self, html_file):
+        return Path(html_file).relative_to(self.root_dir).as_posix()
+
+    def cache_variant(self, html_file):
+        rel_path = self.relative(html_file)
+        return ';'.join(
+            f"{check.name}={variant}"
+            for check in select_checks(self.check_names)
+            for variant in [check.cache_variant(rel_path)] if variant
+        )
+
+    def __call__(self, html_file, data):
+        checks = select_checks(self.check_names)
+        rel_path = self.relative(html_file)
+        stop_at_head = not any(check.needs_body for check in checks)
+        page = extract_head_text(data.decode('utf-8'), stop_at_head=stop_at_head)
+        page.source = data
+        return {
+            'findings': {check.name: check.check_page(page, rel_path) for check in checks},
+            'facts': {
+                check.name: check.collect(page)
+                for check in checks if isinstance(check, IndexCheck)
+            },
+        }
+
+
+def audit_namespace(checks):
+    """Cache namespace covering the rule sets of every selected page check"""
+    return cache_namespace('tpp-audit', RUNNER_VERSION,
+                           [[check.name, check.namespace] for check in checks])
+
+
+def run_audit(root_dir, html_files, check_names=None, jobs=1, use_cache=True):
+    """Audit pages and the site, returning (page_results, site_results, cached_check)
+
+    page_results is a list of (path, result, digest, hit) in html_files
+    order, where result is the PageAudit dict; site_results maps site-wide
+    and index check names to their findings.
+    """
+    checks = select_checks(check_names)
+    page_checks = [check for check in checks if not check.site_wide]
+    site_checks = [check for check in checks if check.site_wide]
+
+    page_audit = PageAudit(root_dir, [check.name for check in page_checks])
+    cached_check = CachedCheck(page_audit, audit_namespace(page_checks), enabled=use_cache,
+                               variant=page_audit.cache_variant)
+
+    page_results = []
+    if page_checks:
+        outcomes = map_in_pool(cached_check, html_files, jobs=jobs)
+        page_results = [
+            (html_file, result, digest, hit)
+            for html_file, (result, digest, hit) in zip(html_files, outcomes)
+        ]
+
+    site_results = {}
+    rel_paths = [Path(html_file).relative_to(root_dir).as_posix() for html_file in html_files]
+    for check in page_checks:
+        if isinstance(check, IndexCheck):
+            facts = (result['facts'][check.name] for _, result, _, _ in page_results)
+            site_results[check.name] = check.report(rel_paths, facts, root_dir)
+
+    for check in site_checks:
+        site_results[check.name] = check.check_site(root_dir, use_cache=use_cache)
+
+    return page_results, site_results, cached_check
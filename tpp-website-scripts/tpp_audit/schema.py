@@ -0,0 +1,167 @@
+"""
+JSON-LD schema rules
+Shared by validate-schema.py and the unified tpp-audit runner
+"""
+
+import json
+from functools import lru_cache
+
+from tpp_audit.cache import cache_namespace
+from tpp_audit.jsonld import DECODER, loads, scan_json_ld
+from tpp_audit.profiling import NULL_TIMER
+
+REQUIRED_FIELDS = {
+    'LocalBusiness': ['@type', 'name', 'address', 'telephone'],
+    'Organization': ['@type', 'name', 'url'],
+    'WebSite': ['@type', 'name', 'url'],
+    'FAQPage': ['@type', 'mainEntity'],
+}
+
+# schema.org subtypes validated against a parent's table
+TYPE_PARENTS = {
+    'ProfessionalService': 'LocalBusiness',
+}
+
+# Bump when validation logic changes so cached results are invalidated
+RULES_VERSION = 2
+
+# The decoder is part of the namespace because orjson and json word their
+# parse errors differently
+CACHE_NAMESPACE = cache_namespace('validate-schema', RULES_VERSION, DECODER,
+                                  REQUIRED_FIELDS, TYPE_PARENTS)
+
+
+@lru_cache(maxsize=None)
+def required_fields(types):
+    """Required fields for a tuple of @type values, in table order"""
+    fields = []
+    for schema_type in types:
+        for field in REQUIRED_FIELDS.get(TYPE_PARENTS.get(schema_type, schema_type), ()):
+            if field not in fields:
+                fields.append(field)
+    return tuple(fields)
+
+
+def entity_types(node):
+    """@type as a hashable tuple; it may be a string or a list of strings"""
+    value = node.get('@type')
+    if isinstance(value, str):
+        return (value,)
+    if isinstance(value, list):
+        return tuple(item for item in value if isinstance(item, str))
+    return ()
+
+
+def is_reference(node):
+    """True for a bare {"@id": ...} pointing at an entity defined elsewhere"""
+    return '@id' in node and all(key in ('@id', '@type') for key in node)
+
+
+def iter_entities(node):
+    """Yield (types, entity) for every typed, non-reference object in a block"""
+    if isinstance(node, list):
+        for item in node:
+            yield from iter_entities(item)
+        return
+    if not isinstance(node, dict):
+        return
+    types = entity_types(node)
+    if types and not is_reference(node):
+        yield types, node
+    for value in node.values():
+        if isinstance(value, (dict, list)):
+            yield from iter_entities(value)
+
+
+def type_label(schema):
+    """Display name for a top-level block: its @type, or '@graph' / 'Unknown'"""
+    if isinstance(schema, dict):
+        types = entity_types(schema)
+        if types:
+            return ', '.join(types)
+        if '@graph' in schema:
+            return '@graph'
+    return 'Unknown'
+
+
+def parse_json_ld(blocks, invalid=None):
+    """Decode raw <script type="application/ld+json"> bodies
+
+    Parse failures are printed, or appended to invalid when a list is given.
+    """
+    schemas = []
+
+    for block in blocks:
+        try:
+            schema = loads(block)
+            schemas.append(schema)
+        except json.JSONDecodeError as e:
+            if invalid is None:
+                print(f"  ⚠️  Invalid JSON-LD: {e}")
+            else:
+                invalid.append(str(e))
+
+    return schemas
+
+
+def _walk(node, path, errors):
+    if isinstance(node, list):
+        for i, item in enumerate(node):
+            _walk(item, f"{path}[{i}]", errors)
+        return
+    if not isinstance(node, dict):
+        return
+
+    types = entity_types(node)
+    fields = required_fields(types) if types else ()
+    if fields and not is_reference(node):
+        # Top-level entities keep the plain message; nested ones say where
+        prefix = f"{path} ({', '.join(types)}): " if path else ''
+        for field in fields:
+            if field not in node:
+                errors.append(f"{prefix}Missing required field: {field}")
+
+    for key, value in node.items():
+        if isinstance(value, (dict, list)):
+            _walk(value, f"{path}.{key}" if path else key, errors)
+
+
+def validate_schema(schema, schema_type=None):
+    """Validate required fields for every typed entity in a JSON-LD block
+
+    Walks @graph arrays, lists of types and nested entities; schema_type is
+    accepted for compatibility and no longer used.
+    """
+    errors = []
+    _walk(schema, '', errors)
+    return errors
+
+
+def check_json_ld(blocks, timer=NULL_TIMER):
+    """Decode and validate JSON-LD blocks from one page
+
+    Returns a JSON-serialisable dict so results can be cached.
+    """
+    invalid = []
+    schemas = parse_json_ld(blocks, invalid)
+    timer.lap('parse:json')
+    return check_schemas(schemas, invalid, timer)
+
+
+def check_schemas(schemas, invalid, timer=NULL_TIMER):
+    """Validate already-decoded blocks; invalid lists their parse errors"""
+    results = []
+
+    for schema in schemas:
+        schema_type = type_label(schema)
+        results.append([schema_type, validate_schema(schema)])
+        timer.lap(f'rule:{schema_type}')
+
+    return {'invalid': invalid, 'schemas': results}
+
+
+def check_html(data, timer=NULL_TIMER):
+    """Scan raw HTML bytes for JSON-LD and validate it"""
+    blocks = scan_json_ld(data)
+    timer.lap('parse:scan')
+    return check_json_ld(blocks, timer)
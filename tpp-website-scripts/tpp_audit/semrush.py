@@ -0,0 +1,265 @@
+"""
+Semrush site audit exports
+Loads the CSV exports into column tables, keyed by the same URL form the
+build uses, and compares two crawls issue by issue. Rows are never looped
+over in Python: the csv reader and zip transpose a file into columns in C,
+URLs are normalised by regex passes over a whole column, and every
+per-issue comparison is a set operation on whole columns
+"""
+
+import csv
+import operator
+import os
+import re
+from array import array
+from collections import Counter
+from itertools import chain, compress, zip_longest
+from pathlib import Path
+from urllib.parse import unquote
+
+# <domain>_<kind>_<YYYYMMDD>.csv as Semrush names downloads
+EXPORT_NAME = re.compile(r'^(?P<domain>.+?)_(?P<kind>pages|mega_export|issues|compare-audits)'
+                         r'_(?P<date>\d{8})\.csv$')
+
+URL_COLUMN = 'Page URL'
+
+# Issue severities in the issues export, most severe first
+ISSUE_TYPES = ['ERROR', 'WARNING', 'NOTICE']
+
+# Cell values that mean a page does not have an issue
+NO_ISSUE = frozenset(['0', '', 'n/a'])
+
+# crawl_keys passes, applied to newline-joined URLs in this order
+_URL_PASSES = [
+    (re.compile(r'^(?:[A-Za-z][A-Za-z0-9+.-]*:)?//[^/?#\n]*', re.M), ''),  # scheme and host
+    (re.compile(r'#[^\n]*'), ''),  # fragment
+    (re.compile(r'\?$', re.M), ''),  # empty query
+    (re.compile(r'(?:(?<=/)index)?\.html(?=\?|$)', re.M), ''),  # /index.html, .html
+    (re.compile(r'/+(?=\?|$)', re.M), ''),  # trailing slashes
+    (re.compile(r'^(?=\?|$)', re.M), '/'),  # the site root
+]
+
+
+class ExportError(Exception):
+    """An export is missing or does not have the expected columns"""
+
+
+class Table:
+    """A CSV file held as one tuple per column
+
+    Short rows are padded with '' so every column has len(table) values.
+    """
+
+    def __init__(self, header, columns):
+        self.header = list(header)
+        self.columns = dict(zip(self.header, columns))
+        self.length = len(columns[0]) if columns else 0
+
+    def __len__(self):
+        return self.length
+
+    def __contains__(self, name):
+        return name in self.columns
+
+    def column(self, name):
+        try:
+            return self.columns[name]
+        except KeyError:
+            raise ExportError(f"Missing column '{name}'") from None
+
+    def counts(self, name):
+        """An integer column as array('q'); blanks and 'n/a' count as 0"""
+        values = self.column(name)
+        try:
+            return array('q', map(int, values))
+        except ValueError:
+            return array('q', map(_count, values))
+
+
+def _count(value):
+    try:
+        return int(float(value))
+    except ValueError:
+        return 0
+
+
+def read_table(path):
+    """Read a CSV export into a Table"""
+    with open(path, newline='', encoding='utf-8-sig', errors='replace') as f:
+        reader = csv.reader(f)
+        header = next(reader, [])
+        rows = list(reader)
+    if len(set(map(len, rows))) <= 1:
+        columns = list(zip(*rows))
+    else:
+        columns = list(zip_longest(*rows, fillvalue=''))
+    del rows
+    if not columns:
+        columns = [()] * len(header)
+    # Rows longer than the header have no column name to go under
+    return Table(header, columns[:len(header)])
+
+
+def crawl_keys(urls):
+    """url_key form of every URL, plus its query string if it has one
+
+    Query variants (/blog?tag=x) are separate URLs to the crawler; the build
+    serves them all from one page, see page_key. The whole column is joined
+    and rewritten by a few regex passes, so the cost is a handful of C-level
+    scans rather than a urlsplit per row.
+    """
+    text = '\n'.join(urls)
+    if text.count('\n') != len(urls) - 1 or '%0' in text:
+        # A newline in a URL, raw or encoded, would split it in two
+        return tuple(map(crawl_key, urls))
+    return tuple(_normalise(text).split('\n')) if urls else ()
+
+
+def crawl_key(url):
+    return _normalise(url)
+
+
+def _normalise(text):
+    for pattern, replacement in _URL_PASSES:
+        text = pattern.sub(replacement, text)
+    return unquote(text)
+
+
+def page_key(key):
+    """The build page a crawl_key is served by"""
+    return key.partition('?')[0]
+
+
+def find_exports(directory):
+    """{date: {kind: path}} for every Semrush export in a directory"""
+    exports = {}
+    for name in sorted(os.listdir(directory)):
+        match = EXPORT_NAME.match(name)
+        if match:
+            exports.setdefault(match['date'], {})[match['kind']] = Path(directory) / name
+    return exports
+
+
+class AuditSnapshot:
+    """One crawl: per-page issue counts from the mega export
+
+    keys are crawl_key forms, so http/https, www/apex and trailing-slash
+    variants of a URL collapse into one key; page_keys are the matching
+    build page keys. issue_types maps issue names to ERROR, WARNING
+    or NOTICE and statuses page keys to HTTP status codes, when the issues
+    and pages exports for the same crawl are available.
+    """
+
+    def __init__(self, date, mega_export, issues=None, pages=None):
+        self.date = date
+        self.urls = mega_export.column(URL_COLUMN)
+        self.keys = crawl_keys(self.urls)
+        self.key_set = frozenset(self.keys)
+        self.page_keys = tuple(map(page_key, self.keys))
+        self.counts = {name: mega_export.column(name)
+                       for name in mega_export.header if name != URL_COLUMN}
+        self.issue_types = {}
+        if issues is not None:
+            self.issue_types = dict(zip(issues.column('Issue'), issues.column('Issue Type')))
+        self.statuses = {}
+        if pages is not None:
+            self.statuses = dict(zip(crawl_keys(pages.column(URL_COLUMN)),
+                                     pages.column('HTTP Status Code')))
+
+    @classmethod
+    def load(cls, date, paths):
+        """Build a snapshot from find_exports()[date]"""
+        if 'mega_export' not in paths:
+            raise ExportError(f"No mega export for {date}")
+        return cls(
+            date,
+            read_table(paths['mega_export']),
+            issues=read_table(paths['issues']) if 'issues' in paths else None,
+            pages=read_table(paths['pages']) if 'pages' in paths else None,
+        )
+
+    def issue_type(self, issue):
+        return self.issue_types.get(issue, 'NOTICE')
+
+    def open_pages(self, issue, keys=None):
+        """Keys (default: self.keys) where the crawl reported the issue at least once"""
+        counts = self.counts.get(issue)
+        if counts is None or counts.count('0') == len(counts):
+            # Most issue columns are all zeros; tuple.count settles those in one scan
+            return set()
+        has_issue = map(operator.not_, map(NO_ISSUE.__contains__, counts))
+        return set(compress(keys or self.keys, has_issue))
+
+    def page_totals(self):
+        """Counter of build page key -> issue types reported on it or its query variants"""
+        totals = Counter()
+        for issue in self.counts:
+            totals.update(self.open_pages(issue, self.page_keys))
+        return totals
+
+
+class IssueDiff:
+    """How one issue moved between two crawls, as sets of page keys
+
+    Pages that dropped out of the newer crawl are listed as gone rather
+    than fixed, since nothing is known about them.
+    """
+
+    def __init__(self, issue, issue_type, old_pages, new_pages, new_keys):
+        self.issue = issue
+        self.issue_type = issue_type
+        self.fixed = (old_pages - new_pages) & new_keys
+        self.gone = old_pages - new_keys
+        self.introduced = new_pages - old_pages
+        self.still_open = old_pages & new_pages
+
+
+def diff_snapshots(old, new):
+    """IssueDiff per issue seen in either crawl, most severe type first"""
+    diffs = [
+        IssueDiff(issue, new.issue_type(issue) if issue in new.counts else old.issue_type(issue),
+                  old.open_pages(issue), new.open_pages(issue), new.key_set)
+        for issue in dict.fromkeys(chain(old.counts, new.counts))
+    ]
+    rank = {issue_type: i for i, issue_type in enumerate(ISSUE_TYPES)}
+    diffs.sort(key=lambda diff: rank.get(diff.issue_type, len(rank)))
+    return diffs
+
+
+def page_changes(diffs):
+    """{'fixed', 'introduced', 'still_open'}: Counter of page key -> issue count"""
+    return {
+        field: Counter(chain.from_iterable(getattr(diff, field) for diff in diffs))
+        for field in ('fixed', 'introduced', 'still_open')
+    }
+
+
+def compare_audits(table):
+    """Semrush's own compare-audits export as (issue, old, new, delta) for issues that moved"""
+    crawls = [name for name in table.header
+              if name not in ('Issue Id', 'Issue', 'Delta', 'Delta Percent')]
+    if len(crawls) != 2:
+        raise ExportError(f"Expected two crawl columns, found {len(crawls)}")
+    old_column, new_column = crawls
+    deltas = table.counts('Delta')
+    return list(compress(
+        zip(table.column('Issue'), table.counts(old_column), table.counts(new_column), deltas),
+        deltas,
+    )), (old_column, new_column)
+
+
+def join_findings(snapshot, local):
+    """Join a crawl with build findings on page key
+
+    local maps url_key -> [errors, warnings] from the validators. Returns
+    (rows, crawl_only, build_only): rows are (key, crawl issues, errors,
+    warnings) for pages both sides know about, crawl_only the crawled page
+    keys with no page in the build, build_only the built pages the crawl
+    missed.
+    """
+    totals = snapshot.page_totals()
+    crawled = set(snapshot.page_keys)
+    shared = crawled & local.keys()
+    rows = [(key, totals[key], *local[key]) for key in shared]
+    rows.sort(key=lambda row: (-row[1] - row[2], row[0]))
+    return rows, sorted(crawled - shared), sorted(local.keys() - shared)
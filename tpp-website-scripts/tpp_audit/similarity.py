@@ -0,0 +1,224 @@
+"""
+Near-duplicate body content
+Extracts each page's main text, shingles it into word 5-grams and keeps a
+fixed-size MinHash signature; locality-sensitive hashing over signature
+bands then finds pages above a similarity threshold without comparing
+every pair
+"""
+
+import base64
+import html
+import operator
+import random
+import re
+import sys
+import zlib
+from array import array
+from functools import lru_cache
+
+from tpp_audit.cache import cache_namespace
+
+# Words per shingle
+SHINGLE_SIZE = 5
+
+# Hash functions per signature; the LSH bands split these
+NUM_PERM = 128
+
+DEFAULT_THRESHOLD = 0.8
+
+# Fixed so signatures stay comparable across runs and cache entries
+SEED = 20251012
+
+# Multiply-shift hashing, (a * x + b) mod 2**64 with odd a, over the 32-bit
+# shingle hashes; numpy's uint64 arithmetic wraps the same way, so both
+# paths produce the same signatures. The top 32 bits of each minimum are kept
+MASK64 = (1 << 64) - 1
+_rng = random.Random(SEED)
+PERMUTATIONS = [(_rng.getrandbits(64) | 1, _rng.getrandbits(64)) for _ in range(NUM_PERM)]
+
+# Representatives compared per LSH bucket before a page is left unclustered,
+# so a bucket of unrelated pages cannot go quadratic
+MAX_BUCKET_REPS = 32
+
+# Boilerplate that is the same on every page and would mask real duplicates
+SKIPPED_ELEMENTS = re.compile(
+    r'<!--.*?-->'
+    r'|<(script|style|noscript|template|svg|nav|header|footer|aside|form)\b[^>]*>.*?</\1\s*>',
+    re.IGNORECASE | re.DOTALL,
+)
+MAIN = re.compile(r'<main\b[^>]*>(.*?)</main\s*>', re.IGNORECASE | re.DOTALL)
+BODY = re.compile(r'<body\b[^>]*>(.*)', re.IGNORECASE | re.DOTALL)
+TAG = re.compile(r'<[^>]+>')
+WORD = re.compile(r'\w+')
+
+# Bump when extraction or hashing changes so cached signatures are invalidated
+RULES_VERSION = 1
+
+CACHE_NAMESPACE = cache_namespace('similarity', RULES_VERSION, SHINGLE_SIZE, NUM_PERM, SEED,
+                                  SKIPPED_ELEMENTS.pattern)
+
+
+@lru_cache(maxsize=None)
+def _numpy():
+    """numpy, or None; imported on first use so loading this module stays cheap"""
+    try:
+        import numpy
+    except ImportError:  # optional speed-up; signatures are identical either way
+        return None
+    return numpy
+
+
+def body_words(data):
+    """Casefolded words of a page's main content (<main>, else <body>), without boilerplate"""
+    text = data.decode('utf-8', 'replace')
+    match = MAIN.search(text) or BODY.search(text)
+    text = match.group(1) if match else text
+    text = TAG.sub(' ', SKIPPED_ELEMENTS.sub(' ', text))
+    return WORD.findall(html.unescape(text).casefold())
+
+
+def shingle_hashes(words, size=SHINGLE_SIZE):
+    """Distinct crc32 hashes of every run of size words"""
+    return list({
+        zlib.crc32(' '.join(words[i:i + size]).encode('utf-8'))
+        for i in range(len(words) - size + 1)
+    })
+
+
+def minhash(hashes):
+    """array('I') of NUM_PERM minimum hash values (high 32 bits)
+
+    Each minimum is taken over C-level map() chains, or one broadcast with
+    numpy when it is installed.
+    """
+    numpy = _numpy()
+    if numpy is not None:
+        values = numpy.fromiter(hashes, dtype=numpy.uint64, count=len(hashes))
+        a = numpy.array([a for a, _ in PERMUTATIONS], dtype=numpy.uint64)[:, None]
+        b = numpy.array([b for _, b in PERMUTATIONS], dtype=numpy.uint64)[:, None]
+        with numpy.errstate(over='ignore'):
+            minima = (a * values + b).min(axis=1)
+        return array('I', (minima >> numpy.uint64(32)).astype(numpy.uint32).tobytes())
+
+    wrap = MASK64.__and__
+    return array('I', (
+        min(map(wrap, map(b.__add__, map(a.__mul__, hashes)))) >> 32
+        for a, b in PERMUTATIONS
+    ))
+
+
+def encode_signature(signature):
+    """Signature as base64 of its little-endian bytes (JSON-safe, 4 bytes per value)"""
+    if sys.byteorder == 'big':
+        signature = array('I', signature)
+        signature.byteswap()
+    return base64.b64encode(signature.tobytes()).decode('ascii')
+
+
+def decode_signature(text):
+    signature = array('I')
+    signature.frombytes(base64.b64decode(text))
+    if sys.byteorder == 'big':
+        signature.byteswap()
+    return signature
+
+
+def page_signature(data):
+    """Facts for one page: word count and encoded MinHash (None when too short to shingle)"""
+    words = body_words(data)
+    hashes = shingle_hashes(words)
+    return {
+        'words': len(words),
+        'signature': encode_signature(minhash(hashes)) if hashes else None,
+    }
+
+
+def lsh_params(num_perm, threshold):
+    """(bands, rows) whose S-curve midpoint (1/bands)**(1/rows) is nearest below threshold
+
+    Erring low means more candidate pairs to confirm but fewer near-duplicates
+    missed; every candidate is checked against the threshold anyway.
+    """
+    options = [(bands, num_perm // bands) for bands in range(1, num_perm + 1) if num_perm % bands == 0]
+    below = [params for params in options if (1 / params[0]) ** (1 / params[1]) <= threshold]
+    return max(below or options[-1:], key=lambda params: (1 / params[0]) ** (1 / params[1]))
+
+
+def similarity(a, b):
+    """Estimated Jaccard similarity: the share of equal signature positions"""
+    return sum(map(operator.eq, a, b)) / len(a)
+
+
+class SimilarityIndex:
+    """LSH buckets of MinHash signatures, built incrementally in one pass
+
+    Each band of rows values is a bucket key, so pages only meet the pages
+    they share a band with. Candidates are confirmed against the threshold
+    and merged with union-find; within a bucket every page is compared with
+    a few representatives rather than every other page, so clusters of
+    templated pages cost linear time.
+    """
+
+    def __init__(self, threshold=DEFAULT_THRESHOLD, num_perm=NUM_PERM):
+        self.threshold = threshold
+        self.bands, self.rows = lsh_params(num_perm, threshold)
+        self.buckets = [{} for _ in range(self.bands)]
+        self.signatures = {}
+
+    def add(self, page_id, signature):
+        self.signatures[page_id] = signature
+        raw = signature.tobytes()
+        width = self.rows * signature.itemsize
+        for band, buckets in enumerate(self.buckets):
+            buckets.setdefault(raw[band * width:(band + 1) * width], []).append(page_id)
+
+    def clusters(self):
+        """[(page ids, lowest similarity to the first page)], largest cluster first"""
+        parent = {}
+
+        def find(page_id):
+            root = page_id
+            while parent.get(root, root) != root:
+                root = parent[root]
+            while page_id != root:
+                parent[page_id], page_id = root, parent.get(page_id, page_id)
+            return root
+
+        for buckets in self.buckets:
+            for page_ids in buckets.values():
+                if len(page_ids) < 2:
+                    continue
+                reps = []
+                for page_id in page_ids:
+                    for rep in reps:
+                        if find(rep) == find(page_id):
+                            break
+                        if similarity(self.signatures[rep], self.signatures[page_id]) >= self.threshold:
+                            root = find(rep)
+                            parent.setdefault(root, root)
+                            parent[find(page_id)] = root
+                            break
+                    else:
+                        if len(reps) < MAX_BUCKET_REPS:
+                            reps.append(page_id)
+
+        groups = {}
+        for page_id in parent:
+            groups.setdefault(find(page_id), []).append(page_id)
+        clusters = []
+        for page_ids in groups.values():
+            page_ids.sort()
+            first = self.signatures[page_ids[0]]
+            lowest = min(similarity(first, self.signatures[page_id]) for page_id in page_ids[1:])
+            clusters.append((page_ids, lowest))
+        clusters.sort(key=lambda cluster: (-len(cluster[0]), cluster[0][0]))
+        return clusters
+
+
+def find_near_duplicates(facts, threshold=DEFAULT_THRESHOLD):
+    """Cluster pages from page_signature facts (page id = position in facts)"""
+    index = SimilarityIndex(threshold)
+    for page_id, page_facts in enumerate(facts):
+        if page_facts['signature'] is not None:
+            index.add(page_id, decode_signature(page_facts['signature']))
+    return index.clusters()
@@ -0,0 +1,347 @@
+"""
+Sitemap rules
+Shared by validate-sitemap.py and the unified tpp-audit runner
+Sitemaps are streamed with iterparse, so memory stays flat however many
+URLs they hold
+"""
+
+import gzip
+import hashlib
+import io
+import xml.etree.ElementTree as ET
+from array import array
+from datetime import datetime
+from pathlib import Path
+from urllib.parse import urlsplit
+
+from tpp_audit.cache import cache_namespace
+from tpp_audit.profiling import NULL_TIMER
+
+VALID_CHANGEFREQS = ['always', 'hourly', 'daily', 'weekly', 'monthly', 'yearly', 'never']
+
+SITEMAP_NS = '{http://www.sitemaps.org/schemas/sitemap/0.9}'
+
+# sitemaps.org protocol limits, per file (size is uncompressed)
+MAX_URLS = 50_000
+MAX_BYTES = 50 * 1024 * 1024
+
+# Sitemaps checked when none are named; the index is optional
+DEFAULT_SITEMAPS = ['sitemap.xml', 'sitemap-index.xml']
+
+# Bump when validation logic changes so cached results are invalidated
+RULES_VERSION = 2
+
+CACHE_NAMESPACE = cache_namespace('validate-sitemap', RULES_VERSION, VALID_CHANGEFREQS,
+                                  MAX_URLS, MAX_BYTES)
+
+_URL = SITEMAP_NS + 'url'
+_SITEMAP = SITEMAP_NS + 'sitemap'
+_SITEMAPINDEX = SITEMAP_NS + 'sitemapindex'
+_LOC = SITEMAP_NS + 'loc'
+_LASTMOD = SITEMAP_NS + 'lastmod'
+_CHANGEFREQ = SITEMAP_NS + 'changefreq'
+_PRIORITY = SITEMAP_NS + 'priority'
+
+
+class LocSet:
+    """Open-addressing set of 64-bit <loc> fingerprints in a flat array
+
+    Costs 16 bytes per URL at most (the table stays at most half full),
+    against well over 100 for a Python set of strings.
+    """
+
+    def __init__(self, capacity=1024):
+        self._table = array('Q', bytes(8 * capacity))
+        self._mask = capacity - 1
+        self._count = 0
+
+    def __len__(self):
+        return self._count
+
+    def add(self, value):
+        """Add a string; returns True if it was already present"""
+        # 0 marks an empty slot
+        fp = int.from_bytes(hashlib.blake2b(value.encode('utf-8'), digest_size=8).digest(), 'big') or 1
+        table, mask = self._table, self._mask
+        slot = fp & mask
+        while True:
+            current = table[slot]
+            if current == 0:
+                break
+            if current == fp:
+                return True
+            slot = (slot + 1) & mask
+        table[slot] = fp
+        self._count += 1
+        if self._count * 2 > len(table):
+            self._grow()
+        return False
+
+    def _grow(self):
+        old = self._table
+        self._table = array('Q', bytes(16 * len(old)))
+        self._mask = len(self._table) - 1
+        table, mask = self._table, self._mask
+        for fp in old:
+            if fp:
+                slot = fp & mask
+                while table[slot]:
+                    slot = (slot + 1) & mask
+                table[slot] = fp
+
+
+class _CountingReader:
+    """File wrapper that counts the (decompressed) bytes handed to the parser"""
+
+    def __init__(self, raw):
+        self.raw = raw
+        self.size = 0
+
+    def read(self, size=-1):
+        chunk = self.raw.read(size)
+        self.size += len(chunk)
+        return chunk
+
+
+def _open_sitemap(path, data=None):
+    gzipped = str(path).endswith('.gz')
+    if data is not None:
+        raw = io.BytesIO(data)
+        return gzip.GzipFile(fileobj=raw, mode='rb') if gzipped else raw
+    return gzip.open(path, 'rb') if gzipped else open(path, 'rb')
+
+
+def _text(elem, tag):
+    child = elem.find(tag)
+    return None if child is None else child.text
+
+
+def child_sitemap_path(loc, root_dir):
+    """Local build file for a child sitemap URL (its path under the site root)"""
+    path = urlsplit(loc.strip()).path.lstrip('/')
+    return Path(root_dir) / path if path else None
+
+
+class SitemapValidator:
+    """Validates a sitemap or sitemap index and the children it lists
+
+    Elements are cleared as soon as they are checked and duplicate <loc>
+    values are tracked as fingerprints in a LocSet, so peak memory does not
+    grow with the number of URLs beyond 16 bytes each.
+    """
+
+    def __init__(self, root_dir, timer=NULL_TIMER):
+        self.root_dir = Path(root_dir)
+        self.timer = timer
+        self.errors = []
+        self.url_count = 0
+        self.sitemaps = []
+        self.locs = LocSet()
+
+    def validate(self, path, data=None, prefix='', in_index=False):
+        """Stream one sitemap file, following it to children if it is an index"""
+        self.sitemaps.append(Path(path).name)
+        reader = None
+        children = []
+        try:
+            reader = _CountingReader(_open_sitemap(path, data))
+            # The first event is always the root element's start
+            events = ET.iterparse(reader, events=('start', 'end'))
+            _, root = next(events)
+
+            if root.tag != _SITEMAPINDEX:
+                self._check_urlset(events, root, prefix)
+            elif in_index:
+                self.errors.append(f"{prefix}Sitemap index may not list another sitemap index")
+            else:
+                children = self._check_index(events, root, prefix)
+        except ET.ParseError as e:
+            self.errors.append(f"{prefix}Invalid XML: {e}")
+        except (OSError, EOFError) as e:
+            self.errors.append(f"{prefix}Could not read sitemap: {e}")
+        finally:
+            if reader is not None:
+                reader.raw.close()
+
+        if reader is not None and reader.size > MAX_BYTES:
+            self.errors.append(f"{prefix}Sitemap is {reader.size} bytes uncompressed "
+                               f"(limit {MAX_BYTES})")
+
+        for loc in children:
+            child_path = child_sitemap_path(loc, self.root_dir)
+            if child_path is None or not child_path.is_file():
+                self.errors.append(f"{prefix}Child sitemap not found in build: {loc}")
+                continue
+            self.validate(child_path, prefix=f"{child_path.name}: ", in_index=True)
+
+    def _check_index(self, events, root, prefix):
+        children = []
+        count = 0
+        for event, elem in events:
+            if event != 'end' or elem.tag != _SITEMAP:
+                continue
+            count += 1
+            loc = _text(elem, _LOC)
+            lastmod = _text(elem, _LASTMOD)
+            root.clear()
+            self.timer.lap('parse')
+
+            if not loc:
+                self.errors.append(f"{prefix}Sitemap {count}: Missing <loc> element")
+            elif not loc.startswith(('http://', 'https://')):
+                self.errors.append(f"{prefix}Sitemap {count}: Invalid URL format: {loc}")
+            else:
+                children.append(loc)
+            self._check_lastmod(lastmod, f"{prefix}Sitemap {count}")
+            self.timer.lap('rule:index')
+
+        if count > MAX_URLS:
+            self.errors.append(f"{prefix}Sitemap index lists {count} sitemaps (limit {MAX_URLS})")
+        if not count:
+            self.errors.append(f"{prefix}No sitemaps found in sitemap index")
+        return children
+
+    def _check_urlset(self, events, root, prefix):
+        errors = self.errors
+        timer = self.timer
+        i = 0
+
+        for event, elem in events:
+            if event != 'end' or elem.tag != _URL:
+                continue
+            i += 1
+            loc = _text(elem, _LOC)
+            lastmod = _text(elem, _LASTMOD)
+            changefreq = elem.find(_CHANGEFREQ)
+            changefreq = None if changefreq is None else changefreq.text or ''
+            priority = elem.find(_PRIORITY)
+            priority = None if priority is None else priority.text or ''
+            # Drop everything parsed so far; only the root element survives
+            root.clear()
+            timer.lap('parse')
+
+            # Check required loc element
+            if not loc:
+                errors.append(f'{prefix}URL {i}: Missing <loc> element')
+                timer.lap('rule:loc')
+                continue
+
+            # Validate URL format
+            if not loc.startswith(('http://', 'https://')):
+                errors.append(f'{prefix}URL {i}: Invalid URL format: {loc}')
+            timer.lap('rule:loc')
+
+            if self.locs.add(loc.strip()):
+                errors.append(f'{prefix}URL {i}: Duplicate <loc>: {loc}')
+            timer.lap('rule:duplicate')
+
+            self._check_lastmod(lastmod, f'{prefix}URL {i}')
+            timer.lap('rule:lastmod')
+
+            # Validate changefreq
+            if changefreq is not None and changefreq not in VALID_CHANGEFREQS:
+                errors.append(f'{prefix}URL {i}: Invalid <changefreq>: {changefreq}')
+            timer.lap('rule:changefreq')
+
+            # Validate priority
+            if priority is not None:
+                try:
+                    p = float(priority)
+                    if not 0.0 <= p <= 1.0:
+                        errors.append(f'{prefix}URL {i}: Priority must be between 0.0 and 1.0: {p}')
+                except ValueError:
+                    errors.append(f'{prefix}URL {i}: Invalid <priority> value: {priority}')
+            timer.lap('rule:priority')
+
+        if i > MAX_URLS:
+            errors.append(f'{prefix}Sitemap has {i} URLs (limit {MAX_URLS})')
+        if not i:
+            errors.append(f'{prefix}No URLs found in sitemap')
+        self.url_count += i
+
+    def _check_lastmod(self, lastmod, label):
+        # Validate lastmod date format
+        if lastmod:
+            try:
+                datetime.fromisoformat(lastmod.replace('Z', '+00:00'))
+            except ValueError:
+                self.errors.append(f'{label}: Invalid date format in <lastmod>: {lastmod}')
+
+    def result(self):
+        return {'url_count': self.url_count, 'sitemaps': self.sitemaps, 'errors': self.errors}
+
+
+def check_sitemap(sitemap_path, data=None, timer=NULL_TIMER):
+    """Validate a sitemap (or sitemap index and its children)
+
+    data may hold the entry file's bytes when they are already in memory;
+    otherwise it is streamed from disk like the children. Returns
+    {'url_count': int, 'sitemaps': [...], 'errors': [...]} so results can
+    be cached.
+    """
+    validator = SitemapValidator(Path(sitemap_path).parent, timer)
+    validator.validate(sitemap_path, data)
+    return validator.result()
+
+
+def iter_locs(sitemap_path):
+    """Yield every <loc> of a sitemap, or of each child of a sitemap index
+
+    Streams like the validator; unreadable or malformed files simply stop
+    early, since check_sitemap reports them.
+    """
+    for path in sitemap_files(sitemap_path):
+        try:
+            with _open_sitemap(path) as stream:
+                events = ET.iterparse(stream, events=('start', 'end'))
+                _, root = next(events)
+                if root.tag == _SITEMAPINDEX:
+                    continue
+                for event, elem in events:
+                    if event == 'end' and elem.tag == _URL:
+                        loc = _text(elem, _LOC)
+                        root.clear()
+                        if loc:
+                            yield loc.strip()
+        except (ET.ParseError, OSError, EOFError):
+            continue
+
+
+def sitemap_files(sitemap_path):
+    """The entry file plus the local children of a sitemap index
+
+    Only the start of a plain sitemap is parsed, so this is cheap enough
+    to run before every cache lookup.
+    """
+    sitemap_path = Path(sitemap_path)
+    files = [sitemap_path]
+    try:
+        with _open_sitemap(sitemap_path) as stream:
+            events = ET.iterparse(stream, events=('start', 'end'))
+            _, root = next(events)
+            if root.tag != _SITEMAPINDEX:
+                return files
+            for event, elem in events:
+                if event == 'end' and elem.tag == _SITEMAP:
+                    loc = _text(elem, _LOC)
+                    root.clear()
+                    child_path = child_sitemap_path(loc, sitemap_path.parent) if loc else None
+                    if child_path is not None:
+                        files.append(child_path)
+    except (ET.ParseError, OSError, EOFError, StopIteration):
+        pass
+    return files
+
+
+def sitemap_digest(sitemap_path, chunk_size=1024 * 1024):
+    """Cache key covering a sitemap and every child it lists, read in chunks"""
+    digest = hashlib.sha256()
+    for path in sitemap_files(sitemap_path):
+        digest.update(path.name.encode('utf-8') + b'\0')
+        try:
+            with open(path, 'rb') as f:
+                for chunk in iter(lambda: f.read(chunk_size), b''):
+                    digest.update(chunk)
+        except OSError:
+            digest.update(b'\0missing')
+    return digest.hexdigest()
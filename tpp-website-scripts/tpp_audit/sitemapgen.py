@@ -0,0 +1,242 @@
+"""
+Sitemap generation from the build output
+Streams <url> entries into shards at the protocol limits, plus an index,
+and only replaces shard files whose content actually changed
+"""
+
+import gzip
+import hashlib
+import os
+import sqlite3
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from urllib.parse import urlsplit
+from xml.sax.saxutils import escape
+
+from tpp_audit.cache import cache_namespace, cache_path, content_digest
+from tpp_audit.headparse import extract_head_text
+from tpp_audit.reconcile import CACHE_NAMESPACE as RECONCILE_NAMESPACE, page_facts
+from tpp_audit.sitemap import MAX_BYTES, MAX_URLS, SITEMAP_NS, _open_sitemap
+from tpp_audit.urls import url_key
+
+XML_DECLARATION = '<?xml version="1.0" encoding="UTF-8"?>\n'
+URLSET_OPEN = f'<urlset xmlns="{SITEMAP_NS[1:-1]}">\n'
+URLSET_CLOSE = '</urlset>\n'
+INDEX_OPEN = f'<sitemapindex xmlns="{SITEMAP_NS[1:-1]}">\n'
+INDEX_CLOSE = '</sitemapindex>\n'
+
+DEFAULT_INDEX_NAME = 'sitemap-index.xml'
+DEFAULT_SHARD_PREFIX = 'sitemap-'
+
+LASTMOD_SOURCES = ['hash', 'mtime']
+
+# Bump when the collected page facts change so cached results are invalidated
+RULES_VERSION = 1
+
+CACHE_NAMESPACE = cache_namespace('sitemapgen', RULES_VERSION, RECONCILE_NAMESPACE)
+
+_FOOTER_BYTES = len(URLSET_CLOSE.encode('utf-8'))
+
+
+def sitemap_page(html_file, data):
+    """Per-page facts the generator needs: canonical, noindex and a content hash"""
+    facts = page_facts(extract_head_text(data.decode('utf-8')))
+    facts['hash'] = content_digest(data)[:16]
+    return facts
+
+
+def format_lastmod(timestamp):
+    return datetime.fromtimestamp(timestamp, timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')
+
+
+class LastmodState:
+    """loc -> (content hash, lastmod) kept between runs in SQLite
+
+    With the 'hash' source a page's lastmod only moves when its content
+    does, so rebuilding (which touches every mtime) leaves the sitemap
+    alone. Rows for pages that are no longer listed are dropped by finish().
+    """
+
+    def __init__(self, path=None):
+        self.path = Path(path or cache_path().with_name('sitemap-state.sqlite3'))
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(self.path)
+        self.conn.execute(
+            'CREATE TABLE IF NOT EXISTS lastmod ('
+            'loc TEXT PRIMARY KEY, hash TEXT NOT NULL, lastmod TEXT NOT NULL, run REAL NOT NULL)'
+        )
+        self.run = time.time()
+        self.now = format_lastmod(self.run)
+
+    def lastmod(self, loc, page_hash, mtime):
+        """lastmod for a page; first sightings fall back to the file's mtime"""
+        row = self.conn.execute('SELECT hash, lastmod FROM lastmod WHERE loc = ?', (loc,)).fetchone()
+        if row is None:
+            lastmod = format_lastmod(mtime)
+        elif row[0] != page_hash:
+            lastmod = self.now
+        else:
+            lastmod = row[1]
+        self.conn.execute('INSERT OR REPLACE INTO lastmod VALUES (?, ?, ?, ?)',
+                          (loc, page_hash, lastmod, self.run))
+        return lastmod
+
+    def finish(self):
+        with self.conn:
+            self.conn.execute('DELETE FROM lastmod WHERE run != ?', (self.run,))
+        self.conn.close()
+
+
+def _file_digest(path):
+    """sha256 of a sitemap's uncompressed content, or None if it is missing"""
+    digest = hashlib.sha256()
+    try:
+        with _open_sitemap(path) as stream:
+            for chunk in iter(lambda: stream.read(1024 * 1024), b''):
+                digest.update(chunk)
+    except (OSError, EOFError):
+        return None
+    return digest.hexdigest()
+
+
+class _StreamingFile:
+    """Writes text to a temp file next to path, hashing it on the way
+
+    commit() moves the temp file into place only when the content differs
+    from what is already there, so unchanged files keep their mtime.
+    """
+
+    def __init__(self, path, gzipped):
+        self.path = Path(path)
+        self.digest = hashlib.sha256()
+        self.size = 0
+        fd, self.temp_path = tempfile.mkstemp(dir=self.path.parent, prefix='.' + self.path.name)
+        raw = os.fdopen(fd, 'wb')
+        # mtime=0 keeps identical content byte-identical when gzipped
+        self.stream = gzip.GzipFile(fileobj=raw, mode='wb', mtime=0) if gzipped else raw
+        self._raw = raw
+
+    def write(self, text):
+        data = text.encode('utf-8')
+        self.digest.update(data)
+        self.size += len(data)
+        self.stream.write(data)
+
+    def commit(self):
+        """Returns True if the file was written, False if it was unchanged"""
+        self.stream.close()
+        self._raw.close()
+        if _file_digest(self.path) == self.digest.hexdigest():
+            os.unlink(self.temp_path)
+            return False
+        os.chmod(self.temp_path, 0o644)
+        os.replace(self.temp_path, self.path)
+        return True
+
+
+class ShardedSitemapWriter:
+    """Streams <url> entries into sitemap-N.xml shards and writes the index
+
+    A shard is closed as soon as another entry would break the URL or byte
+    limit, so at most one shard is open and memory does not depend on the
+    number of URLs.
+    """
+
+    def __init__(self, out_dir, site_url, prefix=DEFAULT_SHARD_PREFIX, gzipped=False,
+                 max_urls=MAX_URLS, max_bytes=MAX_BYTES):
+        if not 1 <= max_urls <= MAX_URLS:
+            raise ValueError(f"max_urls must be between 1 and {MAX_URLS}, got {max_urls}")
+        if not 0 < max_bytes <= MAX_BYTES:
+            raise ValueError(f"max_bytes must be between 1 and {MAX_BYTES}, got {max_bytes}")
+        self.out_dir = Path(out_dir)
+        self.site_url = site_url.rstrip('/')
+        self.prefix = prefix
+        self.suffix = '.xml.gz' if gzipped else '.xml'
+        self.gzipped = gzipped
+        self.max_urls = max_urls
+        self.max_bytes = max_bytes
+        # [(file name, newest lastmod, written)]
+        self.shards = []
+        self._file = None
+        self._count = 0
+        self._newest = ''
+
+    def add(self, loc, lastmod):
+        entry = f"<url><loc>{escape(loc)}</loc><lastmod>{lastmod}</lastmod></url>\n"
+        size = len(entry.encode('utf-8'))
+        if self._file is not None and (
+            self._count >= self.max_urls
+            or self._file.size + size + _FOOTER_BYTES > self.max_bytes
+        ):
+            self._close_shard()
+        if self._file is None:
+            name = f"{self.prefix}{len(self.shards)}{self.suffix}"
+            self._file = _StreamingFile(self.out_dir / name, self.gzipped)
+            self._file.write(XML_DECLARATION + URLSET_OPEN)
+        self._file.write(entry)
+        self._count += 1
+        self._newest = max(self._newest, lastmod)
+
+    def _close_shard(self):
+        self._file.write(URLSET_CLOSE)
+        written = self._file.commit()
+        self.shards.append((self._file.path.name, self._newest, written))
+        self._file = None
+        self._count = 0
+        self._newest = ''
+
+    def close(self, index_name=DEFAULT_INDEX_NAME):
+        """Finish the last shard, write the index and remove stale shards
+
+        Returns (shards, index written, removed file names). An index must
+        list at least one sitemap, so with no URLs added nothing is written
+        and ValueError is raised.
+        """
+        if self._file is not None:
+            self._close_shard()
+        if not self.shards:
+            raise ValueError("No URLs were added; a sitemap index cannot be empty")
+
+        index = _StreamingFile(self.out_dir / index_name, False)
+        index.write(XML_DECLARATION + INDEX_OPEN)
+        for name, newest, _ in self.shards:
+            index.write(f"<sitemap><loc>{escape(self.site_url)}/{name}</loc>"
+                        f"<lastmod>{newest}</lastmod></sitemap>\n")
+        index.write(INDEX_CLOSE)
+        index_written = index.commit()
+
+        # Shards past the new count are left over from a bigger site, or
+        # from a run with the other compression
+        current = {name for name, _, _ in self.shards}
+        removed = []
+        for suffix in ('.xml', '.xml.gz'):
+            n = 0
+            while True:
+                stale = self.out_dir / f"{self.prefix}{n}{suffix}"
+                if not stale.exists() and n >= len(self.shards):
+                    break
+                if stale.exists() and stale.name not in current:
+                    stale.unlink()
+                    removed.append(stale.name)
+                n += 1
+        return self.shards, index_written, removed
+
+
+def exclusion_reason(url_path, facts, site_host):
+    """Why a page stays out of the sitemap ('noindex', 'non-canonical'), or None
+
+    A page is non-canonical when its rel=canonical points at another URL
+    or at another host than the sitemap's.
+    """
+    if facts['noindex']:
+        return 'noindex'
+    canonical = facts['canonical']
+    if canonical:
+        parts = urlsplit(canonical)
+        if url_key(parts.path) != url_key(url_path):
+            return 'non-canonical'
+        if parts.netloc and parts.netloc.lower() != site_host:
+            return 'non-canonical'
+    return None
@@ -0,0 +1,169 @@
+"""
+URL <-> build file mapping
+How the host serves built files: index.html, .html-less and trailing-slash
+forms of a page are one URL, and _redirects rules apply where no file
+matches (or always, when forced with "!")
+"""
+
+import os
+import posixpath
+from pathlib import Path
+from urllib.parse import unquote, urlsplit
+
+from tpp_audit.discovery import SKIP_DIRS
+
+SITE_URL = 'https://theprofitplatform.com.au'
+
+REDIRECTS_FILE = '_redirects'
+
+# Redirect chains longer than this are reported as broken (loops included)
+MAX_REDIRECT_HOPS = 5
+
+
+def url_key(path):
+    """Collapse the forms a page is served under into one lookup key
+
+    /about, /about/, /about.html and /about/index.html all become /about;
+    the site root is /.
+    """
+    path = unquote(urlsplit(path).path) or '/'
+    if path.endswith('/index.html'):
+        path = path[:-len('index.html')]
+    elif path.endswith('.html'):
+        path = path[:-len('.html')]
+    return path.rstrip('/') or '/'
+
+
+def url_id(url):
+    """(host, url_key) so URLs compare equal across the forms a page is served under"""
+    parts = urlsplit(url)
+    return parts.netloc.lower(), url_key(parts.path)
+
+
+def page_url_path(rel_path):
+    """URL path a built file is published at (rel_path is relative to the site root)"""
+    rel_path = Path(rel_path).as_posix()
+    if rel_path == 'index.html':
+        return '/'
+    if rel_path.endswith('/index.html'):
+        return '/' + rel_path[:-len('index.html')]
+    return '/' + rel_path
+
+
+def load_redirects(root_dir):
+    """Parse the site's _redirects into {url_key(from): (to, status)}
+
+    Only exact rules are kept; splats and :placeholders are skipped, as are
+    rules that merely normalise a URL (e.g. /index.html -> /).
+    """
+    redirects = {}
+    path = Path(root_dir) / REDIRECTS_FILE
+    try:
+        lines = path.read_text(encoding='utf-8').splitlines()
+    except (FileNotFoundError, UnicodeDecodeError):
+        return redirects
+
+    for line in lines:
+        fields = line.split('#', 1)[0].split()
+        if len(fields) < 2:
+            continue
+        source, target = fields[0], fields[1]
+        status = fields[2] if len(fields) > 2 else '301'
+        if '*' in source or ':' in source:
+            continue
+        key = url_key(source)
+        target_parts = urlsplit(target)
+        if not target_parts.netloc and url_key(target) == key:
+            continue
+        redirects.setdefault(key, (target, status))
+    return redirects
+
+
+def site_hosts(site_url=SITE_URL):
+    """Hosts whose absolute links count as internal (apex and www)"""
+    host = urlsplit(site_url).netloc.lower()
+    bare = host[4:] if host.startswith('www.') else host
+    return {bare, 'www.' + bare}
+
+
+def resolve_href(href, base_path, hosts=frozenset()):
+    """Resolve a link found on the page at base_path to a site URL path
+
+    Relative, root-relative and absolute links to one of hosts are
+    resolved (query and fragment dropped); anything else (other sites,
+    mailto:, tel:, javascript:, data:) returns None.
+    """
+    parts = urlsplit(href.strip())
+    if parts.scheme and parts.scheme.lower() not in ('http', 'https'):
+        return None
+    if parts.netloc and parts.netloc.lower() not in hosts:
+        return None
+    if not parts.path:
+        # '#top', '?page=2' and bare host links
+        return '/' if parts.netloc else base_path
+    if parts.path.startswith('/'):
+        path = parts.path
+    else:
+        path = posixpath.join(posixpath.dirname(base_path), parts.path)
+    trailing = path.endswith(('/', '/.', '/..'))
+    path = posixpath.normpath(unquote(path)).lstrip('/')
+    if path in ('', '.'):
+        return '/'
+    return '/' + path + ('/' if trailing else '')
+
+
+class SiteIndex:
+    """In-memory index of every file in the build output
+
+    resolve() maps a URL path to the file the host would serve, following
+    _redirects, with results memoised since most links repeat across pages.
+    """
+
+    def __init__(self, root_dir):
+        self.root_dir = Path(root_dir)
+        self.files = set()
+        for dirpath, dirnames, filenames in os.walk(self.root_dir):
+            dirnames[:] = [name for name in dirnames
+                           if name not in SKIP_DIRS and not name.startswith('.')]
+            rel_dir = Path(dirpath).relative_to(self.root_dir).as_posix()
+            prefix = '/' if rel_dir == '.' else f"/{rel_dir}/"
+            self.files.update(prefix + name for name in filenames)
+        self.redirects = load_redirects(self.root_dir)
+        self._resolved = {}
+
+    def find_file(self, path):
+        """The file served for path without redirects, or None"""
+        if path.endswith('/'):
+            candidates = [path + 'index.html']
+        else:
+            candidates = [path, path + '/index.html', path + '.html']
+        for candidate in candidates:
+            if candidate in self.files:
+                return candidate
+        return None
+
+    def resolve(self, path):
+        """Return (file or None, [redirect targets followed])
+
+        An external redirect target ends the chain as resolved with file
+        None but a non-empty chain.
+        """
+        result = self._resolved.get(path)
+        if result is None:
+            result = self._resolved[path] = self._follow(path)
+        return result
+
+    def _follow(self, path):
+        chain = []
+        for _ in range(MAX_REDIRECT_HOPS + 1):
+            found = self.find_file(path)
+            rule = self.redirects.get(url_key(path))
+            if rule is None or (found is not None and not rule[1].endswith('!')):
+                return found, chain
+            target = rule[0]
+            chain.append(target)
+            target_parts = urlsplit(target)
+            if target_parts.netloc:
+                return None, chain
+            path = target_parts.path or '/'
+        return None, chain
@@ -0,0 +1,359 @@
+"""
+Watch mode for the unified audit
+Keeps checks warm and re-validates only pages that change on disk
+"""
+
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import time
+from fnmatch import fnmatch
+from pathlib import Path
+
+from tpp_audit.cache import CachedCheck
+from tpp_audit.discovery import discover_html_files, is_site_path
+from tpp_audit.runner import ERROR, IndexCheck, PageAudit, audit_namespace, select_checks
+
+DEFAULT_DEBOUNCE = 0.2
+DEFAULT_POLL_INTERVAL = 0.5
+
+SITEMAP_PATTERNS = ['sitemap*.xml', 'sitemap*.xml.gz']
+
+# inotify(7) constants
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_IGNORED = 0x00008000
+IN_ISDIR = 0x40000000
+IN_Q_OVERFLOW = 0x00004000
+
+WATCH_MASK = (IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO
+              | IN_CREATE | IN_DELETE | IN_DELETE_SELF)
+
+EVENT_HEADER = struct.Struct('iIII')
+
+
+def _skip_dir(name):
+    return name in ('node_modules', '__pycache__') or name.startswith('.')
+
+
+class InotifyWatcher:
+    """Recursive inotify watcher (Linux) built on libc via ctypes
+
+    changes() returns the set of paths created, written, moved or deleted
+    since the last call. New directories are watched as they appear and
+    scanned once, so files written before their watch existed are not lost.
+    """
+
+    def __init__(self, root_dir):
+        self.root_dir = Path(root_dir)
+        libc_name = ctypes.util.find_library('c') or 'libc.so.6'
+        self._libc = ctypes.CDLL(libc_name, use_errno=True)
+        self.fd = self._libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), 'inotify_init1 failed')
+        self._dirs = {}
+        self._add_tree(self.root_dir)
+
+    def _add_dir(self, path):
+        wd = self._libc.inotify_add_watch(self.fd, os.fsencode(path), WATCH_MASK)
+        if wd < 0:
+            raise OSError(ctypes.get_errno(), f'inotify_add_watch failed for {path}')
+        self._dirs[wd] = Path(path)
+
+    def _add_tree(self, top, found=None):
+        for dirpath, dirnames, filenames in os.walk(top):
+            dirnames[:] = [name for name in dirnames if not _skip_dir(name)]
+            self._add_dir(dirpath)
+            if found is not None:
+                found.update(Path(dirpath) / name for name in filenames)
+
+    def changes(self, timeout=None):
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return set()
+
+        changed = set()
+        try:
+            data = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return changed
+
+        offset = 0
+        while offset < len(data):
+            wd, mask, _, length = EVENT_HEADER.unpack_from(data, offset)
+            offset += EVENT_HEADER.size
+            name = data[offset:offset + length].rstrip(b'\0')
+            offset += length
+
+            if mask & IN_Q_OVERFLOW:
+                raise OverflowError('inotify queue overflowed')
+            if mask & IN_IGNORED:
+                self._dirs.pop(wd, None)
+                continue
+
+            parent = self._dirs.get(wd)
+            if parent is None or not name:
+                continue
+            path = parent / os.fsdecode(name)
+
+            if mask & IN_ISDIR:
+                if mask & (IN_CREATE | IN_MOVED_TO) and not _skip_dir(path.name):
+                    self._add_tree(path, changed)
+                continue
+
+            # IN_CREATE alone is followed by IN_CLOSE_WRITE once content lands
+            if mask & (IN_CLOSE_WRITE | IN_MOVED_TO | IN_MOVED_FROM | IN_DELETE):
+                changed.add(path)
+
+        return changed
+
+    def close(self):
+        os.close(self.fd)
+
+
+class PollingWatcher:
+    """Portable fallback that compares (mtime, size) snapshots"""
+
+    def __init__(self, root_dir, interval=DEFAULT_POLL_INTERVAL):
+        self.root_dir = Path(root_dir)
+        self.interval = interval
+        self._snapshot = self._scan()
+
+    def _scan(self):
+        snapshot = {}
+        for dirpath, dirnames, filenames in os.walk(self.root_dir):
+            dirnames[:] = [name for name in dirnames if not _skip_dir(name)]
+            for name in filenames:
+                path = Path(dirpath) / name
+                try:
+                    stat = path.stat()
+                except FileNotFoundError:
+                    continue
+                snapshot[path] = (stat.st_mtime_ns, stat.st_size)
+        return snapshot
+
+    def changes(self, timeout=None):
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            time.sleep(self.interval if deadline is None
+                       else max(0, min(self.interval, deadline - time.monotonic())))
+            snapshot = self._scan()
+            changed = {
+                path for path in snapshot.keys() | self._snapshot.keys()
+                if snapshot.get(path) != self._snapshot.get(path)
+            }
+            self._snapshot = snapshot
+            if changed or (deadline is not None and time.monotonic() >= deadline):
+                return changed
+
+    def close(self):
+        pass
+
+
+def open_watcher(root_dir, poll=False, interval=DEFAULT_POLL_INTERVAL):
+    """Prefer inotify; fall back to polling where it is unavailable"""
+    if not poll:
+        try:
+            return InotifyWatcher(root_dir)
+        except (OSError, AttributeError):
+            # Not Linux, no libc inotify symbols, or out of watches
+            pass
+    return PollingWatcher(root_dir, interval)
+
+
+class AuditSession:
+    """Holds the latest findings per page so re-runs can be diffed
+
+    Index checks (e.g. duplicates) keep every page's facts in memory and
+    re-report from them, so a single-page edit never re-parses the site.
+    """
+
+    def __init__(self, root_dir, check_names=None, include=None, exclude=None, use_cache=True):
+        self.root_dir = Path(root_dir)
+        self.include = include
+        self.exclude = exclude
+        checks = select_checks(check_names)
+        self.page_checks = [check for check in checks if not check.site_wide]
+        self.index_checks = [check for check in self.page_checks if isinstance(check, IndexCheck)]
+        self.site_checks = [check for check in checks if check.site_wide]
+        self.use_cache = use_cache
+        page_audit = PageAudit(self.root_dir, [check.name for check in self.page_checks])
+        self.audit = CachedCheck(page_audit, audit_namespace(self.page_checks),
+                                 enabled=use_cache, variant=page_audit.cache_variant)
+        self.findings = {}
+        self.facts = {}
+
+    def relative(self, path):
+        return Path(path).relative_to(self.root_dir).as_posix()
+
+    def is_page(self, rel_path):
+        return bool(self.page_checks) and is_site_path(rel_path, self.include, self.exclude)
+
+    def is_sitemap(self, rel_path):
+        # Indexes and their children live alongside sitemap.xml
+        return bool(self.site_checks) and '/' not in rel_path and any(
+            fnmatch(rel_path, pattern) for pattern in SITEMAP_PATTERNS
+        )
+
+    def _audit_page(self, rel_path):
+        path = self.root_dir / rel_path
+        if not path.is_file():
+            self.facts.pop(rel_path, None)
+            return None
+        try:
+            result = self.audit(path)[0]
+        except (OSError, UnicodeDecodeError) as e:
+            # Mid-write or vanished between the event and the read
+            return [[ERROR, 'read', str(e)]]
+        self.facts[rel_path] = result['facts']
+        return [
+            [severity, check_name, message]
+            for check_name, results in result['findings'].items()
+            for severity, message in results
+        ]
+
+    def _site_findings(self):
+        findings = {}
+        paths = sorted(self.facts)
+        for check in self.index_checks:
+            facts = (self.facts[path][check.name] for path in paths)
+            findings[check.name] = check.report(paths, facts, self.root_dir)
+        for check in self.site_checks:
+            findings[check.name] = check.check_site(self.root_dir, use_cache=self.use_cache)
+        # Site-level keys are tuples so they never collide with page paths
+        return {
+            ('site', name): [[severity, name, message] for severity, message in results]
+            for name, results in findings.items()
+        }
+
+    def _diff(self, key, new):
+        """Replace findings for key, returning (added, resolved)"""
+        old = self.findings.pop(key, [])
+        if new is not None:
+            self.findings[key] = new
+        else:
+            new = []
+        old_set = {tuple(item) for item in old}
+        new_set = {tuple(item) for item in new}
+        return ([item for item in new if tuple(item) not in old_set],
+                [item for item in old if tuple(item) not in new_set])
+
+    def full_run(self):
+        pages = []
+        if self.page_checks:
+            pages = discover_html_files(self.root_dir, recursive=True,
+                                        include=self.include, exclude=self.exclude)
+        for path in pages:
+            rel_path = self.relative(path)
+            self.findings[rel_path] = self._audit_page(rel_path) or []
+        for key, findings in self._site_findings().items():
+            self.findings[key] = findings
+        return len(pages)
+
+    def update(self, rel_paths):
+        """Re-audit changed pages; returns {key: (added, resolved, removed)}"""
+        changes = {}
+        pages_changed = False
+
+        for rel_path in sorted(rel_paths):
+            if self.is_page(rel_path):
+                pages_changed = True
+                new = self._audit_page(rel_path)
+                added, resolved = self._diff(rel_path, new)
+                changes[rel_path] = (added, resolved, new is None)
+
+        if pages_changed or any(self.is_sitemap(rel_path) for rel_path in rel_paths):
+            for key, new in self._site_findings().items():
+                added, resolved = self._diff(key, new)
+                changes[key] = (added, resolved, False)
+
+        return changes
+
+    def totals(self):
+        errors = warnings = 0
+        for findings in self.findings.values():
+            for severity, _, _ in findings:
+                if severity == ERROR:
+                    errors += 1
+                else:
+                    warnings += 1
+        return errors, warnings
+
+
+def _print_changes(changes):
+    for key, (added, resolved, removed) in changes.items():
+        if not added and not resolved and not removed:
+            continue
+        if isinstance(key, tuple):
+            print(f"🌐 {key[1]}")
+        else:
+            print(f"📄 {key}{' (removed)' if removed else ''}")
+        for severity, check_name, message in added:
+            marker = '❌' if severity == ERROR else '⚠️ '
+            print(f"  + {marker} {check_name}: {message}")
+        for _, check_name, message in resolved:
+            print(f"  - ✅ {check_name}: {message}")
+
+
+def watch_site(session, poll=False, debounce=DEFAULT_DEBOUNCE, interval=DEFAULT_POLL_INTERVAL):
+    """Run a full audit once, then re-validate changed files until interrupted"""
+    started = time.perf_counter()
+    page_count = session.full_run()
+    errors, warnings = session.totals()
+    print(f"📊 Initial audit: {page_count} files, {errors} errors, {warnings} warnings "
+          f"({time.perf_counter() - started:.2f}s)\n")
+
+    watcher = open_watcher(session.root_dir, poll=poll, interval=interval)
+    kind = 'polling' if isinstance(watcher, PollingWatcher) else 'inotify'
+    print(f"👀 Watching {session.root_dir} ({kind}), Ctrl+C to stop\n")
+
+    pending = set()
+    try:
+        while True:
+            # Block until something happens, then keep collecting until the
+            # build has been quiet for the debounce window
+            try:
+                batch = watcher.changes(timeout=debounce if pending else None)
+            except OverflowError:
+                print("⚠️  Event queue overflowed, re-running full audit\n")
+                session.findings.clear()
+                session.facts.clear()
+                session.full_run()
+                pending.clear()
+                continue
+
+            if batch:
+                pending.update(batch)
+                continue
+            if not pending:
+                continue
+
+            started = time.perf_counter()
+            rel_paths = set()
+            for path in pending:
+                try:
+                    rel_paths.add(session.relative(path))
+                except ValueError:
+                    pass
+            pending.clear()
+
+            changes = session.update(rel_paths)
+            if any(added or resolved or removed for added, resolved, removed in changes.values()):
+                _print_changes(changes)
+                errors, warnings = session.totals()
+                print(f"📊 {errors} errors, {warnings} warnings "
+                      f"({time.perf_counter() - started:.2f}s)\n")
+    except KeyboardInterrupt:
+        print("\n👋 Stopped watching\n")
+    finally:
+        watcher.close()
+        session.audit.close()
+
+    errors, _ = session.totals()
+    return 1 if errors else 0
@@ -5,51 +5,98 @@ Validate JSON-LD schema markup in HTML files
 Checks for LocalBusiness, Organization, and other schemas
 """
 
-import json
+import argparse
 import sys
-import re
 from pathlib import Path
-from bs4 import BeautifulSoup
-
-def extract_json_ld(html_content):
-    """Extract JSON-LD scripts from HTML"""
-    soup = BeautifulSoup(html_content, 'html.parser')
-    scripts = soup.find_all('script', type='application/ld+json')
-    schemas = []
-
-    for script in scripts:
-        try:
-            schema = json.loads(script.string)
-            schemas.append(schema)
-        except json.JSONDecodeError as e:
-            print(f"  ⚠️  Invalid JSON-LD: {e}")
-
-    return schemas
-
-def validate_schema(schema, schema_type):
-    """Validate required fields for schema type"""
-    required_fields = {
-        'LocalBusiness': ['@type', 'name', 'address', 'telephone'],
-        'Organization': ['@type', 'name', 'url'],
-        'WebSite': ['@type', 'name', 'url'],
-        'FAQPage': ['@type', 'mainEntity'],
-    }
-
-    errors = []
-    schema_type_value = schema.get('@type', '')
-
-    if schema_type_value in required_fields:
-        for field in required_fields[schema_type_value]:
-            if field not in schema:
-                errors.append(f"Missing required field: {field}")
-
-    return errors
-
-def main():
+
+from tpp_audit.cache import CachedCheck, add_cache_arguments, cache_namespace, finish_cache
+from tpp_audit.discovery import discover_html_files
+from tpp_audit.jsonld import scan_json_ld
+from tpp_audit.nap import CACHE_NAMESPACE as NAP_NAMESPACE, NapIndex, nap_entities
+from tpp_audit.pool import map_in_pool
+from tpp_audit.profiling import (
+    NULL_TIMER,
+    ProfiledCheck,
+    add_profile_arguments,
+    maybe_cprofile,
+    print_profile,
+)
+from tpp_audit.schema import CACHE_NAMESPACE, check_schemas, parse_json_ld
+# Re-exported: callers that load this script still use validate_schema from it
+from tpp_audit.schema import validate_schema  # noqa: F401
+
+# Cached per-file results carry the NAP facts too, so the site-wide
+# consistency report never re-parses an unchanged file
+FILE_NAMESPACE = cache_namespace('validate-schema-file', 1, CACHE_NAMESPACE, NAP_NAMESPACE)
+
+# Files listed per NAP variant before the rest are summarised
+MAX_LISTED = 5
+
+def extract_json_ld(html_content, invalid=None):
+    """Extract JSON-LD scripts from HTML
+
+    Parse failures are printed, or appended to invalid when a list is given.
+    """
+    if isinstance(html_content, str):
+        html_content = html_content.encode('utf-8')
+    return parse_json_ld(scan_json_ld(html_content), invalid)
+
+def check_schema_file(html_file, data, timer=NULL_TIMER):
+    """Extract and validate every JSON-LD block in an HTML file"""
+    blocks = scan_json_ld(data)
+    timer.lap('parse:scan')
+    invalid = []
+    schemas = parse_json_ld(blocks, invalid)
+    timer.lap('parse:json')
+    findings = check_schemas(schemas, invalid, timer)
+    findings['nap'] = nap_entities(schemas)
+    timer.lap('nap:extract')
+    return findings
+
+def print_nap_report(names, outcomes):
+    """Report businesses whose NAP details differ between files"""
+    index = NapIndex()
+    for page_id, outcome in enumerate(outcomes):
+        index.add(page_id, outcome[0]['nap'])
+
+    conflicts = list(index.conflicts())
+    print(f"🏢 NAP consistency ({index.businesses()} businesses):")
+    if not conflicts:
+        print("  ✓ Consistent across files")
+    for label, field, variants in conflicts:
+        print(f"  ⚠️  Inconsistent {field} for {label}:")
+        for written, page_ids in variants:
+            listed = ', '.join(names[page_id] for page_id in page_ids[:MAX_LISTED])
+            if len(page_ids) > MAX_LISTED:
+                listed += f" (+{len(page_ids) - MAX_LISTED} more)"
+            print(f"      - '{written}' in {listed}")
+    print()
+    return len(conflicts)
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Validate JSON-LD schema markup in HTML files')
+    parser.add_argument('--root', type=Path, default=Path(__file__).parent.parent,
+                        help='Site root to scan (default: repository root)')
+    parser.add_argument('-r', '--recursive', action='store_true',
+                        help='Scan subdirectories (local/, power/, blog/, ...)')
+    parser.add_argument('--include', action='append', metavar='GLOB',
+                        help='Only check files matching GLOB (repeatable, default: *.html)')
+    parser.add_argument('--exclude', action='append', metavar='GLOB', default=[],
+                        help='Skip files or directories matching GLOB (repeatable)')
+    parser.add_argument('-j', '--jobs', type=int, default=1,
+                        help='Worker processes (0 = all cores, default: 1)')
+    add_cache_arguments(parser)
+    add_profile_arguments(parser)
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+
     print("🔍 Validating schema markup...\n")
 
-    root_dir = Path(__file__).parent.parent
-    html_files = list(root_dir.glob('*.html'))
+    root_dir = args.root
+    html_files = discover_html_files(root_dir, recursive=args.recursive,
+                                     include=args.include, exclude=args.exclude)
 
     if not html_files:
         print("⚠️  No HTML files found")
@@ -58,24 +105,32 @@ def main():
     total_schemas = 0
     total_errors = 0
 
-    for html_file in html_files:
-        print(f"📄 {html_file.name}")
+    if args.profile:
+        checker = ProfiledCheck(check_schema_file)
+    else:
+        checker = CachedCheck(check_schema_file, FILE_NAMESPACE, enabled=not args.no_cache)
+
+    # Results come back in discovery order; the NAP index needs every page, so it is built here
+    with maybe_cprofile(args.profile_out) as profiled:
+        outcomes = map_in_pool(profiled(checker), html_files, jobs=args.jobs)
+
+    labels = [html_file.relative_to(root_dir).as_posix() for html_file in html_files]
 
-        with open(html_file, 'r', encoding='utf-8') as f:
-            html_content = f.read()
+    for label, outcome in zip(labels, outcomes):
+        print(f"📄 {label}")
 
-        schemas = extract_json_ld(html_content)
+        findings = outcome[0]
 
-        if not schemas:
+        for message in findings['invalid']:
+            print(f"  ⚠️  Invalid JSON-LD: {message}")
+
+        if not findings['schemas']:
             print("  ⚠️  No JSON-LD schemas found")
             continue
 
-        for i, schema in enumerate(schemas, 1):
-            schema_type = schema.get('@type', 'Unknown')
+        for i, (schema_type, errors) in enumerate(findings['schemas'], 1):
             print(f"  Schema {i}: {schema_type}")
 
-            errors = validate_schema(schema, schema_type)
-
             if errors:
                 print(f"    ❌ Validation errors:")
                 for error in errors:
@@ -88,11 +143,19 @@ def main():
 
         print()
 
+    nap_conflicts = print_nap_report(labels, outcomes)
+
     print(f"📊 Summary:")
     print(f"   Files checked: {len(html_files)}")
     print(f"   Schemas found: {total_schemas}")
+    print(f"   NAP conflicts: {nap_conflicts}")
     print(f"   Errors: {total_errors}\n")
 
+    if args.profile:
+        print_profile(labels, [outcome[1] for outcome in outcomes], top=args.profile_top)
+    else:
+        finish_cache(checker, outcomes, show_stats=args.cache_stats)
+
     if total_errors > 0:
         print("❌ Schema validation FAILED\n")
         return 1
@@ -2,97 +2,224 @@
 
 """
 Validate sitemap.xml
-Checks structure and URL validity
+Checks structure and URL validity, following sitemap indexes to their
+children, and optionally that every URL responds
 """
 
+import argparse
 import sys
-import xml.etree.ElementTree as ET
 from pathlib import Path
-from datetime import datetime
+
+from tpp_audit.cache import CachedCheck, add_cache_arguments, finish_cache
+from tpp_audit.discovery import discover_html_files
+from tpp_audit.live import (
+    DEFAULT_CONCURRENCY,
+    DEFAULT_RATE,
+    DEFAULT_RETRIES,
+    DEFAULT_TIMEOUT,
+    check_live,
+    is_live,
+)
+from tpp_audit.profiling import ProfiledCheck, add_profile_arguments, maybe_cprofile, print_profile
+from tpp_audit.runner import ERROR, run_audit
+from tpp_audit.sitemap import (
+    CACHE_NAMESPACE,
+    DEFAULT_SITEMAPS,
+    LocSet,
+    check_sitemap,
+    iter_locs,
+    sitemap_digest,
+)
 
 def validate_sitemap(sitemap_path):
     """Validate sitemap XML structure and content"""
-    errors = []
-
     if not sitemap_path.exists():
-        return ['Sitemap file not found: sitemap.xml']
-
-    try:
-        tree = ET.parse(sitemap_path)
-        root = tree.getroot()
-    except ET.ParseError as e:
-        return [f'Invalid XML: {e}']
-
-    # Check namespace
-    namespace = {'ns': 'http://www.sitemaps.org/schemas/sitemap/0.9'}
-
-    # Find all URLs
-    urls = root.findall('.//ns:url', namespace)
-
-    if not urls:
-        errors.append('No URLs found in sitemap')
-        return errors
-
-    print(f"  Found {len(urls)} URLs")
-
-    for i, url_elem in enumerate(urls, 1):
-        loc = url_elem.find('ns:loc', namespace)
-        lastmod = url_elem.find('ns:lastmod', namespace)
-        changefreq = url_elem.find('ns:changefreq', namespace)
-        priority = url_elem.find('ns:priority', namespace)
-
-        # Check required loc element
-        if loc is None or not loc.text:
-            errors.append(f'URL {i}: Missing <loc> element')
+        return [f'Sitemap file not found: {sitemap_path.name}']
+
+    findings = check_sitemap(sitemap_path)
+    print_url_count(findings)
+    return findings['errors']
+
+def print_url_count(findings):
+    if not findings['url_count']:
+        return
+    sitemaps = findings.get('sitemaps', [])
+    if len(sitemaps) > 1:
+        print(f"  Found {findings['url_count']} URLs in {len(sitemaps)} sitemaps "
+              f"({', '.join(sitemaps)})")
+    else:
+        print(f"  Found {findings['url_count']} URLs")
+
+def default_sitemaps(root_dir):
+    """sitemap.xml (required) plus any other default sitemaps the build has"""
+    return [root_dir / DEFAULT_SITEMAPS[0]] + [
+        root_dir / name for name in DEFAULT_SITEMAPS[1:] if (root_dir / name).exists()
+    ]
+
+def reconcile_build(root_dir, use_cache=True):
+    """Print sitemap <-> build findings; returns the number of errors"""
+    print("🔗 Reconciling sitemap with build output")
+    html_files = discover_html_files(root_dir, recursive=True)
+    page_results, site_results, cached_check = run_audit(
+        root_dir, html_files, ['reconcile'], use_cache=use_cache)
+    if page_results:
+        finish_cache(cached_check, [outcome[1:] for outcome in page_results])
+
+    findings = site_results['reconcile']
+    errors = [message for severity, message in findings if severity == ERROR]
+    warnings = [message for severity, message in findings if severity != ERROR]
+    print(f"  Pages: {len(html_files)}")
+    for message in errors:
+        print(f"  ❌ {message}")
+    for message in warnings:
+        print(f"  ⚠️  {message}")
+    if not findings:
+        print("  ✓ Sitemap matches build output")
+    print()
+    return len(errors)
+
+def unique_locs(sitemap_paths):
+    """Stream <loc> values from every sitemap, each URL once"""
+    seen = LocSet()
+    for sitemap_path in sitemap_paths:
+        if not sitemap_path.exists():
             continue
+        for loc in iter_locs(sitemap_path):
+            if not seen.add(loc):
+                yield loc
+
+def describe_live(result):
+    """Why a URL failed the live check"""
+    if result['error']:
+        reason = result['error']
+    elif result['redirects']:
+        hops = ' -> '.join(f"{status} {location}" for status, location in result['redirects'])
+        reason = f"redirects ({hops})"
+        if result['status'] is not None and not 200 <= result['status'] < 300:
+            reason += f", ends in HTTP {result['status']}"
+    else:
+        reason = f"HTTP {result['status']}"
+    return f"{result['url']}: {reason}"
+
+def check_live_urls(sitemap_paths, args):
+    """Request every sitemap URL and print failures; returns the number of errors"""
+    target = f" via {args.live_base}" if args.live_base else ''
+    rate = f"{args.rate:g} req/s per host" if args.rate > 0 else 'no rate limit'
+    print(f"🌐 Checking live URLs{target} ({args.concurrency} concurrent, {rate})")
+
+    failures = []
+    stats = check_live(
+        unique_locs(sitemap_paths),
+        on_result=lambda result: None if is_live(result) else failures.append(result),
+        concurrency=args.concurrency, rate=args.rate, timeout=args.timeout,
+        retries=args.retries, base_url=args.live_base,
+    )
+
+    elapsed = stats['elapsed']
+    print(f"  Checked {stats['urls']} URLs in {elapsed:.1f}s "
+          f"({stats['requests']} requests over {stats['connections']} connections)")
+    if failures:
+        failures.sort(key=lambda result: result['url'])
+        print(f"  ❌ {len(failures)} URLs not live:")
+        for result in failures:
+            print(f"    - {describe_live(result)}")
+    else:
+        print("  ✓ All URLs respond 2xx")
+    print()
+    return len(failures)
+
+def positive(convert, allow_zero=False):
+    """argparse type: convert, rejecting negative values (and 0 unless allow_zero)"""
+    def parse(value):
+        number = convert(value)
+        if number < 0 or (number == 0 and not allow_zero):
+            raise argparse.ArgumentTypeError(
+                f"must be {'0 or more' if allow_zero else 'greater than 0'}, got {value}")
+        return number
+    return parse
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Validate sitemap.xml')
+    parser.add_argument('sitemaps', nargs='*', type=Path,
+                        help='Sitemaps or sitemap indexes to check, .xml or .xml.gz '
+                             f"(default: {', '.join(DEFAULT_SITEMAPS)} in --root)")
+    parser.add_argument('--root', type=Path, default=Path(__file__).parent.parent,
+                        help='Build output / site root (default: repository root)')
+    parser.add_argument('--reconcile', action='store_true',
+                        help='Also match sitemap URLs against built pages and their canonicals')
+    live = parser.add_argument_group('live checks')
+    live.add_argument('--check-live', action='store_true',
+                      help='Also request every sitemap URL (HEAD, falling back to GET)')
+    live.add_argument('--live-base', metavar='URL',
+                      help='Send live checks to this origin instead, e.g. http://127.0.0.1:8000')
+    live.add_argument('--concurrency', type=positive(int), default=DEFAULT_CONCURRENCY,
+                      help=f'Requests in flight at once (default: {DEFAULT_CONCURRENCY})')
+    live.add_argument('--rate', type=positive(float, allow_zero=True), default=DEFAULT_RATE,
+                      help=f'Max requests per second per host, 0 = unlimited (default: {DEFAULT_RATE:g})')
+    live.add_argument('--timeout', type=positive(float), default=DEFAULT_TIMEOUT,
+                      help=f'Seconds per request (default: {DEFAULT_TIMEOUT:g})')
+    live.add_argument('--retries', type=positive(int, allow_zero=True), default=DEFAULT_RETRIES,
+                      help=f'Retries for timeouts, 429 and 5xx (default: {DEFAULT_RETRIES})')
+    add_cache_arguments(parser)
+    add_profile_arguments(parser)
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
 
-        # Validate URL format
-        url = loc.text
-        if not url.startswith(('http://', 'https://')):
-            errors.append(f'URL {i}: Invalid URL format: {url}')
-
-        # Validate lastmod date format
-        if lastmod is not None and lastmod.text:
-            try:
-                datetime.fromisoformat(lastmod.text.replace('Z', '+00:00'))
-            except ValueError:
-                errors.append(f'URL {i}: Invalid date format in <lastmod>: {lastmod.text}')
-
-        # Validate changefreq
-        valid_freqs = ['always', 'hourly', 'daily', 'weekly', 'monthly', 'yearly', 'never']
-        if changefreq is not None and changefreq.text not in valid_freqs:
-            errors.append(f'URL {i}: Invalid <changefreq>: {changefreq.text}')
-
-        # Validate priority
-        if priority is not None:
-            try:
-                p = float(priority.text)
-                if not 0.0 <= p <= 1.0:
-                    errors.append(f'URL {i}: Priority must be between 0.0 and 1.0: {p}')
-            except ValueError:
-                errors.append(f'URL {i}: Invalid <priority> value: {priority.text}')
-
-    return errors
-
-def main():
     print("🔍 Validating sitemap...\n")
 
-    root_dir = Path(__file__).parent.parent
-    sitemap_path = root_dir / 'sitemap.xml'
+    root_dir = args.root
+    sitemap_paths = args.sitemaps or default_sitemaps(root_dir)
 
-    print(f"📄 Checking {sitemap_path.name}")
-
-    errors = validate_sitemap(sitemap_path)
+    if args.profile:
+        checker = ProfiledCheck(check_sitemap)
+    else:
+        checker = CachedCheck(check_sitemap, CACHE_NAMESPACE, enabled=not args.no_cache,
+                              digest=sitemap_digest)
+    outcomes = []
+    checked = []
+    total_errors = 0
+
+    # One profile covers every sitemap, so --profile-out is written once
+    with maybe_cprofile(args.profile_out):
+        for sitemap_path in sitemap_paths:
+            print(f"📄 Checking {sitemap_path.name}")
+
+            if sitemap_path.exists():
+                outcomes.append(checker(sitemap_path))
+                checked.append(sitemap_path.name)
+                findings = outcomes[-1][0]
+                print_url_count(findings)
+                errors = findings['errors']
+            else:
+                errors = validate_sitemap(sitemap_path)
+
+            if errors:
+                print(f"  ❌ {len(errors)} issues found:")
+                for error in errors:
+                    print(f"    - {error}")
+            else:
+                print(f"  ✓ Sitemap is valid")
+            print()
+            total_errors += len(errors)
+
+    if args.reconcile:
+        total_errors += reconcile_build(root_dir, use_cache=not args.no_cache)
+
+    if args.check_live:
+        total_errors += check_live_urls(sitemap_paths, args)
+
+    if args.profile:
+        print_profile(checked, [outcome[1] for outcome in outcomes], top=args.profile_top)
+    else:
+        finish_cache(checker, outcomes, show_stats=args.cache_stats)
 
-    if errors:
-        print(f"  ❌ {len(errors)} issues found:")
-        for error in errors:
-            print(f"    - {error}")
-        print("\n❌ Sitemap validation FAILED\n")
+    if total_errors:
+        print("❌ Sitemap validation FAILED\n")
         return 1
     else:
-        print(f"  ✓ Sitemap is valid")
-        print("\n✅ Sitemap validation PASSED\n")
+        print("✅ Sitemap validation PASSED\n")
         return 0
 
 if __name__ == '__main__':
@@ -0,0 +1,68 @@
+/**
+ * Client for the Python validator server (python -m tpp_audit serve)
+ * Keeps one interpreter alive for the whole build and sends it batches of
+ * files, instead of spawning a validator process per check
+ *
+ *   const validator = await startValidator();
+ *   const result = await validator.check(['about/index.html'], ['meta', 'schema']);
+ *   await validator.close();
+ */
+
+import { spawn } from 'child_process';
+import path from 'path';
+import readline from 'readline';
+import { fileURLToPath } from 'url';
+
+const __dirname = path.dirname(fileURLToPath(import.meta.url));
+
+export function startValidator({ python = process.env.PYTHON || 'python3', root } = {}) {
+  const args = ['-m', 'tpp_audit'];
+  if (root) args.push('--root', root);
+  args.push('serve');
+
+  const child = spawn(python, args, { cwd: __dirname, stdio: ['pipe', 'pipe', 'inherit'] });
+  const lines = readline.createInterface({ input: child.stdout });
+  const pending = new Map();
+  let nextId = 1;
+
+  return new Promise((resolve, reject) => {
+    child.once('error', reject);
+    child.once('exit', (code) => {
+      const error = new Error(`Validator server exited with code ${code}`);
+      reject(error);
+      for (const { reject: fail } of pending.values()) fail(error);
+      pending.clear();
+    });
+
+    lines.on('line', (line) => {
+      const message = JSON.parse(line);
+      if (message.event === 'ready') {
+        resolve({ check, request, close });
+        return;
+      }
+      const waiter = pending.get(message.id);
+      if (!waiter) return;
+      pending.delete(message.id);
+      if (message.ok) waiter.resolve(message);
+      else waiter.reject(new Error(message.error));
+    });
+  });
+
+  function request(body) {
+    const id = nextId++;
+    return new Promise((resolve, reject) => {
+      pending.set(id, { resolve, reject });
+      child.stdin.write(JSON.stringify({ ...body, id }) + '\n');
+    });
+  }
+
+  async function check(files, checks) {
+    const response = await request({ op: 'check', files, checks });
+    return response.result;
+  }
+
+  async function close() {
+    await request({ op: 'shutdown' });
+    child.stdin.end();
+  }
+}